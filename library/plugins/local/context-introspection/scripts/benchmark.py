@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the introspection script.
+
+Generates a synthetic home directory and project tree of configurable size,
+points HOME at it, then times each find_* function, collect_context() and
+generate_report() (cold, and warm from the parse cache) and tracks their
+peak memory with tracemalloc. The wall time `introspect.py --summary` adds to
+a bare interpreter is checked against a startup budget, and the modules its
+imports add are listed from -X importtime. Results can be saved as
+JSON and compared with an earlier run to catch regressions.
+
+Usage:
+    python benchmark.py [--skills N] [--rules N] [--commands N] [--agents N]
+                        [--file-size BYTES] [--nesting DEPTH] [--ancestors DEPTH]
+                        [--repeat N] [--output FILE] [--compare FILE]
+                        [--tolerance FRACTION] [--startup-budget MS] [--keep DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+
+# === Constants ===
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BENCHMARK_SCHEMA = "context-introspection-benchmark"
+BENCHMARK_VERSION = 1
+
+# Discovery functions timed on their own, in report order
+FIND_FUNCTIONS = (
+    "find_memory_files",
+    "find_skills",
+    "find_hooks",
+    "find_mcp_servers",
+    "find_agents",
+    "find_commands",
+)
+
+# Milliseconds `introspect.py --summary` may add to a bare interpreter (see check_startup)
+DEFAULT_STARTUP_BUDGET_MS = 25.0
+DEFAULT_TOLERANCE = 0.25
+
+WORDS = (
+    "always prefer small focused changes and run the tests before committing code review "
+    "style guide naming error handling logging database migration api endpoint schema "
+    "frontend component state cache latency throughput deploy rollback feature flag "
+    "security secret token permission audit retry timeout queue worker batch stream"
+).split()
+
+
+# === Tree Generation ===
+
+def filler(rng: random.Random, size: int) -> str:
+    """Return roughly size bytes of lines of random words."""
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def nested_dir(root: Path, i: int, nesting: int) -> Path:
+    """Return the subdirectory of root for item i, up to nesting levels deep."""
+    depth = i % (nesting + 1)
+    return root.joinpath(*(f"group-{level}" for level in range(depth)))
+
+
+def write_file(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def generate_tree(root: Path, skills: int, rules: int, commands: int, agents: int,
+                  file_size: int, nesting: int, ancestors: int, seed: int = 0) -> tuple[Path, Path]:
+    """Create a synthetic home and project under root; return (home, project).
+
+    Items alternate between the user and project scopes. Rules and commands
+    are spread over subdirectories up to nesting levels deep, and every one
+    of the project's ancestors (up to the synthetic root) has a CLAUDE.md.
+    """
+    rng = random.Random(seed)
+    home = root / "home"
+    project = root.joinpath("work", *(f"parent-{level}" for level in range(ancestors)), "project")
+    scopes = (home / ".claude", project / ".claude")
+
+    write_file(home / ".claude" / "CLAUDE.md", "# User memory\n" + filler(rng, file_size))
+    write_file(project / "CLAUDE.md", "# Project memory\n" + filler(rng, file_size))
+    write_file(project / "CLAUDE.local.md", "# Local memory\n" + filler(rng, file_size // 4))
+    parent = project.parent
+    while parent != root:
+        write_file(parent / "CLAUDE.md", f"# {parent.name}\n" + filler(rng, file_size // 2))
+        parent = parent.parent
+
+    for i in range(rules):
+        frontmatter = f"---\npaths: src/module-{i}/**/*.py\n---\n" if i % 3 == 0 else ""
+        rules_dir = nested_dir(scopes[i % 2] / "rules", i, nesting)
+        write_file(rules_dir / f"rule-{i}.md", f"{frontmatter}# Rule {i}\n" + filler(rng, file_size))
+    for i in range(skills):
+        write_file(
+            scopes[i % 2] / "skills" / f"skill-{i}" / "SKILL.md",
+            f"---\nname: skill-{i}\ndescription: Use when working on area {i} of the codebase\n"
+            f"allowed-tools: [Read, Grep, Bash]\n---\n\n# Skill {i}\n" + filler(rng, file_size),
+        )
+    for i in range(commands):
+        commands_dir = nested_dir(scopes[i % 2] / "commands", i, nesting)
+        write_file(
+            commands_dir / f"command-{i}.md",
+            f"---\ndescription: Run task {i}\nargument-hint: [target]\n---\n\n" + filler(rng, file_size // 2),
+        )
+    for i in range(agents):
+        write_file(
+            scopes[i % 2] / "agents" / f"agent-{i}.md",
+            f"---\nname: agent-{i}\ndescription: Reviews changes to area {i}\ntools: Read, Grep\n"
+            f"model: sonnet\n---\n\n" + filler(rng, file_size),
+        )
+
+    hooks = {"PreToolUse": [{"matcher": "Bash", "hooks": [{"type": "command", "command": "echo check"}]}]}
+    for scope in scopes:
+        write_file(scope / "settings.json", json.dumps({"hooks": hooks}, indent=2))
+    servers = {f"server-{i}": {"command": "npx", "args": [f"mcp-server-{i}"]} for i in range(8)}
+    history = {f"/work/other-{i}": {"history": [filler(rng, 200)]} for i in range(50)}
+    write_file(home / ".claude.json", json.dumps({"mcpServers": servers, "projects": history}))
+    write_file(project / ".mcp.json", json.dumps({"mcpServers": dict(list(servers.items())[:2])}))
+    return home, project
+
+
+def count_files(root: Path) -> dict:
+    """Count the generated files and their total size."""
+    files = [path for path in root.rglob("*") if path.is_file()]
+    return {"files": len(files), "bytes": sum(path.stat().st_size for path in files)}
+
+
+# === Measurement ===
+
+def measure(func, repeat: int, setup=None) -> dict:
+    """Time func() repeat times and measure its peak traced memory once.
+
+    setup() runs before every call, outside the timing. Memory is traced in
+    a separate call, since tracing slows the timed ones down.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "peak_bytes": peak,
+    }
+
+
+def run_phases(introspection, project: Path, repeat: int) -> dict:
+    """Time every discovery function and the full report."""
+    estimator = introspection.load_estimator()
+    cache = introspection.PARSE_CACHE
+
+    def cold():
+        cache.enabled = False
+
+    def warm():
+        cache.enabled = True
+
+    phases = {}
+    for name in FIND_FUNCTIONS:
+        find = getattr(introspection, name)
+        phases[name] = measure(lambda: find(project), repeat, setup=cold)
+    phases["collect_context"] = measure(lambda: introspection.collect_context(project, estimator), repeat, setup=cold)
+    phases["generate_report"] = measure(lambda: introspection.generate_report(project, estimator), repeat, setup=cold)
+
+    # Populate the parse cache, then time the warm path
+    warm()
+    introspection.generate_report(project, estimator)
+    phases["generate_report_warm"] = measure(lambda: introspection.generate_report(project, estimator), repeat,
+                                             setup=warm)
+    return phases
+
+
+def import_times(code: str, env: dict) -> dict[str, int]:
+    """Run code under -X importtime, returning cumulative microseconds per top-level import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = times.get(name.strip(), 0) + int(cumulative)
+    return times
+
+
+def wall_time(argv: list[str], env: dict, repeat: int) -> float:
+    """Return the fastest wall time of a command, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def check_startup(project: Path, env: dict, repeat: int, budget_ms: float) -> dict:
+    """Measure the --summary startup path against a wall-time budget.
+
+    The budget applies to the time `introspect.py --summary` takes beyond a
+    bare interpreter, so it covers compiling the launcher as well as the
+    imports (listed from -X importtime) and the counting itself.
+    """
+    baseline = import_times("pass", env)
+    code = (
+        f"import sys; sys.path.insert(0, {str(SCRIPT_DIR)!r}); import summary; "
+        f"summary.count_context({str(project)!r})"
+    )
+    imports = {name: us for name, us in import_times(code, env).items() if name not in baseline}
+    interpreter_ms = wall_time([sys.executable, "-c", "pass"], env, repeat)
+    introspect_ms = wall_time([sys.executable, str(SCRIPT_DIR / "introspect.py"), str(project), "--summary"],
+                              env, repeat)
+    overhead_ms = round(introspect_ms - interpreter_ms, 3)
+    return {
+        "summary_import_ms": round(sum(imports.values()) / 1000, 3),
+        "summary_imports": sorted(imports),
+        "summary_overhead_ms": overhead_ms,
+        "budget_ms": budget_ms,
+        "within_budget": overhead_ms <= budget_ms,
+        "interpreter_wall_ms": interpreter_ms,
+        "summary_wall_ms": wall_time([sys.executable, str(SCRIPT_DIR / "summary.py"), str(project)], env, repeat),
+        "introspect_summary_wall_ms": introspect_ms,
+    }
+
+
+# === Results ===
+
+def compare_results(previous: dict, current: dict, tolerance: float) -> list[dict]:
+    """Compare phase minimums with an earlier run, flagging slowdowns beyond tolerance."""
+    rows = []
+    for name, stats in current["phases"].items():
+        before = previous.get("phases", {}).get(name)
+        if not before or not before.get("min_ms"):
+            continue
+        ratio = stats["min_ms"] / before["min_ms"]
+        rows.append({
+            "phase": name,
+            "before_ms": before["min_ms"],
+            "after_ms": stats["min_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def render_results(results: dict, comparison: list[dict] | None) -> list[str]:
+    """Render the results as markdown tables."""
+    config = results["config"]
+    lines = [
+        "## Benchmark",
+        "",
+        f"{config['skills']} skills, {config['rules']} rules, {config['commands']} commands, "
+        f"{config['agents']} agents; {results['tree']['files']} files, {results['tree']['bytes']} bytes",
+        "",
+        "| Phase | Min (ms) | Median (ms) | Peak memory (KB) |",
+        "|-------|----------|-------------|------------------|",
+    ]
+    for name, stats in results["phases"].items():
+        lines.append(f"| {name} | {stats['min_ms']:.2f} | {stats['median_ms']:.2f} | "
+                     f"{stats['peak_bytes'] / 1024:.0f} |")
+
+    startup = results["startup"]
+    status = "within" if startup["within_budget"] else "OVER"
+    lines += [
+        "",
+        f"**Summary startup:** {startup['summary_overhead_ms']:.1f} ms over a bare interpreter "
+        f"({status} the {startup['budget_ms']:g} ms budget)",
+        f"**Summary imports:** {startup['summary_import_ms']:.2f} ms: {', '.join(startup['summary_imports'])}",
+        f"**Wall time:** interpreter {startup['interpreter_wall_ms']:.1f} ms, "
+        f"summary.py {startup['summary_wall_ms']:.1f} ms, "
+        f"introspect.py --summary {startup['introspect_summary_wall_ms']:.1f} ms",
+    ]
+
+    if comparison is not None:
+        lines += ["", "| Phase | Before (ms) | After (ms) | Ratio |", "|-------|-------------|------------|-------|"]
+        for row in comparison:
+            flag = " ⚠️" if row["regression"] else ""
+            lines.append(f"| {row['phase']} | {row['before_ms']:.2f} | {row['after_ms']:.2f} | "
+                         f"{row['ratio']:.2f}{flag} |")
+    return lines
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark introspect.py on a synthetic context tree.")
+    parser.add_argument("--skills", type=int, default=100, metavar="N", help="number of skills (default: 100)")
+    parser.add_argument("--rules", type=int, default=200, metavar="N", help="number of rules (default: 200)")
+    parser.add_argument("--commands", type=int, default=100, metavar="N",
+                        help="number of commands (default: 100)")
+    parser.add_argument("--agents", type=int, default=50, metavar="N", help="number of agents (default: 50)")
+    parser.add_argument("--file-size", type=int, default=2048, metavar="BYTES",
+                        help="approximate size of each generated file (default: 2048)")
+    parser.add_argument("--nesting", type=int, default=2, metavar="DEPTH",
+                        help="subdirectory depth rules and commands are spread over (default: 2)")
+    parser.add_argument("--ancestors", type=int, default=5, metavar="DEPTH",
+                        help="parent directories of the project with a CLAUDE.md (default: 5)")
+    parser.add_argument("--repeat", type=int, default=5, metavar="N",
+                        help="timed runs per phase; the minimum is compared (default: 5)")
+    parser.add_argument("--output", type=Path, metavar="FILE", help="save the results as JSON")
+    parser.add_argument("--compare", type=Path, metavar="FILE",
+                        help="compare with results saved by an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, metavar="FRACTION",
+                        help=f"slowdown flagged as a regression (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--startup-budget", type=float, default=DEFAULT_STARTUP_BUDGET_MS, metavar="MS",
+                        help="time introspect.py --summary may add to a bare interpreter "
+                             f"(default: {DEFAULT_STARTUP_BUDGET_MS:g})")
+    parser.add_argument("--keep", type=Path, metavar="DIR",
+                        help="generate the tree in DIR and keep it, instead of a temporary directory")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    previous = None
+    if args.compare:
+        try:
+            previous = json.loads(args.compare.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read {args.compare}: {e}")
+        if previous.get("schema") != BENCHMARK_SCHEMA:
+            parser.error(f"{args.compare} is not a benchmark result")
+
+    root = Path(args.keep or tempfile.mkdtemp(prefix="introspect-bench-")).resolve()
+    try:
+        home, project = generate_tree(root, args.skills, args.rules, args.commands, args.agents,
+                                      args.file_size, args.nesting, args.ancestors)
+
+        # introspection.py reads HOME when imported, so import it only now
+        os.environ["HOME"] = str(home)
+        env = dict(os.environ)
+        sys.path.insert(0, str(SCRIPT_DIR))
+        import introspection
+
+        results = {
+            "schema": BENCHMARK_SCHEMA,
+            "version": BENCHMARK_VERSION,
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "skills": args.skills, "rules": args.rules, "commands": args.commands, "agents": args.agents,
+                "file_size": args.file_size, "nesting": args.nesting, "ancestors": args.ancestors,
+                "repeat": args.repeat,
+            },
+            "tree": count_files(root),
+            "phases": run_phases(introspection, project, args.repeat),
+            "startup": check_startup(project, env, args.repeat, args.startup_budget),
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    comparison = compare_results(previous, results, args.tolerance) if previous else None
+    if previous and previous.get("config") != results["config"]:
+        print(f"Warning: {args.compare} was run with a different configuration", file=sys.stderr)
+    print("\n".join(render_results(results, comparison)))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to: {args.output}")
+
+    failed = not results["startup"]["within_budget"] or any(row["regression"] for row in comparison or [])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
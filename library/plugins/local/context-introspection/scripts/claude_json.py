@@ -0,0 +1,216 @@
+"""
+Targeted extraction of MCP server settings from ~/.claude.json.
+
+On long-lived installs ~/.claude.json holds the history and state of every
+project ever opened and grows to tens of megabytes, of which only the
+top-level "mcpServers" key and each project's "mcpServers" matter here.
+Instead of decoding the whole file, it is scanned once from bracket to
+bracket with a regular expression that consumes strings and scalars inside
+the regex engine. Only containers in the top three levels are looked at
+more closely (to find the key they belong to), and the text between the
+containers at those levels is searched for a scalar "mcpServers", so skipped
+subtrees are never built as Python objects; only the wanted values are
+decoded, with the json module, from their original bytes. The scan runs on
+a buffer that is blanked in place, so reading a file costs one copy of it
+plus one chunk.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+
+
+# === Constants ===
+
+# Everything up to and including the next bracket outside a string. Once
+# escaped backslashes and quotes are blanked out, a string is just "[^"]*";
+# the pattern is an unrolled loop, so it cannot backtrack badly.
+TO_BRACKET = re.compile(rb'[^"\[\]{}]*(?:"[^"]*"[^"\[\]{}]*)*[\[\]{}]')
+OPENING = frozenset(b"{[")
+OBJECT = ord("{")
+BACKSLASH = ord("\\")
+# Bytes of the buffer blank_escapes() copies at a time
+ESCAPE_CHUNK_SIZE = 1 << 20
+WHITESPACE = b" \t\n\r"
+# An "mcpServers" whose value is a scalar rather than a container
+SCALAR_SERVERS = re.compile(rb'"mcpServers"[ \t\n\r]*:[ \t\n\r]*("[^"]*"|[^"\s,\[\]{}]+)')
+
+# Depths of the containers of interest (the top-level object is depth 1)
+TOP_MEMBER = 2          # "mcpServers" and "projects"
+PROJECT = 3             # each project's object, keyed by path
+PROJECT_MEMBER = 4      # a project's "mcpServers"
+
+
+class ClaudeJsonError(ValueError):
+    """~/.claude.json is not a JSON object, or its brackets or quotes do not balance."""
+
+
+# === Extraction ===
+
+def blank_escapes(text: bytearray) -> None:
+    """Replace escaped backslashes and quotes with spaces, in place.
+
+    Escapes are consumed left to right, as a JSON parser does, so afterwards
+    every remaining quote delimits a string. The text is blanked in chunks
+    of about ESCAPE_CHUNK_SIZE that never end in a backslash, so no escape
+    is split between two chunks.
+    """
+    start = 0
+    while start < len(text):
+        end = min(start + ESCAPE_CHUNK_SIZE, len(text))
+        while end < len(text) and text[end - 1] == BACKSLASH:
+            end += 1
+        if text.find(b"\\", start, end) >= 0:
+            text[start:end] = text[start:end].replace(b"\\\\", b"  ").replace(b'\\"', b"  ")
+        start = end
+
+
+def key_span(text: bytearray, start: int, end: int) -> tuple[int, int] | None:
+    """Return the span of the quoted key in a '"key":' ending text[start:end]."""
+    end = start + len(text[start:end].rstrip(WHITESPACE))
+    if end <= start or text[end - 1] != ord(":"):
+        return None
+    close = start + len(text[start:end - 1].rstrip(WHITESPACE))
+    if close <= start or text[close - 1] != ord('"'):
+        return None
+    quote = text.rfind(b'"', start, close - 1)
+    return (quote, close) if quote >= 0 else None
+
+
+def scalar_servers(text: bytearray, read_span, start: int, end: int) -> tuple[bool, object]:
+    """Find a scalar "mcpServers" member in text[start:end], between containers.
+
+    The text starts outside a string, so a key is only a match after an
+    even number of quotes. Returns (found, value) for the last one.
+    """
+    found, value = False, None
+    for match in SCALAR_SERVERS.finditer(text, start, end):
+        if text.count(b'"', start, match.start()) % 2 == 0:
+            found, value = True, json.loads(read_span(match.start(1), match.end(1)).decode("utf-8"))
+    return found, value
+
+
+def extract_mcp_servers(data: bytes) -> dict:
+    """Return {"mcpServers": ..., "projects": {path: mcpServers}} from ~/.claude.json's bytes.
+
+    See scan_mcp_servers(); this works on a copy of data.
+    """
+    return scan_mcp_servers(bytearray(data), lambda start, end: data[start:end])
+
+
+def scan_mcp_servers(text: bytearray, read_span) -> dict:
+    """Return {"mcpServers": ..., "projects": {path: mcpServers}} from ~/.claude.json.
+
+    text is the file's content and is blanked in place (see
+    blank_escapes()); read_span(start, end) returns the original bytes of a
+    span, for the keys and values that are decoded.
+    "mcpServers" is the top-level value whatever its type, and is left out
+    when the key is missing, as in the decoded file; "projects" only lists
+    projects with a non-empty "mcpServers" object.
+    As with json.loads, the last of duplicate keys wins. Brackets and
+    quotes are checked to balance; the file is not otherwise validated.
+    """
+    blank_escapes(text)
+    start = 0
+    while start < len(text) and text[start] in WHITESPACE:
+        start += 1
+    end = text.rfind(b"}") + 1
+    if end <= start or text[start] != OBJECT or text.count(b'"', start, end) % 2:
+        raise ClaudeJsonError("not a JSON object with balanced quotes")
+
+    servers = MISSING = object()
+    projects = {}
+    depth = 0
+    previous = start          # just past the previous bracket
+    in_projects = False       # inside the top-level "projects" object
+    project = None            # path of the project object being scanned
+    capture = None            # (start, depth) of the mcpServers value being skipped
+    # With an even number of quotes, every match starts where the previous
+    # one ended, so the scan never retries from a later offset
+    for match in TO_BRACKET.finditer(text, start, end):
+        position = match.end() - 1
+        if depth == 1 or (depth == PROJECT and project is not None):
+            found, value = scalar_servers(text, read_span, previous, position)
+            if found and depth == 1:
+                servers = value
+            elif found:
+                projects.pop(project, None)
+        if text[position] in OPENING:
+            depth += 1
+            if TOP_MEMBER <= depth <= PROJECT_MEMBER and (depth == TOP_MEMBER or project is not None
+                                                          or (in_projects and depth == PROJECT)):
+                span = key_span(text, previous, position)
+                key = json.loads(read_span(*span).decode("utf-8")) if span else None
+                if depth == TOP_MEMBER:
+                    if key == "mcpServers":
+                        capture = (position, depth)
+                    in_projects = key == "projects" and text[position] == OBJECT
+                elif depth == PROJECT:
+                    project = key if text[position] == OBJECT else None
+                    projects.pop(key, None)
+                elif key == "mcpServers":
+                    capture = (position, depth)
+        else:
+            if capture and depth == capture[1]:
+                value = json.loads(read_span(capture[0], position + 1).decode("utf-8"))
+                if depth == TOP_MEMBER:
+                    servers = value
+                elif isinstance(value, dict) and value:
+                    projects[project] = value
+                else:
+                    projects.pop(project, None)
+                capture = None
+            depth -= 1
+            if depth < 0:
+                raise ClaudeJsonError(f"unbalanced bracket at byte {position}")
+            if depth == TOP_MEMBER - 1:
+                in_projects = False
+            elif depth == PROJECT - 1:
+                project = None
+        previous = position + 1
+    if depth != 0:
+        raise ClaudeJsonError("unbalanced brackets")
+    if servers is MISSING:
+        return {"projects": projects}
+    return {"mcpServers": servers, "projects": projects}
+
+
+def read_file_span(f, start: int, end: int) -> bytes:
+    """Read the bytes from start to end of an unbuffered file."""
+    f.seek(start)
+    data = f.read(end - start)
+    while len(data) < end - start:
+        more = f.read(end - start - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def read_mcp_servers(path) -> dict | None:
+    """Read the MCP settings of a ~/.claude.json file (see scan_mcp_servers()).
+
+    The file is read into a single buffer, and the decoded keys and values
+    are read again from the file. Returns None if the file is missing,
+    unreadable or malformed.
+    """
+    try:
+        with open(path, "rb", buffering=0) as f:
+            text = bytearray(os.fstat(f.fileno()).st_size)
+            view = memoryview(text)
+            size = 0
+            while size < len(text):
+                count = f.readinto(view[size:])
+                if not count:
+                    break
+                size += count
+            view.release()
+            del text[size:]
+            # A file that grew since fstat() is read to its end
+            text += f.read()
+            if b'"mcpServers"' not in text:
+                return {"projects": {}}
+            return scan_mcp_servers(text, lambda start, end: read_file_span(f, start, end))
+    except (OSError, ValueError, UnicodeDecodeError):
+        return None
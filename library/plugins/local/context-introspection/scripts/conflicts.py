@@ -0,0 +1,247 @@
+"""
+Conflict and shadowing detection across Claude Code context scopes.
+
+Every check is a single pass that groups records in a dict keyed by name
+(or hook event and matcher), so cost grows linearly with the number of
+skills, agents, commands and hooks. Near-duplicate rules are found with
+MinHash signatures over word shingles and locality-sensitive hashing:
+files are only compared with others that share an LSH bucket, never
+pairwise.
+"""
+from __future__ import annotations
+
+import re
+import zlib
+
+
+# === Constants ===
+
+SHINGLE_WORDS = 3
+SIGNATURE_BINS = 64
+LSH_BANDS = 16
+SIMILARITY_THRESHOLD = 0.8
+
+WORD_PATTERN = re.compile(r"\w+")
+BIN_RANGE = (1 << 32) // SIGNATURE_BINS
+EMPTY_BIN = -1
+
+# Conflict kinds, in report order, with their section titles
+CONFLICT_KINDS = {
+    "shadowed": "Shadowed Definitions",
+    "duplicate_name": "Duplicate Names",
+    "duplicate_hook": "Duplicate Hook Matchers",
+    "similar_rules": "Similar Rules",
+}
+
+# Record labels for messages, and what happens when a name is defined in
+# both the user and the project scope
+SECTION_LABELS = {"skills": "Skill", "agents": "Agent", "commands": "Command"}
+SHADOWING_NOTES = {
+    "skills": "only one of them will be used",
+    "agents": "the Project definition takes precedence",
+    "commands": "Claude Code does not support the same command in both scopes",
+}
+
+
+# === MinHash ===
+
+def minhash_signature(text: str) -> list[int]:
+    """Return a one-permutation MinHash signature of the text's word shingles.
+
+    Each shingle's CRC-32 picks one of SIGNATURE_BINS bins and the minimum
+    remainder per bin is kept, so a signature costs one hash per shingle.
+    Empty bins borrow from the next non-empty bin (rotation densification).
+    Returns [] for text without words.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return []
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+
+    signature = [EMPTY_BIN] * SIGNATURE_BINS
+    for shingle in shingles:
+        bin_index, value = divmod(zlib.crc32(shingle.encode("utf-8")), BIN_RANGE)
+        if signature[bin_index] == EMPTY_BIN or value < signature[bin_index]:
+            signature[bin_index] = value
+
+    filled = list(signature)
+    for i in range(SIGNATURE_BINS):
+        if signature[i] != EMPTY_BIN:
+            continue
+        for distance in range(1, SIGNATURE_BINS):
+            borrowed = signature[(i + distance) % SIGNATURE_BINS]
+            if borrowed != EMPTY_BIN:
+                filled[i] = borrowed + distance * BIN_RANGE
+                break
+    return filled
+
+
+def signature_similarity(a: list[int], b: list[int]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / SIGNATURE_BINS
+
+
+def find_similar(signatures: list[list[int]],
+                 threshold: float = SIMILARITY_THRESHOLD) -> list[tuple[list[int], float]]:
+    """Group near-duplicate signatures, returning (indexes, similarity) clusters.
+
+    Signatures are hashed into LSH_BANDS bands; within a bucket each member
+    is only compared with the bucket's first member, and matches are joined
+    with union-find, so the work is linear in the number of signatures.
+    The similarity reported is the lowest of the matches that formed the
+    cluster.
+    """
+    parent = list(range(len(signatures)))
+    lowest: dict[int, float] = {}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = SIGNATURE_BINS // LSH_BANDS
+    for band in range(LSH_BANDS):
+        buckets: dict[tuple[int, ...], int] = {}
+        for i, signature in enumerate(signatures):
+            if not signature:
+                continue
+            key = tuple(signature[band * rows:(band + 1) * rows])
+            first = buckets.setdefault(key, i)
+            if first == i:
+                continue
+            root_a, root_b = find(first), find(i)
+            if root_a == root_b:
+                continue
+            similarity = signature_similarity(signatures[first], signature)
+            if similarity >= threshold:
+                parent[root_b] = root_a
+                lowest[root_a] = min(similarity, lowest.get(root_a, 1.0), lowest.get(root_b, 1.0))
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(signatures)):
+        clusters.setdefault(find(i), []).append(i)
+    return [(members, lowest[root]) for root, members in clusters.items() if len(members) > 1]
+
+
+# === Detection ===
+
+def conflict(kind: str, section: str, name: str, records: list[dict], message: str, **extra) -> dict:
+    """Build a conflict entry listing the scopes and paths involved."""
+    return {
+        "kind": kind,
+        "section": section,
+        "name": name,
+        "scopes": [record.get("scope") for record in records],
+        "paths": [record.get("path") for record in records],
+        "message": message,
+        **extra,
+    }
+
+
+def record_name(section: str, record: dict) -> str:
+    """Return the name Claude Code knows a skill, agent or command by."""
+    fm = record.get("frontmatter") or {}
+    if section != "commands" and isinstance(fm.get("name"), str) and fm["name"]:
+        return fm["name"]
+    return record.get("name") or ""
+
+
+def find_shadowing(section: str, records: list[dict]) -> list[dict]:
+    """Find definitions sharing a name, across scopes (shadowing) or namespaces."""
+    by_name: dict[str, list[dict]] = {}
+    for record in records:
+        by_name.setdefault(record_name(section, record), []).append(record)
+
+    conflicts = []
+    label = SECTION_LABELS[section]
+    for name, group in by_name.items():
+        if len(group) < 2:
+            continue
+        scopes = list(dict.fromkeys(record["scope"] for record in group))
+        namespaces = {record.get("namespace") for record in group}
+        if len(scopes) > 1 and len(namespaces) == 1:
+            conflicts.append(conflict(
+                "shadowed", section, name, group,
+                f"{label} `{name}` is defined in {' and '.join(scopes)} scope; {SHADOWING_NOTES[section]}",
+            ))
+        else:
+            conflicts.append(conflict(
+                "duplicate_name", section, name, group,
+                f"{label} `{name}` is defined {len(group)} times"
+                + (" across namespaces" if len(namespaces) > 1 else ""),
+            ))
+    return conflicts
+
+
+def find_duplicate_hooks(hook_sources: list[dict]) -> list[dict]:
+    """Find hook event/matcher pairs configured more than once across settings files."""
+    by_matcher: dict[tuple[str, str], list[tuple[dict, list]]] = {}
+    for source in hook_sources:
+        hooks = source.get("hooks")
+        if not isinstance(hooks, dict):
+            continue
+        for event, entries in hooks.items():
+            for entry in entries if isinstance(entries, list) else []:
+                if not isinstance(entry, dict):
+                    continue
+                matcher = entry.get("matcher") or ""
+                commands = [
+                    hook.get("command") for hook in entry.get("hooks") or []
+                    if isinstance(hook, dict) and hook.get("command")
+                ]
+                by_matcher.setdefault((event, str(matcher)), []).append((source, commands))
+
+    conflicts = []
+    for (event, matcher), group in by_matcher.items():
+        if len(group) < 2:
+            continue
+        seen_commands = set()
+        repeated = set()
+        for _, commands in group:
+            for command in set(commands):
+                (repeated if command in seen_commands else seen_commands).add(command)
+        matcher_text = f"`{matcher}`" if matcher else "every tool"
+        message = f"{event} hooks matching {matcher_text} are configured {len(group)} times; all of them run"
+        if repeated:
+            message += f" ({len(repeated)} identical command{'s' if len(repeated) > 1 else ''})"
+        conflicts.append(conflict(
+            "duplicate_hook", "hooks", f"{event}:{matcher}", [source for source, _ in group], message,
+            identical_commands=sorted(repeated),
+        ))
+    return conflicts
+
+
+def find_similar_rules(memory_files: list[dict], signatures: dict[str, list[int]],
+                       threshold: float = SIMILARITY_THRESHOLD) -> list[dict]:
+    """Find clusters of memory files and rules whose text is nearly identical."""
+    records = [mem for mem in memory_files if signatures.get(mem.get("path"))]
+    clusters = find_similar([signatures[mem["path"]] for mem in records], threshold)
+
+    conflicts = []
+    for members, similarity in clusters:
+        group = [records[i] for i in members]
+        percent = round(similarity * 100)
+        conflicts.append(conflict(
+            "similar_rules", "memory_files", group[0]["path"], group,
+            f"{len(group)} files are {'identical' if similarity == 1 else f'at least {percent}% similar'}",
+            similarity=round(similarity, 2),
+        ))
+    return conflicts
+
+
+def detect_conflicts(context: dict, signatures: dict[str, list[int]]) -> list[dict]:
+    """Run every check over collected context, returning conflicts in report order.
+
+    signatures maps memory file paths to their minhash_signature().
+    """
+    conflicts = []
+    for section in ("skills", "agents", "commands"):
+        conflicts.extend(find_shadowing(section, context.get(section, [])))
+    conflicts.extend(find_duplicate_hooks(context.get("hooks", [])))
+    conflicts.extend(find_similar_rules(context.get("memory_files", []), signatures))
+    order = list(CONFLICT_KINDS)
+    return sorted(conflicts, key=lambda item: order.index(item["kind"]))
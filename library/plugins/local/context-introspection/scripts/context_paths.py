@@ -0,0 +1,73 @@
+"""
+Locations of Claude Code context sources, shared by introspection.py,
+summary.py and validate_skills.py.
+
+Paths are plain strings and only os and sys are imported, so the --summary
+fast path can use this module without loading pathlib.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+
+# === User ===
+
+HOME = os.path.expanduser("~")
+USER_CLAUDE_DIR = os.path.join(HOME, ".claude")
+USER_CLAUDE_MD = os.path.join(USER_CLAUDE_DIR, "CLAUDE.md")
+USER_RULES_DIR = os.path.join(USER_CLAUDE_DIR, "rules")
+USER_SKILLS_DIR = os.path.join(USER_CLAUDE_DIR, "skills")
+USER_AGENTS_DIR = os.path.join(USER_CLAUDE_DIR, "agents")
+USER_COMMANDS_DIR = os.path.join(USER_CLAUDE_DIR, "commands")
+USER_SETTINGS = os.path.join(USER_CLAUDE_DIR, "settings.json")
+USER_CLAUDE_JSON = os.path.join(HOME, ".claude.json")
+
+
+# === Caches ===
+
+CACHE_DIR = os.path.join(USER_CLAUDE_DIR, "cache", "introspect")
+# A file or directory modified this recently may change again without its
+# mtime moving on filesystems with coarse timestamps (FAT: 2 s), so results
+# keyed by its stat are not cached yet
+RACY_MTIME_NS = 2_000_000_000
+
+
+# === Enterprise ===
+
+if sys.platform == "darwin":
+    ENTERPRISE_DIR = "/Library/Application Support/ClaudeCode"
+elif sys.platform.startswith("linux"):
+    ENTERPRISE_DIR = "/etc/claude-code"
+elif sys.platform == "win32":
+    ENTERPRISE_DIR = "C:/Program Files/ClaudeCode"
+else:
+    ENTERPRISE_DIR = None
+ENTERPRISE_CLAUDE_MD = "CLAUDE.md"
+ENTERPRISE_SETTINGS = "managed-settings.json"
+ENTERPRISE_MCP = "managed-mcp.json"
+
+
+# === Project ===
+
+# Relative to the project directory (and, for memory files, each ancestor)
+PROJECT_CLAUDE_DIR = ".claude"
+MEMORY_FILE = "CLAUDE.md"
+ANCESTOR_MEMORY_FILES = (MEMORY_FILE, os.path.join(PROJECT_CLAUDE_DIR, MEMORY_FILE))
+LOCAL_MEMORY_FILE = "CLAUDE.local.md"
+PROJECT_SETTINGS_FILES = (
+    os.path.join(PROJECT_CLAUDE_DIR, "settings.json"),
+    os.path.join(PROJECT_CLAUDE_DIR, "settings.local.json"),
+)
+PROJECT_MCP_FILE = ".mcp.json"
+
+
+# === Within a .claude directory ===
+
+RULES_DIR = "rules"
+SKILLS_DIR = "skills"
+AGENTS_DIR = "agents"
+COMMANDS_DIR = "commands"
+SKILL_FILE = "SKILL.md"
+# Rules, agents and commands are markdown files
+CONTEXT_SUFFIX = ".md"
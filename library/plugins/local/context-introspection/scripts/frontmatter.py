@@ -0,0 +1,382 @@
+"""
+YAML frontmatter parsing for Claude Code context files.
+
+Almost all frontmatter is flat ``key: value`` pairs, which a hand-rolled
+fast path parses without regular expressions. Block scalars
+(``description: |``), lists (``- item`` lines or ``[a, b]``), quoted strings
+and comments go through a small parser for that YAML subset. Anything
+beyond it (nested mappings, anchors, tags) is handed to PyYAML when it is
+installed. Scalars are always kept as strings, as Claude Code treats them.
+
+Problems are reported as an error message per file instead of being
+silently mangled; the entries that could be read are still returned.
+"""
+from __future__ import annotations
+
+import re
+
+
+# === Constants ===
+
+# A mapping entry: key, then a colon followed by whitespace or end of line
+KEY_VALUE_PATTERN = re.compile(r"([^\s#'\"\-?:,\[\]{}][^:]*?)[ \t]*:(?:[ \t]+(.*?))?[ \t]*$")
+BLOCK_HEADER_PATTERN = re.compile(r"([|>])([+-]?)([1-9]?)[+-]?[ \t]*(?:#.*)?$")
+DOUBLE_QUOTE_ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)")
+
+# Keys conventionally written as unquoted "[arg1] [arg2]", which is not
+# valid YAML; a value starting with "[" is kept as written for them
+VERBATIM_KEYS = frozenset({"argument-hint"})
+
+# Characters that start something other than a plain scalar
+INDICATORS = "|>[]{}'\"&*!%@`#"
+DOUBLE_QUOTE_ESCAPES = {
+    "0": "\0", "a": "\a", "b": "\b", "t": "\t", "\t": "\t", "n": "\n", "v": "\v",
+    "f": "\f", "r": "\r", "e": "\x1b", " ": " ", '"': '"', "/": "/", "\\": "\\",
+}
+
+
+class FrontmatterError(ValueError):
+    """Frontmatter that cannot be parsed, with the file line it was found on."""
+
+    def __init__(self, message: str, line: int | None = None):
+        super().__init__(f"line {line}: {message}" if line else message)
+
+
+# === Parsing ===
+
+def parse_frontmatter(lines: list[str], first_line: int = 2) -> tuple[dict, str | None]:
+    """Parse frontmatter lines (without the --- delimiters) into a dict.
+
+    first_line is the file line number of lines[0], used in error messages.
+    Returns (data, error): on error, data holds the flat key: value pairs
+    that could be read.
+    """
+    data = parse_flat(lines)
+    if data is not None:
+        return data, None
+    try:
+        return parse_block(lines, first_line), None
+    except FrontmatterError as e:
+        error = str(e)
+
+    data, yaml_error = parse_with_yaml(lines, first_line)
+    if data is not None:
+        return data, None
+    return parse_lenient(lines), yaml_error or error
+
+
+def parse_flat(lines: list[str]) -> dict | None:
+    """Parse frontmatter made only of one-line plain key: value pairs.
+
+    Returns None as soon as a line needs the full parser.
+    """
+    data = {}
+    for line in lines:
+        if not line or line[0] in " \t-":
+            if line.strip():
+                return None
+            continue
+        if line[0] == "#":
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or (value and value[0] not in " \t") or key[0] in INDICATORS:
+            return None
+        value = value.strip()
+        if value and (value[0] in INDICATORS or " #" in value):
+            return None
+        key = key.rstrip()
+        if not key:
+            return None
+        data[key] = value
+    return data
+
+
+def parse_block(lines: list[str], first_line: int = 2) -> dict:
+    """Parse a top-level mapping of scalars, block scalars and scalar lists."""
+    data = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped or stripped[0] == "#":
+            i += 1
+            continue
+        if line[0] in " \t":
+            raise FrontmatterError("unexpected indentation", first_line + i)
+        match = KEY_VALUE_PATTERN.match(line)
+        if not match:
+            raise FrontmatterError("expected 'key: value'", first_line + i)
+        key, value = match.group(1), match.group(2) or ""
+
+        # The value's own lines: indented ones, blank ones, and for an empty
+        # value also "- item" lines at the key's indentation
+        end = i + 1
+        while end < len(lines):
+            following = lines[end]
+            if following.strip() and following[0] not in " \t" and not (
+                not value and (following.startswith("- ") or following.rstrip() == "-")
+            ):
+                break
+            end += 1
+        if key in VERBATIM_KEYS and value.startswith("["):
+            data[key] = value
+        else:
+            data[key] = parse_value(value, lines[i + 1:end], first_line + i)
+        i = end
+    return data
+
+
+def parse_value(value: str, block: list[str], line: int) -> str | list:
+    """Parse the value of a key, given the text after the colon and its own lines."""
+    if value[:1] in ("|", ">"):
+        return parse_block_scalar(value, block, line)
+    if value[:1] == "[":
+        return parse_flow_sequence(" ".join([value, *(text.strip() for text in block)]), line)
+    if value[:1] in ("'", '"'):
+        return parse_quoted(fold_lines(value, block), line)
+    if value[:1] and value[0] in INDICATORS and value[0] != "#":
+        raise FrontmatterError(f"unsupported YAML syntax {value[0]!r}", line)
+
+    content = [text for text in block if text.strip() and not text.strip().startswith("#")]
+    if not value or value.startswith("#"):
+        if not content:
+            return ""
+        if content[0].lstrip().startswith("- ") or content[0].strip() == "-":
+            return parse_block_sequence(block, line)
+        raise FrontmatterError("nested mappings are not supported", line + 1)
+    if any(KEY_VALUE_PATTERN.match(text.strip()) for text in content):
+        raise FrontmatterError("mapping values are not allowed here", line + 1)
+    return strip_comment(fold_lines(value, block))
+
+
+def parse_block_scalar(header: str, block: list[str], line: int) -> str:
+    """Parse a literal (|) or folded (>) block scalar with its chomping indicator."""
+    match = BLOCK_HEADER_PATTERN.match(header)
+    if not match:
+        raise FrontmatterError(f"invalid block scalar header {header!r}", line)
+    style, chomping, indent = match.groups()
+
+    if indent:
+        indent = int(indent)
+    else:
+        indent = next((len(text) - len(text.lstrip(" ")) for text in block if text.strip()), 0)
+    content = []
+    for offset, text in enumerate(block):
+        if text.strip() and len(text) - len(text.lstrip(" ")) < indent:
+            raise FrontmatterError("block scalar line is less indented than the first", line + 1 + offset)
+        content.append(text[indent:])
+
+    trailing = 0
+    while content and not content[-1].strip():
+        content.pop()
+        trailing += 1
+    if style == "|":
+        text = "\n".join(content)
+    else:
+        text = fold_block(content)
+
+    if not content or chomping == "-":
+        return text
+    if chomping == "+":
+        return text + "\n" * (trailing + 1)
+    return text + "\n"
+
+
+def fold_block(content: list[str]) -> str:
+    """Fold the lines of a > block scalar: line breaks become spaces except
+    around blank and more-indented lines."""
+    parts = []
+    previous = None
+    for text in content:
+        if not text.strip():
+            parts.append("\n")
+            previous = "blank"
+        elif text[0] in " \t":
+            if previous in ("text", "more"):
+                parts.append("\n")
+            parts.append(text)
+            previous = "more"
+        else:
+            if previous == "text":
+                parts.append(" ")
+            elif previous == "more":
+                parts.append("\n")
+            parts.append(text)
+            previous = "text"
+    return "".join(parts)
+
+
+def fold_lines(value: str, block: list[str]) -> str:
+    """Join a multi-line plain or quoted scalar: single line breaks become spaces."""
+    if not block:
+        return value
+    text = value
+    pending_newlines = 0
+    for line in block:
+        stripped = line.strip()
+        if not stripped:
+            pending_newlines += 1
+            continue
+        text += "\n" * pending_newlines if pending_newlines else " "
+        text += stripped
+        pending_newlines = 0
+    return text
+
+
+def parse_block_sequence(block: list[str], line: int) -> list:
+    """Parse "- item" lines into a list of scalars."""
+    items = []
+    dash_indent = None
+    for offset, text in enumerate(block):
+        stripped = text.strip()
+        if not stripped or stripped[0] == "#":
+            continue
+        indent = len(text) - len(text.lstrip())
+        if dash_indent is None:
+            dash_indent = indent
+        if indent == dash_indent and (stripped == "-" or stripped.startswith("- ")):
+            item = stripped[2:].strip()
+            if item[:1] in ("[", "{", "|", ">") or item.startswith("- ") or (
+                item[:1] not in ("'", '"') and KEY_VALUE_PATTERN.match(item)
+            ):
+                raise FrontmatterError("nested collections are not supported", line + 1 + offset)
+            items.append(item)
+        elif items and indent > dash_indent and items[-1][:1] not in ("'", '"'):
+            # A plain item continued on the next, more indented line
+            items[-1] += " " + stripped
+        else:
+            raise FrontmatterError("expected '- item'", line + 1 + offset)
+    return [parse_scalar(item, line) for item in items]
+
+
+def parse_flow_sequence(text: str, line: int) -> list:
+    """Parse a one-level [a, "b", c] sequence of scalars."""
+    text = strip_comment(text)
+    if not text.endswith("]"):
+        raise FrontmatterError("unterminated flow sequence", line)
+    items = []
+    current = []
+    quote = None
+    for char in text[1:-1]:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+            current.append(char)
+        elif char == ",":
+            items.append("".join(current).strip())
+            current = []
+        elif char in "[]{}":
+            raise FrontmatterError("nested collections are not supported", line)
+        else:
+            current.append(char)
+    if quote:
+        raise FrontmatterError("unterminated quoted string", line)
+    items.append("".join(current).strip())
+    if items[-1] == "":
+        items.pop()
+    return [parse_scalar(item, line) for item in items]
+
+
+def parse_scalar(text: str, line: int) -> str:
+    """Parse a single-line plain or quoted scalar."""
+    if text[:1] in ("'", '"'):
+        return parse_quoted(text, line)
+    return strip_comment(text)
+
+
+def parse_quoted(text: str, line: int) -> str:
+    """Parse a single- or double-quoted scalar, allowing a trailing comment."""
+    quote = text[0]
+    if quote == "'":
+        end = 1
+        while True:
+            end = text.find("'", end)
+            if end < 0:
+                raise FrontmatterError("unterminated quoted string", line)
+            if text[end + 1:end + 2] != "'":
+                break
+            end += 2
+        value = text[1:end].replace("''", "'")
+    else:
+        end = 1
+        while True:
+            end = text.find('"', end)
+            if end < 0:
+                raise FrontmatterError("unterminated quoted string", line)
+            backslashes = len(text[:end]) - len(text[:end].rstrip("\\"))
+            if backslashes % 2 == 0:
+                break
+            end += 1
+        value = DOUBLE_QUOTE_ESCAPE_PATTERN.sub(_unescape, text[1:end])
+
+    rest = text[end + 1:].strip()
+    if rest and not rest.startswith("#"):
+        raise FrontmatterError("unexpected text after quoted string", line)
+    return value
+
+
+def _unescape(match: re.Match) -> str:
+    escape = match.group(1)
+    if escape[0] in ("u", "x") and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    return DOUBLE_QUOTE_ESCAPES.get(escape, match.group(0))
+
+
+def strip_comment(text: str) -> str:
+    """Remove a trailing " # comment" from a plain scalar."""
+    if text.startswith("#"):
+        return ""
+    index = text.find(" #")
+    if index < 0:
+        index = text.find("\t#")
+    return (text[:index] if index >= 0 else text).strip()
+
+
+def parse_with_yaml(lines: list[str], first_line: int = 2) -> tuple[dict | None, str | None]:
+    """Parse with PyYAML, keeping scalars as strings.
+
+    Returns (None, None) when PyYAML is not installed, and (None, error)
+    when the text is not a valid YAML mapping.
+    """
+    try:
+        import yaml
+    except ImportError:
+        return None, None
+
+    try:
+        data = yaml.load("\n".join(lines), Loader=yaml.BaseLoader)
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        problem = getattr(e, "problem", None) or str(e)
+        return None, f"line {mark.line + first_line}: {problem}" if mark else problem
+    if data is None:
+        return {}, None
+    if not isinstance(data, dict):
+        return None, "frontmatter is not a mapping"
+    return data, None
+
+
+def parse_lenient(lines: list[str]) -> dict:
+    """Read every key: value line, ignoring structure (the last-resort fallback)."""
+    data = {}
+    for line in lines:
+        if ":" in line:
+            key, _, value = line.partition(":")
+            data[key.strip()] = value.strip()
+    return data
+
+
+# === Formatting ===
+
+def format_value(value) -> str:
+    """Format a frontmatter value for display, joining lists with commas."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(format_value(item) for item in value)
+    if isinstance(value, dict):
+        return ", ".join(f"{key}: {format_value(item)}" for key, item in value.items())
+    return str(value).strip()
@@ -0,0 +1,383 @@
+"""
+Self-contained HTML rendering of the report (introspect.py --format html).
+
+The page is a single file with inline CSS and JavaScript and makes no
+external requests. Entry metadata is rendered as HTML, but file previews
+and hook/MCP configurations, which make up most of a large report, are
+stored per section as gzip-compressed, base64-encoded JSON and only
+decoded (with the browser's DecompressionStream) when an entry is first
+expanded. Search looks up words in a prebuilt inverted index of entry
+names, scopes, paths and descriptions instead of scanning the page.
+
+The input is the document built for --format json, so the page shows
+exactly what the JSON report contains.
+"""
+from __future__ import annotations
+
+import base64
+import gzip
+import html
+import json
+import re
+
+from conflicts import CONFLICT_KINDS
+from memory_imports import IMPORT_STATUSES
+
+
+# === Constants ===
+
+SECTION_TITLES = {
+    "memory_files": "Memory Files",
+    "skills": "Skills",
+    "hooks": "Hooks",
+    "mcp_servers": "MCP Servers",
+    "agents": "Custom Agents",
+    "commands": "Custom Commands",
+}
+# Record fields whose words are indexed for search, besides frontmatter descriptions
+SEARCH_FIELDS = ("name", "namespace", "scope", "description", "path")
+# Must match the query tokenizer in PAGE_SCRIPT
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+PAGE_STYLE = """
+*{box-sizing:border-box}
+body{margin:0;font:14px/1.5 system-ui,sans-serif;color:#1f2328;background:#f6f8fa}
+nav{position:fixed;top:0;bottom:0;left:0;width:240px;overflow-y:auto;padding:16px;background:#fff;border-right:1px solid #d0d7de}
+nav input{width:100%;padding:6px 8px;margin-bottom:4px;border:1px solid #d0d7de;border-radius:6px}
+nav a{display:flex;justify-content:space-between;padding:4px 8px;border-radius:6px;color:inherit;text-decoration:none}
+nav a:hover{background:#f3f4f6}
+nav .count{color:#656d76}
+#matches{min-height:1.5em;margin-bottom:8px;color:#656d76;font-size:12px}
+main{margin-left:240px;padding:24px 32px;max-width:1100px}
+section{margin-bottom:32px}
+h1{margin-top:0}
+h2{border-bottom:1px solid #d0d7de;padding-bottom:4px}
+.entry{background:#fff;border:1px solid #d0d7de;border-radius:6px;padding:12px 16px;margin:12px 0}
+.entry h3{margin:0 0 4px;font-size:15px}
+.entry.missing{opacity:.6}
+.badge{display:inline-block;padding:0 8px;margin-left:6px;border-radius:10px;background:#ddf4ff;font-size:12px;font-weight:normal}
+.meta{color:#656d76;font-size:12px}
+.meta a{color:inherit;word-break:break-all}
+.error{color:#cf222e}
+table{border-collapse:collapse;margin:8px 0}
+th,td{border:1px solid #d0d7de;padding:4px 8px;text-align:left;vertical-align:top}
+details summary{cursor:pointer;color:#0969da}
+pre{margin:8px 0 0;padding:8px;background:#f6f8fa;border-radius:6px;overflow-x:auto;white-space:pre-wrap}
+.hidden{display:none}
+"""
+
+PAGE_SCRIPT = """
+const index = JSON.parse(document.getElementById("search-index").textContent);
+const payloads = {};
+
+function loadPayload(section) {
+  if (!payloads[section]) {
+    const text = document.getElementById("payload-" + section).textContent.trim();
+    const bytes = Uint8Array.from(atob(text), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+    payloads[section] = new Response(stream).json();
+  }
+  return payloads[section];
+}
+
+document.querySelectorAll("details[data-entry]").forEach(details => {
+  details.addEventListener("toggle", () => {
+    const pre = details.querySelector("pre");
+    if (!details.open || pre.dataset.loaded) return;
+    pre.dataset.loaded = "1";
+    if (typeof DecompressionStream === "undefined") {
+      pre.textContent = "This browser cannot decompress previews (DecompressionStream is missing).";
+      return;
+    }
+    loadPayload(details.dataset.section).then(data => { pre.textContent = data[details.dataset.entry]; });
+  });
+});
+
+function postings(i) {
+  let id = 0;
+  return index.postings[i].map(delta => (id += delta));
+}
+
+function lookup(term) {
+  let low = 0, high = index.terms.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (index.terms[mid] < term) low = mid + 1; else high = mid;
+  }
+  const found = new Set();
+  for (let i = low; i < index.terms.length && index.terms[i].startsWith(term); i++) {
+    postings(i).forEach(id => found.add(id));
+  }
+  return found;
+}
+
+function search(query) {
+  const terms = query.toLowerCase().match(/[\\p{L}\\p{N}]+/gu) || [];
+  let matches = null;
+  for (const term of terms) {
+    const found = lookup(term);
+    matches = matches ? new Set([...matches].filter(id => found.has(id))) : found;
+  }
+  document.querySelectorAll(".entry").forEach(entry => {
+    entry.classList.toggle("hidden", matches !== null && !matches.has(Number(entry.dataset.id)));
+  });
+  document.querySelectorAll("section[data-section]").forEach(section => {
+    const shown = section.querySelectorAll(".entry:not(.hidden)").length;
+    section.classList.toggle("hidden", matches !== null && !shown);
+  });
+  document.getElementById("matches").textContent = matches === null ? "" : matches.size + " matching entries";
+}
+
+document.getElementById("search").addEventListener("input", event => search(event.target.value));
+"""
+
+
+# === Rendering ===
+
+def escape(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def format_size(size: int) -> str:
+    """Format file size in human-readable form, like the markdown report."""
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def file_link(path: str) -> str:
+    return f'<a href="file://{escape(path)}">{escape(path)}</a>'
+
+
+def script_json(data) -> str:
+    """Serialize data as JSON that is safe inside a <script> element."""
+    return json.dumps(data, separators=(",", ":")).replace("</", "<\\/")
+
+
+def compress_payload(previews: dict) -> str:
+    """Gzip and base64-encode a section's previews, keyed by entry id."""
+    raw = json.dumps(previews, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(gzip.compress(raw, mtime=0)).decode("ascii")
+
+
+def entry_title(record: dict) -> str:
+    if record["type"] in ("hook_source", "mcp_source"):
+        return f"{record['scope']} {'Hooks' if record['type'] == 'hook_source' else 'MCP Servers'}"
+    return record.get("name") or record.get("description") or record["path"]
+
+
+def entry_preview(record: dict) -> str | None:
+    """Return the text shown when an entry is expanded."""
+    if record["type"] == "hook_source":
+        return json.dumps(record["hooks"], indent=2)
+    if record["type"] == "mcp_source":
+        return json.dumps(record["servers"], indent=2)
+    return record.get("preview")
+
+
+def search_terms(record: dict) -> set[str]:
+    """Return the lowercase words of a record's searchable fields."""
+    text = [str(record[field]) for field in SEARCH_FIELDS if record.get(field)]
+    frontmatter = record.get("frontmatter")
+    if isinstance(frontmatter, dict) and frontmatter.get("description"):
+        text.append(str(frontmatter["description"]))
+    if record["type"] == "mcp_source" and isinstance(record["servers"], dict):
+        text.extend(record["servers"])
+    return set(TERM_PATTERN.findall(" ".join(text).lower()))
+
+
+def build_search_index(terms_by_entry: list[set[str]]) -> dict:
+    """Build the inverted index: sorted terms and delta-encoded entry ids."""
+    postings: dict[str, list[int]] = {}
+    for entry_id, terms in enumerate(terms_by_entry):
+        for term in terms:
+            postings.setdefault(term, []).append(entry_id)
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        ids = postings[term]
+        encoded.append([ids[0], *(b - a for a, b in zip(ids, ids[1:]))])
+    return {"terms": terms, "postings": encoded}
+
+
+def render_frontmatter(record: dict) -> list[str]:
+    if record.get("frontmatter_error"):
+        return [f'<p class="error">Frontmatter error: {escape(record["frontmatter_error"])}</p>']
+    frontmatter = record.get("frontmatter")
+    if not frontmatter:
+        return []
+    rows = []
+    for key, value in frontmatter.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, dict):
+            value = json.dumps(value)
+        rows.append(f"<tr><th>{escape(key)}</th><td>{escape(value)}</td></tr>")
+    return ["<table>", *rows, "</table>"]
+
+
+def render_imports(record: dict, approximate: bool) -> list[str]:
+    """Render a memory file's @imports, indented by depth."""
+    imports = record.get("imports")
+    if not imports:
+        return []
+    approx = "~" if approximate else ""
+    lines = [f"<p>With imports: {approx}{record['expanded_tokens']:,} tokens, "
+             f"{format_size(record['expanded_size'])}</p>", "<ul>"]
+    for item in imports:
+        note = (f"{approx}{item['tokens']:,} tokens" if item["status"] == "ok"
+                else escape(IMPORT_STATUSES[item["status"]]))
+        lines.append(f'<li style="margin-left:{(item["depth"] - 1) * 16}px">{file_link(item["path"])} ({note})</li>')
+    lines.append("</ul>")
+    return lines
+
+
+def render_entry(section: str, entry_id: int, record: dict, approximate: bool, has_preview: bool) -> list[str]:
+    """Render one record as an entry card, without its preview text."""
+    exists = record.get("exists", True)
+    title = escape(entry_title(record))
+    scope = record["scope"] + (f":{record['namespace']}" if record.get("namespace") else "")
+    scope = "" if record["type"] in ("hook_source", "mcp_source") else f'<span class="badge">{escape(scope)}</span>'
+    lines = [
+        f'<div class="entry{"" if exists else " missing"}" data-id="{entry_id}">',
+        f"<h3>{title}{scope}</h3>",
+    ]
+    meta = [file_link(record["path"])]
+    if not exists:
+        meta.append("not found")
+    if record.get("size") is not None:
+        meta.append(format_size(record["size"]))
+    if record.get("tokens") is not None:
+        tokens = f"{'~' if approximate else ''}{record['tokens']:,} tokens"
+        if record.get("loaded_copies", 1) > 1:
+            tokens += f" × {record['loaded_copies']} copies loaded"
+        meta.append(tokens)
+    if record.get("duplicate_of"):
+        meta.append(f"identical to {file_link(record['duplicate_of'])}")
+    lines.append(f'<div class="meta">{" · ".join(meta)}</div>')
+
+    if record["type"] == "mcp_source" and isinstance(record["servers"], dict):
+        names = ", ".join(escape(name) for name in record["servers"])
+        lines.append(f"<p>Servers: {names or '<em>none</em>'}</p>")
+    elif record["type"] == "hook_source" and isinstance(record["hooks"], dict):
+        lines.append(f"<p>Events: {', '.join(escape(event) for event in record['hooks'])}</p>")
+    lines.extend(render_frontmatter(record))
+    lines.extend(render_imports(record, approximate))
+    if record.get("duplicates"):
+        lines.append(f"<p>Identical copies: {len(record['duplicates'])}</p><ul>")
+        lines.extend(f"<li>{escape(copy['scope'])}: {file_link(copy['path'])}</li>" for copy in record["duplicates"])
+        lines.append("</ul>")
+    if has_preview:
+        label = "Configuration" if record["type"] in ("hook_source", "mcp_source") else "Preview"
+        lines.append(f'<details data-section="{section}" data-entry="{entry_id}">'
+                     f"<summary>{label}</summary><pre></pre></details>")
+    lines.append("</div>")
+    return lines
+
+
+def render_summary(summary: dict, approximate: bool) -> list[str]:
+    approx = "~" if approximate else ""
+    lines = ['<section id="summary"><h2>Summary</h2>', "<table><tr><th>Category</th><th>Found</th></tr>"]
+    lines.extend(
+        f"<tr><td>{escape(title)}</td><td>{summary['counts'][name]}</td></tr>"
+        for name, title in SECTION_TITLES.items()
+    )
+    lines.append("</table>")
+    lines.append("<h3>Context Budget</h3><table><tr><th>Source</th><th>Items</th><th>Tokens</th><th>Context</th></tr>")
+    for row in summary["budget"]:
+        note = "" if row["always_loaded"] else " (on demand)"
+        lines.append(f"<tr><td>{escape(row['source'])}{note}</td><td>{row['items']}</td>"
+                     f"<td>{approx}{row['tokens']:,}</td><td>{row['percent']}%</td></tr>")
+    lines.append(f"<tr><th>Always loaded</th><th></th><th>{approx}{summary['total_tokens']:,}</th>"
+                 f"<th>{summary['total_percent']}%</th></tr></table></section>")
+    return lines
+
+
+def render_conflicts(conflicts: list[dict]) -> list[str]:
+    lines = ['<section id="conflicts"><h2>Conflicts</h2>']
+    if not conflicts:
+        lines.append("<p><em>No conflicts found.</em></p>")
+    for kind, title in CONFLICT_KINDS.items():
+        found = [item for item in conflicts if item["kind"] == kind]
+        if not found:
+            continue
+        lines.append(f"<h3>{escape(title)}</h3><ul>")
+        for item in found:
+            locations = "".join(
+                f"<li>{escape(scope)}: {file_link(path)}</li>" for scope, path in zip(item["scopes"], item["paths"])
+            )
+            lines.append(f"<li>{escape(item['message'])}<ul>{locations}</ul></li>")
+        lines.append("</ul>")
+    lines.append("</section>")
+    return lines
+
+
+def render_profile(profile: dict) -> list[str]:
+    columns = [key for key in profile["phases"][0] if key not in ("name", "calls", "ms")] if profile["phases"] else []
+    header = "".join(f"<th>{escape(key.replace('_', ' ').capitalize())}</th>" for key in columns)
+    lines = [
+        '<section id="profile"><h2>Profile</h2>',
+        f"<p><strong>Total:</strong> {profile['total_ms']:.1f} ms</p>",
+        f"<table><tr><th>Phase</th><th>Calls</th><th>Time (ms)</th>{header}</tr>",
+    ]
+    for phase in profile["phases"]:
+        cells = "".join(f"<td>{phase.get(key, 0)}</td>" for key in columns)
+        lines.append(f"<tr><td>{escape(phase['name'])}</td><td>{phase['calls']}</td>"
+                     f"<td>{phase['ms']:.2f}</td>{cells}</tr>")
+    lines.append("</table><p><em>Phases may nest; times include nested phases.</em></p></section>")
+    return lines
+
+
+def render_page(document: dict, approximate: bool = True) -> str:
+    """Render a --format json document as a self-contained HTML page."""
+    body = []
+    terms_by_entry = []
+    payloads = {}
+    nav = ['<a href="#summary">Summary</a>']
+    for section, title in SECTION_TITLES.items():
+        records = document[section]
+        previews = {}
+        body.append(f'<section id="{section}" data-section="{section}"><h2>{escape(title)}</h2>')
+        if not records:
+            body.append("<p><em>None found.</em></p>")
+        for record in records:
+            entry_id = len(terms_by_entry)
+            terms_by_entry.append(search_terms(record))
+            preview = entry_preview(record)
+            if preview:
+                previews[entry_id] = preview
+            body.extend(render_entry(section, entry_id, record, approximate, bool(preview)))
+        body.append("</section>")
+        payloads[section] = compress_payload(previews)
+        nav.append(f'<a href="#{section}">{escape(title)}<span class="count">{len(records)}</span></a>')
+    body.extend(render_conflicts(document["conflicts"]))
+    nav.append(f'<a href="#conflicts">Conflicts<span class="count">{len(document["conflicts"])}</span></a>')
+    if document.get("profile"):
+        body.extend(render_profile(document["profile"]))
+        nav.append('<a href="#profile">Profile</a>')
+
+    project = escape(document["project"])
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f"<title>Context Report: {project}</title>",
+        f"<style>{PAGE_STYLE}</style></head><body>",
+        '<nav><input id="search" type="search" placeholder="Search entries" autocomplete="off">',
+        '<div id="matches"></div>',
+        *nav,
+        "</nav><main>",
+        "<h1>Claude Code Context Report</h1>",
+        f'<p class="meta">Project: <code>{project}</code> · Generated: {escape(document["generated"])}'
+        f" · Platform: {escape(document['platform'])} · Tokens: {escape(document['token_estimator'])}</p>",
+        *render_summary(document["summary"], approximate),
+        *body,
+        "</main>",
+        f'<script type="application/json" id="search-index">{script_json(build_search_index(terms_by_entry))}</script>',
+        *(f'<script type="application/octet-stream" id="payload-{section}">{payload}</script>'
+          for section, payload in payloads.items()),
+        f"<script>{PAGE_SCRIPT}</script>",
+        "</body></html>",
+    ])
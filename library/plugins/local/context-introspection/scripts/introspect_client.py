@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Minimal client for the context introspection daemon (introspect.py --serve).
+
+Only imports what it needs and parses its few arguments by hand, so hooks
+and status lines pay little more than interpreter startup. If no daemon is
+listening, the report is generated by running introspect.py directly.
+
+Usage:
+    python introspect_client.py [project_dir] [--format markdown|json|ndjson|html|summary]
+                                [--context-window TOKENS] [--socket PATH]
+    python introspect_client.py --ping | --stop [--socket PATH]
+"""
+import json
+import os
+import socket
+import sys
+
+
+# Must match SOCKET_PATH in introspection.py
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".claude", "cache", "introspect", "daemon.sock")
+FORMATS = ("markdown", "json", "ndjson", "html", "summary")
+RECV_SIZE = 1 << 16
+
+
+def parse_args(argv: list) -> dict:
+    """Parse the command line into a request plus the socket path."""
+    options = {"command": "report", "socket": SOCKET_PATH, "format": "markdown"}
+    project_dir = None
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--format", "--context-window", "--socket"):
+            value = next(args, None)
+            if value is None:
+                usage(f"{arg} needs a value")
+            options[arg[2:].replace("-", "_")] = value
+        elif arg == "--ping":
+            options["command"] = "ping"
+        elif arg == "--stop":
+            options["command"] = "shutdown"
+        elif arg in ("-h", "--help"):
+            print(__doc__.strip())
+            sys.exit(0)
+        elif arg.startswith("-") or project_dir is not None:
+            usage(f"unexpected argument: {arg}")
+        else:
+            project_dir = arg
+
+    if options["format"] not in FORMATS:
+        usage(f"--format must be one of: {', '.join(FORMATS)}")
+    if "context_window" in options:
+        try:
+            options["context_window"] = int(options["context_window"])
+        except ValueError:
+            usage("--context-window must be a number of tokens")
+    options["project"] = os.path.abspath(project_dir or os.getcwd())
+    return options
+
+
+def usage(message: str) -> None:
+    """Print an error and the usage line, then exit."""
+    print(f"introspect_client.py: {message}", file=sys.stderr)
+    print(__doc__.strip().split("Usage:")[1], file=sys.stderr)
+    sys.exit(2)
+
+
+def query(socket_path: str, request: dict) -> tuple:
+    """Send one request and return the decoded (status, body bytes) response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(RECV_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    status, _, body = b"".join(chunks).partition(b"\n")
+    return json.loads(status), body
+
+
+def run_directly(options: dict) -> None:
+    """Replace this process with introspect.py generating the report itself.
+
+    The summary falls back to introspect.py --summary, which only counts
+    entries unless --context-window asks for the context budget too (the
+    daemon's summary always has it).
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "introspect.py")
+    argv = [sys.executable, script, options["project"]]
+    if options["format"] == "summary":
+        argv.append("--summary")
+    else:
+        argv += ["--format", options["format"]]
+    if "context_window" in options:
+        argv += ["--context-window", str(options["context_window"])]
+    os.execv(sys.executable, argv)
+
+
+def main():
+    """Main entry point."""
+    options = parse_args(sys.argv[1:])
+    socket_path = options.pop("socket")
+    try:
+        status, body = query(socket_path, options)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if options["command"] != "report":
+            print(f"No introspection daemon is listening on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        run_directly(options)
+        return
+
+    if not status.get("ok"):
+        print(f"introspect_client.py: {status.get('error', 'request failed')}", file=sys.stderr)
+        sys.exit(1)
+    if options["command"] == "ping":
+        print(json.dumps(status, indent=2))
+        return
+    if body:
+        sys.stdout.buffer.write(body + b"\n")
+
+
+if __name__ == "__main__":
+    main()
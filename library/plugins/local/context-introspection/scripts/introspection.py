@@ -0,0 +1,3518 @@
+"""
+Context introspection for Claude Code.
+
+Enumerates all context sources that influence Claude Code sessions and
+generates a comprehensive markdown report. Run through introspect.py, a
+thin launcher, so this module's bytecode is cached between runs.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+import context_paths
+from frontmatter import format_value, parse_frontmatter
+from memory_imports import IMPORT_STATUSES, ImportResolver, extract_imports
+from summary import SUMMARY_SCHEMA, SUMMARY_VERSION, render_counts, write_mcp_summary, write_summary
+from token_estimator import (
+    DEFAULT_CONTEXT_WINDOW,
+    budget_status,
+    format_tokens,
+    load_estimator,
+)
+
+
+# === Constants ===
+
+def get_enterprise_claude_path():
+    """Get platform-specific enterprise CLAUDE.md path."""
+    enterprise_dir = get_enterprise_settings_dir()
+    return enterprise_dir / context_paths.ENTERPRISE_CLAUDE_MD if enterprise_dir else None
+
+
+def get_enterprise_settings_dir():
+    """Get platform-specific enterprise settings directory."""
+    return Path(context_paths.ENTERPRISE_DIR) if context_paths.ENTERPRISE_DIR else None
+
+
+# Shared with summary.py and validate_skills.py through context_paths
+HOME = Path(context_paths.HOME)
+USER_CLAUDE_DIR = Path(context_paths.USER_CLAUDE_DIR)
+USER_CLAUDE_MD = Path(context_paths.USER_CLAUDE_MD)
+USER_RULES_DIR = Path(context_paths.USER_RULES_DIR)
+USER_SKILLS_DIR = Path(context_paths.USER_SKILLS_DIR)
+USER_AGENTS_DIR = Path(context_paths.USER_AGENTS_DIR)
+USER_COMMANDS_DIR = Path(context_paths.USER_COMMANDS_DIR)
+USER_SETTINGS = Path(context_paths.USER_SETTINGS)
+USER_CLAUDE_JSON = Path(context_paths.USER_CLAUDE_JSON)
+ANCESTOR_MEMORY_FILES = context_paths.ANCESTOR_MEMORY_FILES
+
+PREVIEW_LINES = 15
+WRITE_CHUNK_SIZE = 1 << 16
+FRONTMATTER_MAX_LINES = 1000
+COUNT_CHUNK_SIZE = 1 << 16
+
+CACHE_DIR = Path(context_paths.CACHE_DIR)
+PARSE_CACHE_FILE = CACHE_DIR / "parse-cache.json"
+PARSE_CACHE_VERSION = 4
+PARSE_CACHE_MAX_ENTRIES = 8192
+RACY_MTIME_NS = context_paths.RACY_MTIME_NS
+
+# Worker threads used to read and parse context files (--jobs)
+JOBS = 1
+
+
+# === Parse Cache ===
+
+class ParseCache:
+    """On-disk cache of parsed frontmatter and previews.
+
+    Entries are keyed by absolute path plus preview settings and are only
+    reused while the file's ``st_mtime_ns`` and ``st_size`` are unchanged, so
+    warm runs only need to ``stat()`` each context file.
+    """
+
+    def __init__(self, path: Path, max_entries: int = PARSE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries: dict | None = None
+        self._dirty = False
+        # Keys stored or refreshed since the last take_updates()
+        self._updated: set = set()
+        self._now = int(time.time())
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Read the cache file now instead of on the first lookup."""
+        self._load()
+
+    def _load(self) -> dict:
+        with self._lock:
+            if self._entries is None:
+                data = load_json_safe(self.path) if self.enabled else None
+                if isinstance(data, dict) and data.get("version") == PARSE_CACHE_VERSION:
+                    self._entries = data.get("entries") or {}
+                else:
+                    self._entries = {}
+        return self._entries
+
+    def get(self, key: str, stat: os.stat_result) -> dict | None:
+        """Return cached data for key if the file has not changed since."""
+        if not self.enabled:
+            return None
+        entry = self._load().get(key)
+        if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        if entry["used"] != self._now:
+            entry["used"] = self._now
+            self._dirty = True
+            self._updated.add(key)
+        return entry["data"]
+
+    def put(self, key: str, stat: os.stat_result, data: dict) -> None:
+        """Store parsed data for key, tagged with the file's mtime and size."""
+        if not self.enabled:
+            return
+        self._load()[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "used": self._now,
+            "data": data,
+        }
+        self._dirty = True
+        self._updated.add(key)
+
+    def take_updates(self) -> dict:
+        """Return the entries stored or refreshed since the last call.
+
+        Batch worker processes hand these to the parent, which merges them
+        and saves the cache once, instead of each worker overwriting it.
+        """
+        if not self._updated:
+            return {}
+        entries = self._load()
+        updates = {key: entries[key] for key in self._updated if key in entries}
+        self._updated = set()
+        return updates
+
+    def merge(self, updates: dict) -> None:
+        """Add entries taken from another process's cache."""
+        if not self.enabled or not updates:
+            return
+        self._load().update(updates)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk, evicting least recently used entries.
+
+        The serve daemon scans projects on several threads, so this writes a
+        copy of the entries and only removes the evicted ones, keeping any
+        stored meanwhile.
+        """
+        if not self.enabled or not self._dirty:
+            return
+        self._dirty = False
+        entries = dict(self._load())
+        evicted = ()
+        if len(entries) > self.max_entries:
+            keep = sorted(entries.items(), key=lambda item: item[1]["used"], reverse=True)
+            evicted = [key for key, _ in keep[self.max_entries:]]
+            entries = dict(keep[:self.max_entries])
+        payload = {"version": PARSE_CACHE_VERSION, "entries": entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self._dirty = True
+            return
+        for key in evicted:
+            self._entries.pop(key, None)
+
+
+PARSE_CACHE = ParseCache(PARSE_CACHE_FILE)
+
+
+# === Profiling ===
+
+# Linux per-process I/O totals, and the counters taken from them
+PROC_IO_FILE = "/proc/self/io"
+PROC_IO_FIELDS = {"rchar": "bytes_read", "syscr": "read_syscalls", "syscw": "write_syscalls"}
+PROFILE_COUNTERS = ("files_opened", "dirs_listed", "index_stats")
+
+
+class Profile:
+    """Per-phase timings and I/O counters collected for --profile.
+
+    Phases may nest, and a phase entered several times is accumulated, so
+    times are inclusive. Files opened and directories listed are counted
+    with an audit hook, the stat() calls the discovery index makes as
+    index_stats (other stats have no audit event), and on Linux bytes read
+    and read/write system calls are taken from /proc/self/io (less the cost
+    of reading it).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases: dict[str, dict] = {}
+        self.counters = dict.fromkeys(PROFILE_COUNTERS, 0)
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self._baseline: dict[str, int] = {}
+        self._overhead: dict[str, int] = {}
+        self._samples = 0
+        self._hooked = False
+
+    def enable(self) -> None:
+        """Start profiling, installing the audit hook on first use (only under --profile)."""
+        if self.enabled:
+            return
+        self.enabled = True
+        if not self._hooked:
+            # Audit hooks cannot be removed; disable() turns this one into a no-op
+            sys.addaudithook(self._audit)
+            self._hooked = True
+        first, second = read_proc_io(), read_proc_io()
+        self._overhead = {key: second[key] - first[key] for key in second}
+        self._baseline = self.sample()
+        self._start = time.perf_counter()
+
+    def disable(self) -> None:
+        """Stop counting; the collected phases and counters are kept."""
+        self.enabled = False
+
+    def _audit(self, event: str, args: tuple) -> None:
+        if not self.enabled:
+            return
+        if event == "open" and args[0] != PROC_IO_FILE:
+            self.count("files_opened")
+        elif event in ("os.scandir", "os.listdir"):
+            self.count("dirs_listed")
+
+    def count(self, counter: str, n: int = 1) -> None:
+        """Add n to a counter, if profiling."""
+        if self.enabled:
+            with self._lock:
+                self.counters[counter] += n
+
+    def sample(self) -> dict[str, int]:
+        """Return the counters and I/O totals so far."""
+        with self._lock:
+            values = dict(self.counters)
+            self._samples += 1
+            samples = self._samples
+        for key, value in read_proc_io().items():
+            values[key] = value - self._overhead.get(key, 0) * samples
+        return values
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as (part of) the named phase."""
+        if not self.enabled:
+            yield
+            return
+        stats = self.phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+        before = self.sample()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            stats["calls"] += 1
+            for key, value in self.sample().items():
+                stats[key] = stats.get(key, 0) + value - before.get(key, 0)
+
+    def to_json(self) -> dict:
+        """Return the totals and phases as plain data."""
+        totals = {key: value - self._baseline.get(key, 0) for key, value in self.sample().items()}
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "totals": totals,
+            "phases": [
+                {"name": name, "calls": stats["calls"], "ms": round(stats["seconds"] * 1000, 3),
+                 **{key: value for key, value in stats.items() if key not in ("calls", "seconds")}}
+                for name, stats in self.phases.items()
+            ],
+        }
+
+
+def read_proc_io() -> dict[str, int]:
+    """Return this process's I/O totals from /proc/self/io ({} where unavailable)."""
+    try:
+        with open(PROC_IO_FILE, "rb") as f:
+            text = f.read().decode("ascii")
+    except OSError:
+        return {}
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key in PROC_IO_FIELDS:
+            values[PROC_IO_FIELDS[key]] = int(value)
+    return values
+
+
+PROFILE = Profile()
+
+
+# === Utility Functions ===
+
+def get_file_stats(path: Path, index: DiscoveryIndex | None = None) -> dict:
+    """Get file statistics if the file exists."""
+    stat = index.stat(path) if index else stat_safe(path)
+    if stat is None:
+        return {"exists": False, "path": str(path)}
+
+    return {
+        "exists": True,
+        "path": str(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M"),
+        "size_human": format_size(stat.st_size),
+    }
+
+
+def stat_safe(path: Path) -> os.stat_result | None:
+    """Stat a path, returning None if it does not exist or is inaccessible."""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def format_size(size: int) -> str:
+    """Format file size in human-readable form."""
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def get_preview(content: str, lines: int = PREVIEW_LINES) -> str:
+    """Get first N lines of content as preview."""
+    content_lines = content.split("\n")
+    preview = "\n".join(content_lines[:lines])
+    if len(content_lines) > lines:
+        preview += f"\n... ({len(content_lines) - lines} more lines)"
+    return preview
+
+
+def extract_frontmatter(content: str) -> tuple[dict | None, str]:
+    """Extract YAML frontmatter from markdown content."""
+    if not content.startswith("---"):
+        return None, content
+
+    # Find the closing --- (a line of "---" and trailing whitespace) in
+    # place, without slicing the content
+    start = 3
+    while True:
+        index = content.find("\n---", start)
+        if index < 0:
+            return None, content
+        end = index + 4
+        while end < len(content) and content[end].isspace():
+            end += 1
+        newline = content.rfind("\n", index + 4, end)
+        if newline >= 0:
+            break
+        start = index + 1
+
+    frontmatter, _ = parse_frontmatter(content[4:index].split("\n"))
+    return frontmatter, content[newline + 1:]
+
+
+def read_context_head(path: Path, lines: int = PREVIEW_LINES, body_only: bool = False) -> dict | None:
+    """Read only a file's frontmatter and first lines, without loading it whole.
+
+    Equivalent to extract_frontmatter() + get_preview() on the full text: the
+    remaining line count for the "... (N more lines)" marker is taken by
+    counting newlines in fixed-size binary chunks, which are never decoded.
+    Frontmatter not closed within FRONTMATTER_MAX_LINES is treated as body.
+    Returns None if the file cannot be read, or {} if it is empty.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = []  # (text, ends_with_newline) for every line read so far
+            eof = False
+
+            def read_line() -> bool:
+                nonlocal eof
+                raw = f.readline()
+                if not raw:
+                    eof = True
+                    return False
+                ended = raw.endswith(b"\n")
+                if not ended:
+                    eof = True
+                text = raw.decode("utf-8")
+                if ended:
+                    text = text[:-2] if text.endswith("\r\n") else text[:-1]
+                head.append((text, ended))
+                return True
+
+            if not read_line():
+                return {}
+
+            frontmatter = None
+            frontmatter_error = None
+            body_start = 0
+            if head[0][0].startswith("---") and head[0][1]:
+                while len(head) <= FRONTMATTER_MAX_LINES and read_line():
+                    text, ended = head[-1]
+                    if ended and text.rstrip() == "---":
+                        fm_lines = [head[0][0][4:]] + [line for line, _ in head[1:-1]]
+                        frontmatter, frontmatter_error = parse_frontmatter(fm_lines, first_line=1)
+                        break
+                if frontmatter is not None:
+                    # The body starts after any whitespace-only lines
+                    body_start = len(head)
+                    while read_line():
+                        text, ended = head[-1]
+                        if text.strip() or not ended:
+                            break
+                        body_start += 1
+
+            start = body_start if body_only else 0
+            while not eof and len(head) < start + lines:
+                read_line()
+
+            text_lines = head[start:]
+            newlines = sum(1 for _, ended in text_lines if ended)
+            if not eof:
+                text_lines = text_lines[:lines]
+                for chunk in iter(lambda: f.read(COUNT_CHUNK_SIZE), b""):
+                    newlines += chunk.count(b"\n")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    # A text with N newlines splits into N + 1 lines
+    total = newlines + 1
+    preview_lines = [text for text, _ in text_lines[:lines]]
+    if len(preview_lines) < lines and total > len(preview_lines):
+        preview_lines.append("")
+    preview = "\n".join(preview_lines)
+    if total > lines:
+        preview += f"\n... ({total - lines} more lines)"
+    return {"frontmatter": frontmatter, "frontmatter_error": frontmatter_error, "preview": preview}
+
+
+def read_file_safe(path: Path) -> str | None:
+    """Safely read file content, returning None on error."""
+    try:
+        return path.read_text(encoding="utf-8")
+    except Exception:
+        return None
+
+
+def load_context_file(path: Path, lines: int = PREVIEW_LINES, body_only: bool = False,
+                      index: DiscoveryIndex | None = None) -> dict | None:
+    """Read a context file and return its frontmatter and preview.
+
+    The preview covers the body after the frontmatter when body_only is set,
+    otherwise the whole file. Returns None if the file cannot be read or is
+    empty. Results are served from PARSE_CACHE while the file is unchanged.
+    """
+    stat = index.stat(path) if index else stat_safe(path)
+    if stat is None:
+        return None
+
+    key = f"{os.path.abspath(path)}|{lines}|{'body' if body_only else 'full'}"
+    cached = PARSE_CACHE.get(key, stat)
+    if cached is not None:
+        return cached or None
+
+    data = read_context_head(path, lines, body_only)
+    if data is None:
+        return None
+    PARSE_CACHE.put(key, stat, data)
+    return data or None
+
+
+def imap_ordered(func, items: list):
+    """Yield func(item) for every item, on a JOBS-sized thread pool when JOBS > 1.
+
+    Results are yielded in input order as soon as each is ready, so report
+    ordering stays deterministic regardless of which file finishes loading
+    first.
+    """
+    if JOBS <= 1 or len(items) <= 1:
+        for item in items:
+            yield func(item)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=JOBS) as executor:
+        yield from executor.map(func, items)
+
+
+def iter_with_previews(records: list[tuple[dict, Path | None, bool]],
+                       index: DiscoveryIndex | None = None, lines: int = PREVIEW_LINES,
+                       body_only: bool = False):
+    """Yield the stats of each (stats, path, with_frontmatter) record once its file is loaded.
+
+    Records without a path (files that were not found) pass through as-is.
+    """
+    def load(record: tuple[dict, Path | None, bool]) -> dict:
+        stats, path, with_frontmatter = record
+        if path is not None:
+            loaded = load_context_file(path, lines, body_only, index)
+            if with_frontmatter:
+                stats["frontmatter"] = loaded["frontmatter"] if loaded else None
+                stats["frontmatter_error"] = loaded["frontmatter_error"] if loaded else None
+            stats["preview"] = loaded["preview"] if loaded else None
+        return stats
+
+    yield from imap_ordered(load, records)
+
+
+def load_json_safe(path: Path) -> dict | None:
+    """Safely load JSON file, returning None on error."""
+    try:
+        content = path.read_text(encoding="utf-8")
+        return json.loads(content)
+    except Exception:
+        return None
+
+
+def make_file_link(path: Path) -> str:
+    """Create a clickable file:// link for markdown."""
+    return f"[`{path}`](file://{path.resolve()})"
+
+
+def make_relative_link(path: Path, project_dir: Path) -> str:
+    """Create a relative path display with file link."""
+    try:
+        rel = path.relative_to(project_dir)
+        display = f"./{rel}"
+    except ValueError:
+        display = str(path)
+    return f"[`{display}`](file://{path.resolve()})"
+
+
+def project_key(project_dir: Path) -> str:
+    """Return a unique, readable file name stem for a project directory."""
+    digest = hashlib.sha1(str(project_dir).encode("utf-8")).hexdigest()[:8]
+    return f"{project_dir.name or 'root'}-{digest}"
+
+
+# === Discovery Index ===
+
+class DiscoveryIndex:
+    """In-memory index of directory listings and file stats.
+
+    Each directory is listed at most once with ``os.scandir`` and the
+    ``DirEntry`` stat results are reused, so discovering a context file costs
+    a single ``stat()`` instead of repeated ``exists()``/``stat()`` calls.
+    Paths outside the scanned directories (enterprise files, parent
+    CLAUDE.md files) fall back to a memoized ``os.stat``, and parsed JSON
+    settings files are memoized too.
+    """
+
+    def __init__(self):
+        self._listings: dict[str, dict[str, os.DirEntry] | None] = {}
+        self._stats: dict[str, os.stat_result | None] = {}
+        self._json: dict[str, dict | None] = {}
+
+    def copy(self) -> DiscoveryIndex:
+        """Return an index that starts from this one's scans but is extended separately."""
+        index = DiscoveryIndex()
+        index._listings = dict(self._listings)
+        index._stats = dict(self._stats)
+        index._json = dict(self._json)
+        return index
+
+    def snapshot(self) -> DiscoveryIndex:
+        """Return a picklable copy, with every directory entry's results resolved."""
+        index = self.copy()
+        index._listings = {
+            key: {name: _ResolvedEntry(entry) for name, entry in entries.items()}
+            if entries is not None else None
+            for key, entries in self._listings.items()
+        }
+        return index
+
+    def _entries(self, directory: Path) -> dict[str, os.DirEntry] | None:
+        """Return the entries of a directory by name, scanning it on first use."""
+        key = str(directory)
+        if key not in self._listings:
+            try:
+                with os.scandir(directory) as it:
+                    self._listings[key] = {entry.name: entry for entry in it}
+            except OSError:
+                self._listings[key] = None
+        return self._listings[key]
+
+    def scan(self, directory: Path, recursive: bool = False) -> None:
+        """Pre-scan a directory, optionally with all of its subdirectories."""
+        entries = self._entries(directory)
+        if recursive and entries:
+            for entry in entries.values():
+                if entry.is_dir(follow_symlinks=False):
+                    self.scan(directory / entry.name, recursive=True)
+
+    def stat(self, path: Path) -> os.stat_result | None:
+        """Stat a path (following symlinks), or None if it does not exist."""
+        key = str(path)
+        if key in self._stats:
+            return self._stats[key]
+        parent = str(path.parent)
+        if parent in self._listings:
+            entries = self._listings[parent]
+            entry = entries.get(path.name) if entries else None
+            if entry:
+                PROFILE.count("index_stats")
+            try:
+                stat = entry.stat() if entry else None
+            except OSError:
+                stat = None
+        else:
+            PROFILE.count("index_stats")
+            stat = stat_safe(path)
+        self._stats[key] = stat
+        return stat
+
+    def exists(self, path: Path) -> bool:
+        """Check whether a path exists."""
+        return self.stat(path) is not None
+
+    def load_json(self, path: Path) -> dict | None:
+        """Load a JSON file once, returning None if it is missing or invalid."""
+        key = str(path)
+        if key not in self._json:
+            with PROFILE.phase(f"load_json {path.name}"):
+                self._json[key] = load_json_safe(path) if self.exists(path) else None
+        return self._json[key]
+
+    def load_mcp_settings(self, path: Path) -> dict | None:
+        """Load the MCP settings of a ~/.claude.json file once.
+
+        Only the top-level and per-project "mcpServers" are extracted (see
+        claude_json.py), and the result is kept in PARSE_CACHE, so the file
+        is only scanned again after it changes. The counts --summary needs
+        are also written to its own stat-keyed file (see summary.py).
+        Returns None if the file is missing or malformed.
+        """
+        from claude_json import read_mcp_servers
+
+        key = f"{path}|mcp"
+        if key not in self._json:
+            stat = self.stat(path)
+            data = PARSE_CACHE.get(key, stat) if stat else {}
+            if data is None:
+                with PROFILE.phase(f"load_mcp_settings {path.name}"):
+                    data = read_mcp_servers(path) or {}
+                PARSE_CACHE.put(key, stat, data)
+                if PARSE_CACHE.enabled and path == USER_CLAUDE_JSON:
+                    write_mcp_summary(stat, data)
+            self._json[key] = data or None
+        return self._json[key]
+
+    def subdirs(self, directory: Path) -> list[Path]:
+        """List the subdirectories of a directory (following symlinks), sorted."""
+        entries = self._entries(directory) or {}
+        return sorted(directory / name for name, entry in entries.items() if _entry_is_dir(entry))
+
+    def files(self, directory: Path, suffix: str, recursive: bool = False) -> list[Path]:
+        """List files ending in suffix, like sorted(glob/rglob("*" + suffix)).
+
+        Recursion does not descend into symlinked directories, matching
+        ``Path.rglob``.
+        """
+        found = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            for name, entry in (self._entries(current) or {}).items():
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(current / name)
+                elif name.endswith(suffix) and _entry_is_file(entry):
+                    found.append(current / name)
+        return sorted(found)
+
+
+def _entry_is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _entry_is_file(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+class _ResolvedEntry:
+    """A picklable stand-in for an os.DirEntry, with its type and stat resolved."""
+
+    def __init__(self, entry: os.DirEntry):
+        self.name = entry.name
+        self._is_dir = _entry_is_dir(entry)
+        self._is_file = _entry_is_file(entry)
+        try:
+            self._is_dir_no_follow = entry.is_dir(follow_symlinks=False)
+            self._stat = entry.stat()
+        except OSError:
+            self._is_dir_no_follow = False
+            self._stat = None
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._is_dir if follow_symlinks else self._is_dir_no_follow
+
+    def is_file(self) -> bool:
+        return self._is_file
+
+    def stat(self) -> os.stat_result:
+        if self._stat is None:
+            raise FileNotFoundError(self.name)
+        return self._stat
+
+
+def build_index(project_dir: Path, base: DiscoveryIndex | None = None) -> DiscoveryIndex:
+    """Scan ~/.claude and <project>/.claude once and return the index.
+
+    With a base index (see scan_shared_scopes), its scans are reused and
+    only the project's directories are listed.
+    """
+    index = base.copy() if base else DiscoveryIndex()
+    project_claude_dir = project_dir / context_paths.PROJECT_CLAUDE_DIR
+    with PROFILE.phase("build_index"):
+        for root in (USER_CLAUDE_DIR, project_claude_dir):
+            index.scan(root)
+            index.scan(root / context_paths.RULES_DIR, recursive=True)
+            index.scan(root / context_paths.COMMANDS_DIR, recursive=True)
+            index.scan(root / context_paths.AGENTS_DIR)
+            index.scan(root / context_paths.SKILLS_DIR)
+        index.scan(project_dir)
+    return index
+
+
+def scan_shared_scopes(projects: list[Path] = ()) -> DiscoveryIndex:
+    """Scan the user and enterprise scopes, which are the same for every project.
+
+    The parent directories of projects are looked up for CLAUDE.md files
+    too, once each, however many projects they contain. The returned index
+    is a picklable snapshot meant as the base index of build_index() for
+    many projects.
+    """
+    index = DiscoveryIndex()
+    for directory in {parent for project_dir in projects for parent in project_dir.resolve().parents}:
+        find_ancestor_claude_files(directory, index)
+
+    index.scan(USER_CLAUDE_DIR)
+    index.scan(USER_RULES_DIR, recursive=True)
+    index.scan(USER_COMMANDS_DIR, recursive=True)
+    index.scan(USER_AGENTS_DIR)
+    for skill_dir in index.subdirs(USER_SKILLS_DIR):
+        index.scan(skill_dir)
+    index.load_json(USER_SETTINGS)
+    index.load_mcp_settings(USER_CLAUDE_JSON)
+
+    enterprise_path = get_enterprise_claude_path()
+    if enterprise_path:
+        index.stat(enterprise_path)
+    enterprise_dir = get_enterprise_settings_dir()
+    if enterprise_dir:
+        index.load_json(enterprise_dir / context_paths.ENTERPRISE_SETTINGS)
+        index.load_json(enterprise_dir / context_paths.ENTERPRISE_MCP)
+    return index.snapshot()
+
+
+# === Discovery Functions ===
+
+def iter_memory_files(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield all CLAUDE.md files in the hierarchy, in load order, as they are read."""
+    index = index or build_index(project_dir)
+    memory_files = []
+
+    # Enterprise
+    with PROFILE.phase("find_memory_files/enterprise"):
+        enterprise_path = get_enterprise_claude_path()
+        if enterprise_path:
+            stats = get_file_stats(enterprise_path, index)
+            stats["scope"] = "Enterprise Policy"
+            stats["description"] = "Organization-wide instructions (IT-managed)"
+            memory_files.append((stats, enterprise_path if stats["exists"] else None, False))
+
+    # User
+    stats = get_file_stats(USER_CLAUDE_MD, index)
+    stats["scope"] = "User Memory"
+    stats["description"] = "Personal preferences for all projects"
+    memory_files.append((stats, USER_CLAUDE_MD if stats["exists"] else None, False))
+
+    # User rules
+    with PROFILE.phase("find_memory_files/rules"):
+        user_rules = index.files(USER_RULES_DIR, context_paths.CONTEXT_SUFFIX, recursive=True)
+    for rule_file in user_rules:
+        stats = get_file_stats(rule_file, index)
+        stats["scope"] = "User Rules"
+        rel_path = rule_file.relative_to(USER_RULES_DIR)
+        stats["description"] = f"User rule: {rel_path}"
+        memory_files.append((stats, rule_file, True))
+
+    # Project hierarchy (walk up from project_dir)
+    # Track files we've already added (by device and inode) to avoid duplicates
+    user_stat = index.stat(USER_CLAUDE_MD)
+    seen_files = {(user_stat.st_dev, user_stat.st_ino)} if user_stat else set()
+
+    with PROFILE.phase("find_memory_files/ancestors"):
+        current = project_dir.resolve()
+        project_claude_files = []
+        while current != current.parent:
+            # Check both ./CLAUDE.md and ./.claude/CLAUDE.md
+            for claude_path in find_ancestor_claude_files(current, index):
+                stat = index.stat(claude_path)
+                if stat is None or (stat.st_dev, stat.st_ino) in seen_files:
+                    continue
+                seen_files.add((stat.st_dev, stat.st_ino))
+                stats = get_file_stats(claude_path, index)
+                stats["scope"] = "Project Memory"
+                try:
+                    rel = claude_path.relative_to(project_dir)
+                    stats["description"] = f"Project instructions: ./{rel}"
+                except ValueError:
+                    stats["description"] = f"Parent project instructions: {claude_path}"
+                project_claude_files.append((stats, claude_path, False))
+            current = current.parent
+
+    # Add in reverse order (root to local) for proper hierarchy display
+    memory_files.extend(reversed(project_claude_files))
+
+    # Project rules
+    project_rules_dir = project_dir / context_paths.PROJECT_CLAUDE_DIR / context_paths.RULES_DIR
+    with PROFILE.phase("find_memory_files/rules"):
+        project_rules = index.files(project_rules_dir, context_paths.CONTEXT_SUFFIX, recursive=True)
+    for rule_file in project_rules:
+        stats = get_file_stats(rule_file, index)
+        stats["scope"] = "Project Rules"
+        rel_path = rule_file.relative_to(project_rules_dir)
+        stats["description"] = f"Project rule: {rel_path}"
+        memory_files.append((stats, rule_file, True))
+
+    # Local CLAUDE.md
+    local_claude = project_dir / context_paths.LOCAL_MEMORY_FILE
+    stats = get_file_stats(local_claude, index)
+    stats["scope"] = "Local Memory"
+    stats["description"] = "Personal project-specific preferences (gitignored)"
+    memory_files.append((stats, local_claude if stats["exists"] else None, False))
+
+    yield from iter_with_previews(memory_files, index)
+
+
+def find_ancestor_claude_files(directory: Path, index: DiscoveryIndex) -> list[Path]:
+    """Return the CLAUDE.md and .claude/CLAUDE.md files present in directory.
+
+    Results, negative ones included, are kept in PARSE_CACHE keyed by the
+    directory's mtime (and that of its .claude/ subdirectory, if any), so
+    an unchanged ancestor without memory files costs one memoized stat()
+    instead of one per candidate file, across runs and across projects
+    sharing the ancestor. Files found are also checked by their own mtime
+    and size, and dangling symlinks by whether their target appeared, since
+    a symlink's target can change without its directory's mtime moving.
+    Directories modified within RACY_MTIME_NS are not memoized.
+    """
+    stat = index.stat(directory)
+    if stat is None:
+        return []
+
+    key = f"{directory}|ancestor"
+    cached = PARSE_CACHE.get(key, stat)
+    if cached is not None and ancestor_unchanged(directory, cached, index):
+        return [directory / name for name, mtime_ns, _ in cached["files"] if mtime_ns is not None]
+
+    claude_stat = index.stat(directory / context_paths.PROJECT_CLAUDE_DIR)
+    candidates = ANCESTOR_MEMORY_FILES if claude_stat else ANCESTOR_MEMORY_FILES[:1]
+    files = []  # [name, mtime_ns, size], with None for a dangling symlink
+    for name in candidates:
+        file_stat = index.stat(directory / name)
+        if file_stat is not None:
+            files.append([name, file_stat.st_mtime_ns, file_stat.st_size])
+        elif os.path.islink(directory / name):
+            files.append([name, None, None])
+    now = time.time_ns()
+    if not any(now - dir_stat.st_mtime_ns < RACY_MTIME_NS for dir_stat in (stat, claude_stat) if dir_stat):
+        PARSE_CACHE.put(key, stat, {
+            "claude_mtime_ns": claude_stat.st_mtime_ns if claude_stat else None,
+            "files": files,
+        })
+    return [directory / name for name, mtime_ns, _ in files if mtime_ns is not None]
+
+
+def ancestor_unchanged(directory: Path, cached: dict, index: DiscoveryIndex) -> bool:
+    """Check a memoized ancestor's .claude/ mtime and the mtime and size of its memory files."""
+    if cached["claude_mtime_ns"] is not None:
+        claude_stat = index.stat(directory / context_paths.PROJECT_CLAUDE_DIR)
+        if claude_stat is None or claude_stat.st_mtime_ns != cached["claude_mtime_ns"]:
+            return False
+    for name, mtime_ns, size in cached["files"]:
+        file_stat = index.stat(directory / name)
+        if file_stat is None:
+            if mtime_ns is not None:
+                return False
+        elif (file_stat.st_mtime_ns, file_stat.st_size) != (mtime_ns, size):
+            return False
+    return True
+
+
+def find_memory_files(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find all CLAUDE.md files in the hierarchy."""
+    return list(iter_memory_files(project_dir, index))
+
+
+def iter_skills(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield all skills (user and project level) as they are read."""
+    index = index or build_index(project_dir)
+    skills = []
+
+    for skills_dir, scope in [
+        (USER_SKILLS_DIR, "User"),
+        (project_dir / context_paths.PROJECT_CLAUDE_DIR / context_paths.SKILLS_DIR, "Project"),
+    ]:
+        for skill_dir in index.subdirs(skills_dir):
+            skill_md = skill_dir / context_paths.SKILL_FILE
+            if not index.exists(skill_md):
+                continue
+            stats = get_file_stats(skill_md, index)
+            stats["scope"] = scope
+            stats["name"] = skill_dir.name
+            skills.append((stats, skill_md, True))
+
+    yield from iter_with_previews(skills, index, lines=10, body_only=True)
+
+
+def find_skills(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find all skills (user and project level)."""
+    return list(iter_skills(project_dir, index))
+
+
+def iter_hooks(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield hooks from all settings files as they are read."""
+    index = index or build_index(project_dir)
+
+    settings_files = [
+        (USER_SETTINGS, "User"),
+        (project_dir / context_paths.PROJECT_SETTINGS_FILES[0], "Project"),
+        (project_dir / context_paths.PROJECT_SETTINGS_FILES[1], "Local"),
+    ]
+
+    # Enterprise settings
+    enterprise_dir = get_enterprise_settings_dir()
+    if enterprise_dir:
+        settings_files.insert(0, (enterprise_dir / context_paths.ENTERPRISE_SETTINGS, "Enterprise"))
+
+    for settings_path, scope in settings_files:
+        data = index.load_json(settings_path)
+        if not data or "hooks" not in data:
+            continue
+
+        yield {
+            "scope": scope,
+            "path": str(settings_path),
+            "hooks": data["hooks"],
+        }
+
+
+def find_hooks(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find hooks from all settings files."""
+    return list(iter_hooks(project_dir, index))
+
+
+def iter_mcp_servers(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield MCP server configurations as they are read."""
+    index = index or build_index(project_dir)
+
+    # User MCP config (~/.claude.json)
+    settings = index.load_mcp_settings(USER_CLAUDE_JSON)
+    if settings and "mcpServers" in settings:
+        yield {
+            "scope": "User",
+            "path": str(USER_CLAUDE_JSON),
+            "servers": settings["mcpServers"],
+        }
+
+    # Project MCP config (.mcp.json)
+    project_mcp = project_dir / context_paths.PROJECT_MCP_FILE
+    data = index.load_json(project_mcp)
+    if data and "mcpServers" in data:
+        yield {
+            "scope": "Project",
+            "path": str(project_mcp),
+            "servers": data["mcpServers"],
+        }
+    elif data:
+        # Might be top-level servers
+        yield {
+            "scope": "Project",
+            "path": str(project_mcp),
+            "servers": data,
+        }
+
+    # Local MCP config (this project's entry in ~/.claude.json)
+    local_servers = project_mcp_servers(settings, project_dir)
+    if local_servers:
+        yield {
+            "scope": "Local",
+            "path": str(USER_CLAUDE_JSON),
+            "servers": local_servers,
+        }
+
+    # Enterprise MCP
+    enterprise_dir = get_enterprise_settings_dir()
+    if enterprise_dir:
+        managed_mcp = enterprise_dir / context_paths.ENTERPRISE_MCP
+        data = index.load_json(managed_mcp)
+        if data:
+            servers = data.get("mcpServers", data)
+            yield {
+                "scope": "Enterprise",
+                "path": str(managed_mcp),
+                "servers": servers,
+            }
+
+
+def project_mcp_servers(settings: dict | None, project_dir: Path) -> dict | None:
+    """Return a project's servers from ~/.claude.json settings, keyed by its path."""
+    projects = settings["projects"] if settings else {}
+    return projects.get(str(project_dir.absolute())) or projects.get(str(project_dir.resolve()))
+
+
+def find_mcp_servers(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find MCP server configurations."""
+    return list(iter_mcp_servers(project_dir, index))
+
+
+def iter_agents(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield custom agents/subagents as they are read."""
+    index = index or build_index(project_dir)
+    agents = []
+
+    for agents_dir, scope in [
+        (USER_AGENTS_DIR, "User"),
+        (project_dir / context_paths.PROJECT_CLAUDE_DIR / context_paths.AGENTS_DIR, "Project"),
+    ]:
+        for agent_file in index.files(agents_dir, context_paths.CONTEXT_SUFFIX):
+            stats = get_file_stats(agent_file, index)
+            stats["scope"] = scope
+            stats["name"] = agent_file.stem
+            agents.append((stats, agent_file, True))
+
+    yield from iter_with_previews(agents, index, lines=10, body_only=True)
+
+
+def find_agents(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find custom agents/subagents."""
+    return list(iter_agents(project_dir, index))
+
+
+def iter_commands(project_dir: Path, index: DiscoveryIndex | None = None) -> Iterator[dict]:
+    """Yield custom slash commands as they are read."""
+    index = index or build_index(project_dir)
+    commands = []
+
+    for commands_dir, scope in [
+        (USER_COMMANDS_DIR, "User"),
+        (project_dir / context_paths.PROJECT_CLAUDE_DIR / context_paths.COMMANDS_DIR, "Project"),
+    ]:
+        for cmd_file in index.files(commands_dir, context_paths.CONTEXT_SUFFIX, recursive=True):
+            stats = get_file_stats(cmd_file, index)
+            stats["scope"] = scope
+            rel_path = cmd_file.relative_to(commands_dir)
+            stats["name"] = f"/{cmd_file.stem}"
+            stats["namespace"] = str(rel_path.parent) if str(rel_path.parent) != "." else None
+            commands.append((stats, cmd_file, True))
+
+    yield from iter_with_previews(commands, index, lines=8, body_only=True)
+
+
+def find_commands(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Find custom slash commands."""
+    return list(iter_commands(project_dir, index))
+
+
+# === Content Deduplication ===
+
+class DuplicateFolder:
+    """Content-hash index that folds identical files into the first one seen.
+
+    Only files whose size matches an earlier file in the same section are
+    hashed (with the cached streaming file_digest()), so unique files are
+    never read for this. A folded record lists the other copies under
+    "duplicates" and how many times Claude loads the content under
+    "loaded_copies".
+    """
+
+    def __init__(self):
+        self._by_size: dict[tuple[str, int], list[dict]] = {}
+
+    def add(self, section: str, record: dict) -> dict | None:
+        """Return the earlier record this one duplicates (folding it in), or None."""
+        if section not in FOLDED_SECTIONS or not record.get("exists") or record.get("size") is None:
+            return None
+        candidates = self._by_size.setdefault((section, record["size"]), [])
+        if candidates:
+            digest = content_digest(record)
+            for original in candidates:
+                if digest is not None and content_digest(original) == digest:
+                    original.setdefault("duplicates", []).append(
+                        {field: record.get(field) for field in DUPLICATE_FIELDS}
+                    )
+                    original["loaded_copies"] = loaded_copies(section, original)
+                    return original
+        candidates.append(record)
+        return None
+
+    def fold(self, section: str, records: list[dict]) -> list[dict]:
+        """Return records without the ones folded into an earlier identical file.
+
+        Every record keeps its place in discovery order under "position", so
+        in_load_order() can put folded copies back where they were found.
+        """
+        folded = []
+        for position, record in enumerate(records):
+            record["position"] = position
+            if self.add(section, record) is None:
+                folded.append(record)
+        return folded
+
+
+FOLDED_SECTIONS = ("memory_files", "skills", "agents", "commands")
+DUPLICATE_FIELDS = ("scope", "path", "name", "namespace", "description", "size", "mtime_ns", "modified", "position")
+
+
+def content_digest(record: dict) -> str | None:
+    """Return (and remember on the record) the SHA-256 of a record's file."""
+    if "sha256" not in record:
+        record["sha256"] = file_digest(Path(record["path"]))
+    return record["sha256"]
+
+
+def expand_duplicates(records: list[dict]) -> Iterator[dict]:
+    """Yield every record, followed by a record for each copy folded into it.
+
+    Copies have "duplicate_of" set to the path of the record they were
+    folded into, as iter_context_records() yields them.
+    """
+    for record in records:
+        yield record
+        for duplicate in record.get("duplicates") or []:
+            yield {**record, **duplicate, "duplicates": None, "loaded_copies": 1, "duplicate_of": record["path"]}
+
+
+def in_load_order(records: list[dict]) -> list[dict]:
+    """Return every record and folded copy, in the order they were found."""
+    return sorted(expand_duplicates(records), key=lambda record: record.get("position", 0))
+
+
+def count_entries(section: str, records: list[dict]) -> int:
+    """Return how many locations a section's records were found at, copies included."""
+    if section == "memory_files":
+        records = [record for record in records if record.get("exists")]
+    return sum(1 + len(record.get("duplicates") or []) for record in records)
+
+
+def loaded_copies(section: str, record: dict) -> int:
+    """Return how many times Claude loads a folded record's content.
+
+    Every copy of a memory file or rule is loaded. Copies of a skill, agent
+    or command are only loaded once per distinct name, since a name defined
+    in several places is used once.
+    """
+    from conflicts import record_name
+
+    copies = list(expand_duplicates([record]))
+    if section == "memory_files":
+        return len(copies)
+    return len({(record_name(section, copy), copy.get("namespace")) for copy in copies})
+
+
+def loaded_tokens(record: dict) -> int:
+    """Return a record's token estimate, @imports included, times the copies of it that are loaded."""
+    return record.get("expanded_tokens", record.get("tokens", 0)) * record.get("loaded_copies", 1)
+
+
+# === Token Estimation ===
+
+MEMORY_SCOPES = {"Enterprise Policy", "User Memory", "Project Memory", "Local Memory"}
+
+
+def describe_for_tokens(record: dict) -> str:
+    """Return the text a skill, agent or command contributes up front.
+
+    Only names and descriptions are loaded at session start; the body is
+    loaded when the skill, agent or command is actually invoked.
+    """
+    fm = record.get("frontmatter") or {}
+    name = fm.get("name", record.get("name", ""))
+    return f"{format_value(name)}: {format_value(fm.get('description', ''))}"
+
+
+def file_token_counts(estimator, memory_files: list[dict]) -> list[int]:
+    """Return the token count of each memory file.
+
+    An exact estimator reads and tokenizes every file, so its counts are kept
+    in PARSE_CACHE per estimator and vocabulary, and a file is only read
+    again after it changes. The heuristic needs only the recorded sizes.
+    """
+    if not estimator.exact:
+        return estimator.count_files([(Path(mem["path"]), mem["size"]) for mem in memory_files])
+    counts = []
+    for mem in memory_files:
+        path = Path(mem["path"])
+        stat = stat_safe(path)
+        key = f"{os.path.abspath(path)}|tokens|{estimator.cache_key}"
+        cached = PARSE_CACHE.get(key, stat) if stat else None
+        if cached is None:
+            [tokens] = estimator.count_files([(path, mem["size"])])
+            cached = {"tokens": tokens}
+            if stat:
+                PARSE_CACHE.put(key, stat, cached)
+        counts.append(cached["tokens"])
+    return counts
+
+
+def attach_token_estimates(estimator, section: str, records: list[dict]) -> None:
+    """Store each record's estimated token contribution on it as "tokens"."""
+    if section == "memory_files":
+        found = [mem for mem in records if mem.get("exists")]
+        for mem, tokens in zip(found, file_token_counts(estimator, found)):
+            mem["tokens"] = tokens
+    elif section in ("skills", "agents", "commands"):
+        counts = estimator.count_many([describe_for_tokens(record) for record in records])
+        for record, tokens in zip(records, counts):
+            record["tokens"] = tokens
+
+
+def attach_copy_tokens(estimator, section: str, records: list[dict]) -> None:
+    """Store token estimates on the copies folded into skills, agents and commands.
+
+    A copy has the same content but may have another name, which is part of
+    what Claude loads; copies of memory files share the original's estimate.
+    """
+    if section not in ("skills", "agents", "commands"):
+        return
+    duplicates = [(duplicate, {**record, **duplicate})
+                  for record in records for duplicate in record.get("duplicates") or []]
+    counts = estimator.count_many([describe_for_tokens(copy) for _, copy in duplicates])
+    for (duplicate, _), tokens in zip(duplicates, counts):
+        duplicate["tokens"] = tokens
+
+
+def load_import_node(path: Path, estimator, index: DiscoveryIndex | None = None) -> dict | None:
+    """Return the size, tokens and @imports of a file, or None if it cannot be read.
+
+    Results are kept in PARSE_CACHE per estimator, so a file imported by
+    many memory files or projects is only read again after it changes.
+    """
+    stat = index.stat(path) if index else stat_safe(path)
+    if stat is None:
+        return None
+
+    key = f"{os.path.abspath(path)}|imports|{estimator.cache_key}"
+    cached = PARSE_CACHE.get(key, stat)
+    if cached is not None:
+        return cached or None
+
+    text = read_file_safe(path)
+    node = {} if text is None else {
+        "size": stat.st_size,
+        "tokens": estimator.count_file_text(text, stat.st_size),
+        "imports": extract_imports(text),
+    }
+    PARSE_CACHE.put(key, stat, node)
+    return node or None
+
+
+def import_resolver(estimator, index: DiscoveryIndex | None = None) -> ImportResolver:
+    """Return an @import resolver sharing loaded files across memory files."""
+    return ImportResolver(lambda path: load_import_node(path, estimator, index), HOME)
+
+
+def attach_imports(resolver: ImportResolver, memory_files: list[dict]) -> None:
+    """Store each memory file's @imports and its size and tokens once they are expanded.
+
+    Must run after attach_token_estimates().
+    """
+    for mem in memory_files:
+        if not mem.get("exists"):
+            continue
+        expanded = resolver.resolve(Path(mem["path"]))
+        mem["imports"] = expanded["imports"]
+        mem["expanded_size"] = mem["size"] + expanded["size"]
+        mem["expanded_tokens"] = mem.get("tokens", 0) + expanded["tokens"]
+
+
+def context_budget(memory_files: list[dict], skills: list[dict], agents: list[dict],
+                   commands: list[dict]) -> list[tuple[str, list[dict], bool]]:
+    """Group sources into budget rows of (label, records, always_loaded)."""
+    found = [mem for mem in memory_files if mem.get("exists")]
+    rules = [mem for mem in found if mem["scope"] not in MEMORY_SCOPES]
+    return [
+        ("Memory files", [mem for mem in found if mem["scope"] in MEMORY_SCOPES], True),
+        ("Rules", [rule for rule in rules if not (rule.get("frontmatter") or {}).get("paths")], True),
+        ("Skill descriptions", skills, True),
+        ("Agent descriptions", agents, True),
+        ("Command descriptions", commands, True),
+        ("Path-scoped rules", [rule for rule in rules if (rule.get("frontmatter") or {}).get("paths")], False),
+    ]
+
+
+def render_budget(estimator, memory_files: list[dict], skills: list[dict], agents: list[dict],
+                  commands: list[dict], context_window: int) -> Iterator[str]:
+    """Render the context budget table with threshold warnings."""
+    approx = "" if estimator.exact else "~"
+    method = estimator.name if estimator.exact else "heuristic, ~4 characters per token"
+    yield "### Context Budget"
+    yield ""
+    yield (f"Estimated tokens loaded at session start ({method}), "
+           f"against a {format_tokens(context_window)}-token context window.")
+    yield ""
+    yield "| Source | Items | Tokens | % of context |"
+    yield "|--------|-------|--------|--------------|"
+
+    warnings = []
+    total_items = total_tokens = 0
+    for label, records, always_loaded in context_budget(memory_files, skills, agents, commands):
+        # Items and tokens both count every loaded copy of a folded record
+        items = sum(record.get("loaded_copies", 1) for record in records)
+        tokens = sum(loaded_tokens(record) for record in records)
+        percent = 100 * tokens / context_window
+        suffix = "" if always_loaded else " *"
+        yield f"| {label}{suffix} | {items} | {approx}{format_tokens(tokens)} | {percent:.1f}% |"
+        if always_loaded:
+            total_items += items
+            total_tokens += tokens
+            if budget_status(percent):
+                warnings.append((label, percent))
+
+    total_percent = 100 * total_tokens / context_window
+    yield f"| **Total** | {total_items} | {approx}{format_tokens(total_tokens)} | {total_percent:.1f}% |"
+    yield ""
+    yield "\\* Path-scoped rules load only when Claude works with matching files and are not in the total."
+    yield ""
+
+    status = budget_status(total_percent)
+    if status == "critical":
+        yield (f"> 🛑 **Critical:** context sources use {total_percent:.1f}% of the context window "
+               "before the conversation starts.")
+        yield ""
+    elif status == "warning":
+        yield (f"> ⚠️ **Warning:** context sources use {total_percent:.1f}% of the context window "
+               "before the conversation starts.")
+        yield ""
+    for label, percent in warnings:
+        yield f"> ⚠️ {label} alone use {percent:.1f}% of the context window."
+        yield ""
+
+
+def format_record_tokens(estimator, record: dict) -> str:
+    """Format a record's token estimate for display."""
+    approx = "" if estimator.exact else "~"
+    text = f"{approx}{format_tokens(record.get('tokens', 0))}"
+    copies = record.get("loaded_copies", 1)
+    if copies > 1:
+        text += f" × {copies} copies loaded"
+    return text
+
+
+def render_copy(record: dict) -> Iterator[str]:
+    """Render a copy folded into an identical file, which is shown in full."""
+    yield f"**Path:** [{record['path']}](file://{record['path']})"
+    original = record["duplicate_of"]
+    yield f"**Identical to:** [{original}](file://{original}) (tokens and preview shown there)"
+    yield ""
+
+
+def render_duplicates(record: dict) -> Iterator[str]:
+    """Render the locations of identical copies folded into a record."""
+    duplicates = record.get("duplicates")
+    if not duplicates:
+        return
+    yield f"**Identical copies:** {len(duplicates)}"
+    for duplicate in duplicates:
+        yield f"- {duplicate['scope']}: [{duplicate['path']}](file://{duplicate['path']})"
+
+
+def render_imports(estimator, mem: dict) -> Iterator[str]:
+    """Render a memory file's @imports as a tree, with its expanded size and tokens."""
+    imports = mem.get("imports")
+    if not imports:
+        return
+    approx = "" if estimator.exact else "~"
+    expanded = sum(1 for item in imports if item["status"] == "ok")
+    yield (f"**With imports:** {approx}{format_tokens(mem['expanded_tokens'])} tokens, "
+           f"{format_size(mem['expanded_size'])} ({expanded} imported file{'' if expanded == 1 else 's'})")
+    for item in imports:
+        indent = "  " * (item["depth"] - 1)
+        path = item["path"]
+        if item["status"] == "ok":
+            yield f"{indent}- [{path}](file://{path}) ({approx}{format_tokens(item['tokens'])} tokens)"
+        else:
+            yield f"{indent}- `{path}`: {IMPORT_STATUSES[item['status']]}"
+
+
+# === Report Generation ===
+
+# Report sections in display order, keyed like the collect_context() result
+SECTIONS = ("memory_files", "skills", "hooks", "mcp_servers", "agents", "commands")
+
+
+def collect_context(project_dir: Path, estimator=None, index: DiscoveryIndex | None = None,
+                    sections: tuple[str, ...] = SECTIONS) -> dict:
+    """Run the discovery functions for the given sections.
+
+    Returns a dict mapping each section name to its records, with token
+    estimates attached and identical files folded together. All sections
+    share one scan of the context directories.
+    """
+    estimator = estimator or load_estimator()
+    index = index or build_index(project_dir)
+    folder = DuplicateFolder()
+    context = {}
+    for name in sections:
+        with PROFILE.phase(f"find_{name}"):
+            context[name] = folder.fold(name, SECTION_FINDERS[name](project_dir, index))
+    with PROFILE.phase("token_estimates"):
+        for name, records in context.items():
+            attach_token_estimates(estimator, name, records)
+            attach_copy_tokens(estimator, name, records)
+    if "memory_files" in context:
+        with PROFILE.phase("imports"):
+            attach_imports(import_resolver(estimator, index), context["memory_files"])
+    return context
+
+
+def render_header(project_dir: Path) -> Iterator[str]:
+    """Render the report title block."""
+    yield "# Context Introspection Report"
+    yield ""
+    yield f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"**Project:** `{project_dir}`"
+    yield f"**Platform:** {platform.system()}"
+    yield ""
+
+
+def render_summary(context: dict, estimator, context_window: int = DEFAULT_CONTEXT_WINDOW) -> Iterator[str]:
+    """Render the summary counts and context budget."""
+    memory_files = context["memory_files"]
+    skills = context["skills"]
+    agents = context["agents"]
+    commands = context["commands"]
+
+    yield "## Summary"
+    yield ""
+    yield from render_counts({name: count_entries(name, records) for name, records in context.items()})
+    yield ""
+    yield from render_budget(estimator, memory_files, skills, agents, commands, context_window)
+
+
+def render_memory_files(memory_files: list[dict], estimator) -> Iterator[str]:
+    """Render the memory files section."""
+    yield "---"
+    yield ""
+    yield "## Memory Files (CLAUDE.md)"
+    yield ""
+    yield "Memory files are loaded in order from enterprise → user → project → local."
+    yield "Higher specificity takes precedence."
+    yield ""
+
+    for mem in in_load_order(memory_files):
+        yield f"### {mem['scope']}"
+        yield ""
+        if mem.get("duplicate_of"):
+            yield from render_copy(mem)
+            continue
+
+        path = Path(mem["path"])
+        if mem.get("exists"):
+            yield f"**Path:** [{path}](file://{path})"
+            yield f"**Status:** Found ({mem['size_human']}, modified {mem['modified']})"
+            yield f"**Tokens:** {format_record_tokens(estimator, mem)}"
+            yield from render_imports(estimator, mem)
+            yield from render_duplicates(mem)
+        else:
+            yield f"**Path:** `{path}`"
+            yield f"**Status:** Not found"
+
+        if mem.get("description"):
+            yield f"**Purpose:** {mem['description']}"
+
+        if mem.get("frontmatter"):
+            fm = mem["frontmatter"]
+            if fm.get("paths"):
+                yield f"**Path filter:** `{format_value(fm['paths'])}`"
+        if mem.get("frontmatter_error"):
+            yield f"**Frontmatter error:** {mem['frontmatter_error']}"
+
+        if mem.get("preview"):
+            yield ""
+            yield "<details>"
+            yield "<summary>Preview</summary>"
+            yield ""
+            yield "```markdown"
+            yield mem["preview"]
+            yield "```"
+            yield ""
+            yield "</details>"
+
+        yield ""
+
+
+def render_skills(skills: list[dict], estimator) -> Iterator[str]:
+    """Render the skills section."""
+    yield "---"
+    yield ""
+    yield "## Skills"
+    yield ""
+
+    if skills:
+        yield "Skills are auto-invoked by Claude when requests match their descriptions."
+        yield ""
+
+        for skill in in_load_order(skills):
+            fm = skill.get("frontmatter", {}) or {}
+            name = format_value(fm.get("name", skill.get("name", "unknown")))
+            desc = format_value(fm.get("description", "No description"))
+
+            yield f"### {name} ({skill['scope']})"
+            yield ""
+            if skill.get("duplicate_of"):
+                yield from render_copy(skill)
+                continue
+            yield f"**Path:** [{skill['path']}](file://{skill['path']})"
+            yield f"**Description:** {desc}"
+            yield f"**Description tokens:** {format_record_tokens(estimator, skill)}"
+            yield from render_duplicates(skill)
+            if skill.get("frontmatter_error"):
+                yield f"**Frontmatter error:** {skill['frontmatter_error']}"
+
+            if fm.get("allowed-tools"):
+                yield f"**Allowed tools:** `{format_value(fm['allowed-tools'])}`"
+            if fm.get("model"):
+                yield f"**Model:** `{format_value(fm['model'])}`"
+
+            if skill.get("preview"):
+                yield ""
+                yield "<details>"
+                yield "<summary>Instructions preview</summary>"
+                yield ""
+                yield "```markdown"
+                yield skill["preview"]
+                yield "```"
+                yield ""
+                yield "</details>"
+
+            yield ""
+    else:
+        yield "*No skills found.*"
+        yield ""
+        yield "Skills location:"
+        yield f"- User: `~/.claude/skills/*/SKILL.md`"
+        yield f"- Project: `.claude/skills/*/SKILL.md`"
+        yield ""
+
+
+def render_hooks(hooks: list[dict], estimator=None) -> Iterator[str]:
+    """Render the hooks section."""
+    yield "---"
+    yield ""
+    yield "## Hooks"
+    yield ""
+
+    if hooks:
+        yield "Hooks run commands in response to Claude Code events."
+        yield ""
+
+        for hook_source in hooks:
+            yield f"### {hook_source['scope']} Hooks"
+            yield ""
+            yield f"**Source:** [{hook_source['path']}](file://{hook_source['path']})"
+            yield ""
+
+            yield "```json"
+            yield json.dumps(hook_source["hooks"], indent=2)
+            yield "```"
+            yield ""
+    else:
+        yield "*No hooks configured.*"
+        yield ""
+        yield "Hooks are configured in `settings.json` under the `hooks` key."
+        yield ""
+
+
+def render_mcp_servers(mcp_servers: list[dict], estimator=None) -> Iterator[str]:
+    """Render the MCP servers section."""
+    yield "---"
+    yield ""
+    yield "## MCP Servers"
+    yield ""
+
+    if mcp_servers:
+        yield "MCP servers provide additional tools and data sources."
+        yield ""
+
+        for mcp_source in mcp_servers:
+            yield f"### {mcp_source['scope']} MCP Servers"
+            yield ""
+            yield f"**Source:** [{mcp_source['path']}](file://{mcp_source['path']})"
+            yield ""
+
+            servers = mcp_source.get("servers", {})
+            if isinstance(servers, dict):
+                for name, config in servers.items():
+                    yield f"**{name}**"
+                    if isinstance(config, dict):
+                        if config.get("type"):
+                            yield f"- Type: `{config['type']}`"
+                        if config.get("url"):
+                            yield f"- URL: `{config['url']}`"
+                        if config.get("command"):
+                            yield f"- Command: `{config['command']}`"
+                    yield ""
+    else:
+        yield "*No MCP servers configured.*"
+        yield ""
+        yield "MCP servers location:"
+        yield f"- User: `~/.claude.json` (mcpServers key)"
+        yield f"- Project: `.mcp.json`"
+        yield ""
+
+
+def render_agents(agents: list[dict], estimator) -> Iterator[str]:
+    """Render the custom agents section."""
+    yield "---"
+    yield ""
+    yield "## Custom Agents"
+    yield ""
+
+    if agents:
+        yield "Custom agents are specialized AI assistants for specific tasks."
+        yield ""
+
+        for agent in in_load_order(agents):
+            fm = agent.get("frontmatter", {}) or {}
+            name = format_value(fm.get("name", agent.get("name", "unknown")))
+            desc = format_value(fm.get("description", "No description"))
+
+            yield f"### {name} ({agent['scope']})"
+            yield ""
+            if agent.get("duplicate_of"):
+                yield from render_copy(agent)
+                continue
+            yield f"**Path:** [{agent['path']}](file://{agent['path']})"
+            yield f"**Description:** {desc}"
+            yield f"**Description tokens:** {format_record_tokens(estimator, agent)}"
+            yield from render_duplicates(agent)
+            if agent.get("frontmatter_error"):
+                yield f"**Frontmatter error:** {agent['frontmatter_error']}"
+
+            if fm.get("tools"):
+                yield f"**Tools:** `{format_value(fm['tools'])}`"
+            if fm.get("model"):
+                yield f"**Model:** `{format_value(fm['model'])}`"
+
+            if agent.get("preview"):
+                yield ""
+                yield "<details>"
+                yield "<summary>System prompt preview</summary>"
+                yield ""
+                yield "```markdown"
+                yield agent["preview"]
+                yield "```"
+                yield ""
+                yield "</details>"
+
+            yield ""
+    else:
+        yield "*No custom agents found.*"
+        yield ""
+        yield "Agents location:"
+        yield f"- User: `~/.claude/agents/*.md`"
+        yield f"- Project: `.claude/agents/*.md`"
+        yield ""
+
+
+def render_commands(commands: list[dict], estimator) -> Iterator[str]:
+    """Render the custom commands section."""
+    yield "---"
+    yield ""
+    yield "## Custom Commands"
+    yield ""
+
+    if commands:
+        yield "Custom slash commands for frequently used prompts."
+        yield ""
+
+        for cmd in in_load_order(commands):
+            fm = cmd.get("frontmatter", {}) or {}
+            name = cmd.get("name", "/unknown")
+            namespace = cmd.get("namespace")
+            desc = format_value(fm.get("description", "No description"))
+
+            scope_display = f"{cmd['scope']}"
+            if namespace:
+                scope_display += f":{namespace}"
+
+            yield f"### {name} ({scope_display})"
+            yield ""
+            if cmd.get("duplicate_of"):
+                yield from render_copy(cmd)
+                continue
+            yield f"**Path:** [{cmd['path']}](file://{cmd['path']})"
+            yield f"**Description:** {desc}"
+            yield f"**Description tokens:** {format_record_tokens(estimator, cmd)}"
+            yield from render_duplicates(cmd)
+            if cmd.get("frontmatter_error"):
+                yield f"**Frontmatter error:** {cmd['frontmatter_error']}"
+
+            if fm.get("allowed-tools"):
+                yield f"**Allowed tools:** `{format_value(fm['allowed-tools'])}`"
+            if fm.get("model"):
+                yield f"**Model:** `{format_value(fm['model'])}`"
+            if fm.get("argument-hint"):
+                yield f"**Arguments:** `{format_value(fm['argument-hint'])}`"
+
+            if cmd.get("preview"):
+                yield ""
+                yield "<details>"
+                yield "<summary>Command preview</summary>"
+                yield ""
+                yield "```markdown"
+                yield cmd["preview"]
+                yield "```"
+                yield ""
+                yield "</details>"
+
+            yield ""
+    else:
+        yield "*No custom commands found.*"
+        yield ""
+        yield "Commands location:"
+        yield f"- User: `~/.claude/commands/*.md`"
+        yield f"- Project: `.claude/commands/*.md`"
+        yield ""
+
+
+def rule_signatures(memory_files: list[dict]) -> dict[str, list[int]]:
+    """Return MinHash signatures of the existing memory files, by path.
+
+    Signatures are kept in PARSE_CACHE, so unchanged files are not re-read.
+    """
+    from conflicts import minhash_signature
+
+    signatures = {}
+    for mem in memory_files:
+        if not mem.get("exists"):
+            continue
+        path = mem["path"]
+        stat = stat_safe(Path(path))
+        if stat is None:
+            continue
+        key = f"{os.path.abspath(path)}|minhash"
+        cached = PARSE_CACHE.get(key, stat)
+        if cached is None:
+            content = read_file_safe(Path(path))
+            cached = {"signature": minhash_signature(content) if content else []}
+            PARSE_CACHE.put(key, stat, cached)
+        signatures[path] = cached["signature"]
+    return signatures
+
+
+def find_context_conflicts(context: dict) -> list[dict]:
+    """Detect shadowed definitions, duplicate hooks and near-duplicate rules."""
+    from conflicts import detect_conflicts
+
+    expanded = {name: list(expand_duplicates(records)) for name, records in context.items()}
+    expanded["memory_files"] = context["memory_files"]
+    return detect_conflicts(expanded, rule_signatures(context["memory_files"]))
+
+
+def render_conflicts(conflicts: list[dict]) -> Iterator[str]:
+    """Render the conflicts section."""
+    from conflicts import CONFLICT_KINDS
+
+    yield "---"
+    yield ""
+    yield "## Conflicts"
+    yield ""
+
+    if not conflicts:
+        yield "*No conflicts found.*"
+        yield ""
+        return
+
+    for kind, title in CONFLICT_KINDS.items():
+        found = [item for item in conflicts if item["kind"] == kind]
+        if not found:
+            continue
+        yield f"### {title}"
+        yield ""
+        for item in found:
+            yield f"- {item['message']}"
+            for scope, path in zip(item["scopes"], item["paths"]):
+                yield f"  - {scope}: [{path}](file://{path})"
+        yield ""
+
+
+def render_footer() -> Iterator[str]:
+    """Render the additional resources footer."""
+    yield "---"
+    yield ""
+    yield "## Additional Resources"
+    yield ""
+    yield "- Use `/memory` to edit memory files interactively"
+    yield "- Use `/context` to see token usage breakdown"
+    yield "- Use `/mcp` to manage MCP servers"
+    yield "- Use `/agents` to manage custom agents"
+    yield "- Use `/hooks` to manage hooks"
+    yield ""
+
+
+def render_profile(profile: dict) -> Iterator[str]:
+    """Render --profile timings and counters as a table."""
+    totals = profile["totals"]
+    columns = [key for key in (*PROFILE_COUNTERS, *PROC_IO_FIELDS.values()) if key in totals]
+    yield "---"
+    yield ""
+    yield "## Profile"
+    yield ""
+    yield (f"**Total:** {profile['total_ms']:.1f} ms, "
+           + ", ".join(f"{totals[key]} {key.replace('_', ' ')}" for key in columns))
+    yield ""
+    yield "| Phase | Calls | Time (ms) | " + " | ".join(key.replace("_", " ").capitalize() for key in columns) + " |"
+    yield "|-------|-------|-----------|" + "|".join("---" for _ in columns) + "|"
+    for phase in profile["phases"]:
+        yield (f"| {phase['name']} | {phase['calls']} | {phase['ms']:.2f} | "
+               + " | ".join(str(phase.get(key, 0)) for key in columns) + " |")
+    yield ""
+    yield "*Phases may nest; times include nested phases.*"
+    yield ""
+
+
+SECTION_FINDERS = {
+    "memory_files": find_memory_files,
+    "skills": find_skills,
+    "hooks": find_hooks,
+    "mcp_servers": find_mcp_servers,
+    "agents": find_agents,
+    "commands": find_commands,
+}
+
+SECTION_ITERATORS = {
+    "memory_files": iter_memory_files,
+    "skills": iter_skills,
+    "hooks": iter_hooks,
+    "mcp_servers": iter_mcp_servers,
+    "agents": iter_agents,
+    "commands": iter_commands,
+}
+
+SECTION_RENDERERS = {
+    "memory_files": render_memory_files,
+    "skills": render_skills,
+    "hooks": render_hooks,
+    "mcp_servers": render_mcp_servers,
+    "agents": render_agents,
+    "commands": render_commands,
+}
+
+
+class ChunkedWriter:
+    """Write report lines to a stream in chunks of about WRITE_CHUNK_SIZE characters.
+
+    Lines are joined with newlines exactly like "\\n".join(lines), without
+    ever holding more than one chunk of the report in memory.
+    """
+
+    def __init__(self, stream, chunk_size: int = WRITE_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._started = False
+
+    def write_lines(self, lines) -> None:
+        """Queue lines for writing, flushing each time a chunk fills up."""
+        for line in lines:
+            if self._started:
+                self._pending.append("\n")
+            self._started = True
+            self._pending.append(line)
+            self._pending_size += len(line) + 1
+            if self._pending_size >= self.chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write out any queued text and flush the stream."""
+        if self._pending:
+            self.stream.write("".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+        self.stream.flush()
+
+
+def write_report(project_dir: Path, stream, estimator=None,
+                 context_window: int = DEFAULT_CONTEXT_WINDOW, context: dict | None = None) -> None:
+    """Stream the markdown report to stream section by section.
+
+    The header is flushed before discovery starts, and each section is
+    written as it is rendered rather than accumulated. Already collected
+    context can be passed in instead.
+    """
+    estimator = estimator or load_estimator()
+    writer = ChunkedWriter(stream)
+    writer.write_lines(render_header(project_dir))
+    writer.flush()
+
+    if context is None:
+        context = collect_context(project_dir, estimator)
+    with PROFILE.phase("render_summary"):
+        writer.write_lines(render_summary(context, estimator, context_window))
+    for name in SECTIONS:
+        with PROFILE.phase(f"render_{name}"):
+            writer.write_lines(SECTION_RENDERERS[name](context[name], estimator))
+    with PROFILE.phase("conflicts"):
+        writer.write_lines(render_conflicts(find_context_conflicts(context)))
+    writer.write_lines(render_footer())
+    if PROFILE.enabled:
+        writer.write_lines(render_profile(PROFILE.to_json()))
+    writer.flush()
+
+
+def generate_report(project_dir: Path, estimator=None,
+                    context_window: int = DEFAULT_CONTEXT_WINDOW) -> str:
+    """Generate the full markdown report."""
+    buffer = io.StringIO()
+    write_report(project_dir, buffer, estimator, context_window)
+    return buffer.getvalue()
+
+
+# === Structured Output ===
+
+OUTPUT_FORMATS = ("markdown", "json", "ndjson", "html")
+JSON_SCHEMA = "context-introspection"
+JSON_SCHEMA_VERSION = 1
+
+# Record type and field list per section; every field is always present
+RECORD_TYPES = {
+    "memory_files": "memory_file",
+    "skills": "skill",
+    "hooks": "hook_source",
+    "mcp_servers": "mcp_source",
+    "agents": "agent",
+    "commands": "command",
+}
+FILE_FIELDS = ("path", "exists", "size", "modified", "frontmatter", "frontmatter_error", "tokens",
+               "loaded_copies", "duplicates", "duplicate_of", "preview")
+RECORD_FIELDS = {
+    "memory_files": ("scope", "description", *FILE_FIELDS, "imports", "expanded_size", "expanded_tokens"),
+    "skills": ("scope", "name", *FILE_FIELDS),
+    "hooks": ("scope", "path", "hooks"),
+    "mcp_servers": ("scope", "path", "servers"),
+    "agents": ("scope", "name", *FILE_FIELDS),
+    "commands": ("scope", "name", "namespace", *FILE_FIELDS),
+}
+
+
+def record_to_json(section: str, record: dict) -> dict:
+    """Convert a discovery record to its stable JSON form."""
+    data = {"type": RECORD_TYPES[section]}
+    for field in RECORD_FIELDS[section]:
+        if field == "modified":
+            mtime_ns = record.get("mtime_ns")
+            data[field] = (
+                datetime.fromtimestamp(mtime_ns / 1e9).isoformat(timespec="seconds")
+                if mtime_ns is not None else None
+            )
+        elif field == "exists":
+            data[field] = record.get("exists", True)
+        elif field == "loaded_copies":
+            data[field] = record.get("loaded_copies", 1) if record.get("exists", True) else 0
+        elif field == "duplicates":
+            data[field] = [
+                {"scope": duplicate["scope"], "path": duplicate["path"]}
+                for duplicate in record.get("duplicates") or []
+            ]
+        else:
+            data[field] = record.get(field)
+    return data
+
+
+def report_metadata(project_dir: Path, estimator, context_window: int) -> dict:
+    """Return the header fields shared by the JSON and NDJSON formats."""
+    return {
+        "schema": JSON_SCHEMA,
+        "version": JSON_SCHEMA_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "project": str(project_dir),
+        "platform": platform.system(),
+        "token_estimator": estimator.name,
+        "context_window": context_window,
+    }
+
+
+def summarize_context(context: dict, context_window: int) -> dict:
+    """Return the summary counts and context budget as plain data."""
+    counts = {name: count_entries(name, context[name]) for name in SECTIONS}
+
+    budget = []
+    total_tokens = 0
+    for label, records, always_loaded in context_budget(
+        context["memory_files"], context["skills"], context["agents"], context["commands"]
+    ):
+        tokens = sum(loaded_tokens(record) for record in records)
+        if always_loaded:
+            total_tokens += tokens
+        budget.append({
+            "source": label,
+            "items": len(records),
+            "tokens": tokens,
+            "percent": round(100 * tokens / context_window, 2),
+            "always_loaded": always_loaded,
+        })
+
+    return {
+        "counts": counts,
+        "budget": budget,
+        "total_tokens": total_tokens,
+        "total_percent": round(100 * total_tokens / context_window, 2),
+    }
+
+
+def write_budget_summary(project_dir: Path, output_file: Path | None, output_format: str, estimator,
+                         context_window: int) -> None:
+    """Write the summary counts with the context budget, as the serve daemon answers them.
+
+    Used for --summary with --context-window, which needs token estimates
+    that the minimal-startup summary in summary.py does not make.
+    """
+    context = collect_context(project_dir, estimator)
+    if output_format == "markdown":
+        text = "\n".join(render_summary(context, estimator, context_window))
+    else:
+        document = {"schema": SUMMARY_SCHEMA, "version": SUMMARY_VERSION, "project": str(project_dir.absolute()),
+                    **summarize_context(context, context_window)}
+        text = json.dumps(document, indent=2 if output_format == "json" else None)
+    if output_file:
+        output_file.write_text(text + "\n", encoding="utf-8")
+        print(f"Summary written to: {output_file}")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+def iter_context_records(project_dir: Path, estimator, index: DiscoveryIndex | None = None) -> Iterator[tuple[str, dict]]:
+    """Yield (section, record) pairs in report order as each file is read.
+
+    A file identical to an earlier one in its section is still yielded, with
+    "duplicate_of" set to the earlier file's path.
+    """
+    index = index or build_index(project_dir)
+    folder = DuplicateFolder()
+    resolver = import_resolver(estimator, index)
+    for name in SECTIONS:
+        for record in SECTION_ITERATORS[name](project_dir, index):
+            attach_token_estimates(estimator, name, [record])
+            if name == "memory_files":
+                attach_imports(resolver, [record])
+            original = folder.add(name, record)
+            if original is not None:
+                record["duplicate_of"] = original["path"]
+            yield name, record
+
+
+def iter_folded_records(context: dict) -> Iterator[tuple[str, dict]]:
+    """Yield collected context as iter_context_records() yields it while reading:
+    every file, identical copies included, with "duplicate_of" set on copies."""
+    for name in SECTIONS:
+        for record in in_load_order(context[name]):
+            yield name, record
+
+
+def build_document(project_dir: Path, context: dict, estimator,
+                   context_window: int = DEFAULT_CONTEXT_WINDOW) -> dict:
+    """Return collected context as the --format json document."""
+    document = report_metadata(project_dir, estimator, context_window)
+    document["summary"] = summarize_context(context, context_window)
+    for name in SECTIONS:
+        document[name] = [record_to_json(name, record) for record in context[name]]
+    with PROFILE.phase("conflicts"):
+        document["conflicts"] = find_context_conflicts(context)
+    if PROFILE.enabled:
+        document["profile"] = PROFILE.to_json()
+    return document
+
+
+def render_json(project_dir: Path, context: dict, estimator,
+                context_window: int = DEFAULT_CONTEXT_WINDOW) -> str:
+    """Render collected context as a single JSON document."""
+    return json.dumps(build_document(project_dir, context, estimator, context_window), indent=2)
+
+
+def render_html(project_dir: Path, context: dict, estimator,
+                context_window: int = DEFAULT_CONTEXT_WINDOW) -> str:
+    """Render collected context as a self-contained HTML page (see html_report.py)."""
+    # Imported here so the other formats do not pay for it at startup
+    from html_report import render_page
+
+    document = build_document(project_dir, context, estimator, context_window)
+    with PROFILE.phase("render_html"):
+        return render_page(document, approximate=not estimator.exact)
+
+
+def iter_ndjson(project_dir: Path, records, estimator,
+                context_window: int = DEFAULT_CONTEXT_WINDOW):
+    """Yield NDJSON lines: a header, one line per (section, record), then one
+    per conflict and a summary.
+
+    Records come from iter_context_records() or iter_folded_records(). Each
+    file has its own line, so a line's "duplicates" and "loaded_copies"
+    describe that file alone; copies name the first file in "duplicate_of".
+    """
+    header = report_metadata(project_dir, estimator, context_window)
+    yield json.dumps({"type": "header", **header})
+
+    context = {name: [] for name in SECTIONS}
+    for name, record in records:
+        if not record.get("duplicate_of"):
+            context[name].append(record)
+        yield json.dumps(record_to_json(name, {**record, "duplicates": None, "loaded_copies": 1}))
+
+    with PROFILE.phase("conflicts"):
+        conflicts = find_context_conflicts(context)
+    for item in conflicts:
+        yield json.dumps({"type": "conflict", **item})
+
+    yield json.dumps({"type": "summary", **summarize_context(context, context_window)})
+    if PROFILE.enabled:
+        yield json.dumps({"type": "profile", **PROFILE.to_json()})
+
+
+def generate_structured_report(project_dir: Path, output_format: str, estimator=None,
+                               context_window: int = DEFAULT_CONTEXT_WINDOW):
+    """Yield the report in JSON, NDJSON or HTML form, one chunk at a time.
+
+    NDJSON lines are produced as each record is discovered, so consumers can
+    start processing before the walk finishes.
+    """
+    estimator = estimator or load_estimator()
+    if output_format == "ndjson":
+        records = iter_context_records(project_dir, estimator)
+        for line in iter_ndjson(project_dir, records, estimator, context_window):
+            yield line + "\n"
+    elif output_format == "html":
+        context = collect_context(project_dir, estimator)
+        yield render_html(project_dir, context, estimator, context_window) + "\n"
+    else:
+        context = collect_context(project_dir, estimator)
+        yield render_json(project_dir, context, estimator, context_window) + "\n"
+
+
+# === Snapshots ===
+
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+SNAPSHOT_SCHEMA = "context-introspection-snapshot"
+DIFF_SCHEMA = "context-introspection-diff"
+SNAPSHOT_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 16
+
+# Entry fields compared by --diff, in display order
+DIFF_FIELDS = ("hash", "scope", "frontmatter", "tokens")
+DIFF_SECTION_LABELS = {
+    "memory_files": "Memory", "skills": "Skill", "hooks": "Hooks",
+    "mcp_servers": "MCP", "agents": "Agent", "commands": "Command",
+}
+
+
+def file_digest(path: Path) -> str | None:
+    """Return the SHA-256 of a file, read in chunks.
+
+    Digests are kept in PARSE_CACHE, so a file is only hashed again after
+    its mtime or size changes. Returns None if the file cannot be read.
+    """
+    stat = stat_safe(path)
+    if stat is None:
+        return None
+    key = f"{os.path.abspath(path)}|sha256"
+    cached = PARSE_CACHE.get(key, stat)
+    if cached is not None:
+        return cached["sha256"]
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    PARSE_CACHE.put(key, stat, {"sha256": digest.hexdigest()})
+    return digest.hexdigest()
+
+
+def canonical_path(path: str, project_dir: Path) -> str:
+    """Return path as absolute, with the project directory part resolved.
+
+    Snapshot entries are matched by path, so a project given as a relative
+    path, an absolute one or through a symlink must record the same paths.
+    """
+    path = os.path.abspath(path)
+    root = os.path.abspath(project_dir)
+    if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+        return str(project_dir.resolve()) + path[len(root):]
+    return path
+
+
+def snapshot_entries(context: dict, project_dir: Path, previous: list[dict] | None = None) -> list[dict]:
+    """Return the manifest entries for collected context.
+
+    Paths are canonical (see canonical_path()). File contents are
+    identified by SHA-256. A file whose mtime and size match its entry in
+    previous keeps that entry's hash without being read; hooks and MCP
+    sources are hashed from their parsed configuration.
+    """
+    known = {entry_identity(entry): entry for entry in previous or []}
+    entries = []
+    for name in SECTIONS:
+        for record in expand_duplicates(context[name]):
+            if not record.get("exists", True):
+                continue
+            path = canonical_path(record["path"], project_dir)
+            before = known.get(entry_identity({"section": name, "scope": record["scope"], "path": path}))
+            if name in ("hooks", "mcp_servers"):
+                config = record["hooks"] if name == "hooks" else record["servers"]
+                digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+            elif before and (before["mtime_ns"], before["size"]) == (record["mtime_ns"], record["size"]):
+                digest = before["hash"]
+            else:
+                digest = file_digest(Path(path))
+            entries.append({
+                "section": name,
+                "scope": record["scope"],
+                "name": record.get("name") or record.get("description"),
+                "path": path,
+                "hash": digest,
+                "size": record.get("size"),
+                "mtime_ns": record.get("mtime_ns"),
+                "frontmatter": record.get("frontmatter"),
+                "tokens": record.get("tokens"),
+            })
+    return entries
+
+
+def build_snapshot(project_dir: Path, context: dict, estimator, previous: dict | None = None) -> dict:
+    """Return a snapshot manifest of collected context."""
+    entries = snapshot_entries(context, project_dir, previous["entries"] if previous else None)
+    return {
+        "schema": SNAPSHOT_SCHEMA,
+        "version": SNAPSHOT_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "project": str(project_dir.resolve()),
+        "token_estimator": estimator.name,
+        "entries": entries,
+    }
+
+
+def save_snapshot(snapshot: dict) -> Path:
+    """Store a snapshot under SNAPSHOT_DIR, named by the hash of its contents.
+
+    The name covers each entry's identity and DIFF_FIELDS but not file
+    mtimes, so runs that find the same context share one file; it is
+    rewritten with the latest mtimes and becomes the latest snapshot again.
+    """
+    contents = [
+        [entry["section"], entry["path"], *(entry[field] for field in DIFF_FIELDS)]
+        for entry in snapshot["entries"]
+    ]
+    digest = hashlib.sha256(json.dumps(contents, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    path = SNAPSHOT_DIR / project_key(Path(snapshot["project"])) / f"{digest}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(spec: str, project_dir: Path) -> tuple[dict, Path]:
+    """Load a snapshot file, or the project's most recent one for "latest"."""
+    if spec == "latest":
+        store = SNAPSHOT_DIR / project_key(project_dir.resolve())
+        snapshots = sorted(store.glob("*.json"), key=lambda p: p.stat().st_mtime_ns) if store.is_dir() else []
+        if not snapshots:
+            raise ValueError(f"no snapshots of {project_dir} in {store}")
+        path = snapshots[-1]
+    else:
+        path = Path(spec)
+    snapshot = load_json_safe(path)
+    if not isinstance(snapshot, dict) or snapshot.get("schema") != SNAPSHOT_SCHEMA:
+        raise ValueError(f"{path} is not a context introspection snapshot")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} has unsupported snapshot version {snapshot.get('version')}")
+    return snapshot, path
+
+
+def entry_identity(entry: dict) -> tuple:
+    """Return the key matching a snapshot entry across snapshots.
+
+    Hook and MCP sources are keyed by scope too, since the User and Local
+    MCP servers both come from ~/.claude.json. Paths are normalized, so
+    entries of snapshots saved before paths were made canonical still match
+    when they were absolute.
+    """
+    path = os.path.normpath(entry["path"])
+    if entry["section"] in ("hooks", "mcp_servers"):
+        return entry["section"], path, entry["scope"]
+    return entry["section"], path
+
+
+def diff_snapshots(previous: dict, current: dict) -> dict:
+    """Return the added, removed and changed entries between two snapshots."""
+    before = {entry_identity(entry): entry for entry in previous["entries"]}
+    after = {entry_identity(entry): entry for entry in current["entries"]}
+    changed = []
+    for key, entry in after.items():
+        old = before.get(key)
+        if old is None:
+            continue
+        fields = [field for field in DIFF_FIELDS if old.get(field) != entry.get(field)]
+        if fields:
+            changed.append({**entry, "fields": fields, "previous_tokens": old.get("tokens")})
+    return {
+        "added": [entry for key, entry in after.items() if key not in before],
+        "removed": [entry for key, entry in before.items() if key not in after],
+        "changed": changed,
+    }
+
+
+def token_delta(diff: dict) -> int:
+    """Return the net change in estimated tokens across a diff."""
+    delta = sum(entry.get("tokens") or 0 for entry in diff["added"])
+    delta -= sum(entry.get("tokens") or 0 for entry in diff["removed"])
+    delta += sum((entry.get("tokens") or 0) - (entry.get("previous_tokens") or 0) for entry in diff["changed"])
+    return delta
+
+
+def render_diff(diff: dict, previous: dict, snapshot_path: Path, project_dir: Path) -> Iterator[str]:
+    """Render a diff against a snapshot as markdown."""
+    delta = token_delta(diff)
+
+    yield "# Context Diff"
+    yield ""
+    yield f"**Project:** `{project_dir}`"
+    yield f"**Compared with:** `{snapshot_path}` ({previous.get('generated', 'unknown time')})"
+    yield (f"**Changes:** {len(diff['added'])} added, {len(diff['removed'])} removed, "
+           f"{len(diff['changed'])} changed ({delta:+,} tokens)")
+    yield ""
+    if not any(diff.values()):
+        yield "*No changes since the snapshot.*"
+        yield ""
+        return
+
+    for kind in ("added", "removed", "changed"):
+        entries = diff[kind]
+        if not entries:
+            continue
+        yield f"## {kind.capitalize()}"
+        yield ""
+        if kind == "changed":
+            yield "| Type | Scope | Path | What changed | Tokens |"
+            yield "|------|-------|------|--------------|--------|"
+        else:
+            yield "| Type | Scope | Path | Tokens |"
+            yield "|------|-------|------|--------|"
+        for entry in entries:
+            tokens = entry.get("tokens")
+            tokens_text = format_tokens(tokens) if tokens is not None else "-"
+            row = f"| {DIFF_SECTION_LABELS[entry['section']]} | {entry['scope']} | `{entry['path']}` |"
+            if kind == "changed":
+                what = ", ".join("content" if field == "hash" else field for field in entry["fields"])
+                previous_tokens = entry.get("previous_tokens")
+                if previous_tokens is not None and tokens is not None and previous_tokens != tokens:
+                    tokens_text = f"{format_tokens(previous_tokens)} → {tokens_text}"
+                row += f" {what} |"
+            yield f"{row} {tokens_text} |"
+        yield ""
+
+
+def iter_diff_json(diff: dict, previous: dict, snapshot_path: Path, project_dir: Path,
+                   output_format: str) -> Iterator[str]:
+    """Yield a diff as one JSON document, or as NDJSON lines (one per change)."""
+    header = {
+        "schema": DIFF_SCHEMA,
+        "version": SNAPSHOT_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "project": str(project_dir),
+        "snapshot": str(snapshot_path),
+        "snapshot_generated": previous.get("generated"),
+        "token_delta": token_delta(diff),
+    }
+    if output_format == "json":
+        yield json.dumps({**header, **diff}, indent=2)
+        return
+    yield json.dumps({"type": "header", **header})
+    for kind in ("added", "removed", "changed"):
+        for entry in diff[kind]:
+            yield json.dumps({"type": kind, **entry})
+
+
+# === Rule Paths ===
+
+RULE_PATHS_SCHEMA = "context-introspection-rule-paths"
+RULE_PATHS_VERSION = 1
+# Subtrees listed per rule, most matched files first
+RULE_SUBTREE_LIMIT = 10
+
+
+def path_scoped_rules(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Return the rule records, identical copies included, that have `paths` frontmatter."""
+    return [
+        mem for mem in expand_duplicates(find_memory_files(project_dir, index))
+        if mem.get("exists") and mem["scope"] not in MEMORY_SCOPES and (mem.get("frontmatter") or {}).get("paths")
+    ]
+
+
+def analyze_rule_paths(project_dir: Path) -> dict:
+    """Match every path-scoped rule against the project's files (see rule_paths.py)."""
+    from rule_paths import match_rules, rule_globs
+
+    rules = path_scoped_rules(project_dir)
+    globs = [rule_globs(rule["frontmatter"]["paths"]) for rule in rules]
+    started = time.perf_counter()
+    with PROFILE.phase("rule_paths"):
+        result = match_rules(project_dir.resolve(), globs)
+    patterns = [[] for _ in rules]
+    for glob in result["globs"]:
+        patterns[glob["rule"]].append({"pattern": glob["pattern"], "files": glob["files"]})
+
+    entries = []
+    for rule, matched, rule_patterns in zip(rules, result["rules"], patterns):
+        subtrees = sorted(matched["subtrees"].items(), key=lambda item: (-item[1], item[0]))
+        entries.append({
+            "scope": rule["scope"],
+            "path": rule["path"],
+            "patterns": rule_patterns,
+            "files": matched["files"],
+            "subtrees": [{"path": path, "files": files} for path, files in subtrees[:RULE_SUBTREE_LIMIT]],
+        })
+    return {
+        "schema": RULE_PATHS_SCHEMA,
+        "version": RULE_PATHS_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "project": str(project_dir),
+        "walk": {
+            "dirs_listed": result["dirs_listed"],
+            "files_seen": result["files_seen"],
+            "ignored": result["ignored"],
+            "seconds": round(time.perf_counter() - started, 3),
+        },
+        "rules": entries,
+    }
+
+
+def format_file_count(files: int) -> str:
+    return f"{files:,} file" if files == 1 else f"{files:,} files"
+
+
+def render_rule_paths(analysis: dict) -> Iterator[str]:
+    """Render a rule path analysis as markdown."""
+    walk = analysis["walk"]
+    rules = analysis["rules"]
+    yield "# Path-Scoped Rules"
+    yield ""
+    yield f"**Project:** `{analysis['project']}`"
+    yield (f"**Walk:** {walk['files_seen']:,} files in {walk['dirs_listed']:,} directories, "
+           f"{walk['ignored']:,} ignored entries skipped ({walk['seconds']:.2f} s)")
+    yield ""
+    if not rules:
+        yield "*No rules with `paths` frontmatter.*"
+        yield ""
+        return
+
+    yield "| Rule | Scope | Patterns | Files |"
+    yield "|------|-------|----------|-------|"
+    for rule in rules:
+        patterns = ", ".join(f"`{item['pattern']}`" for item in rule["patterns"])
+        yield f"| [{Path(rule['path']).name}](file://{rule['path']}) | {rule['scope']} | {patterns} | {rule['files']:,} |"
+    yield ""
+
+    for rule in rules:
+        if not rule["files"]:
+            continue
+        yield f"### {rule['scope']}: {Path(rule['path']).name}"
+        yield ""
+        yield f"**Path:** [{rule['path']}](file://{rule['path']})"
+        yield "**Patterns:** " + ", ".join(
+            f"`{item['pattern']}` ({format_file_count(item['files'])})" if item["files"] else f"`{item['pattern']}` (no files)"
+            for item in rule["patterns"]
+        )
+        yield "**Applies to:**"
+        for subtree in rule["subtrees"]:
+            yield f"- `{subtree['path']}/` ({format_file_count(subtree['files'])})"
+        yield ""
+
+    unmatched = [rule for rule in rules if not rule["files"]]
+    if unmatched:
+        yield "### Rules Matching Nothing"
+        yield ""
+        for rule in unmatched:
+            patterns = ", ".join(f"`{item['pattern']}`" for item in rule["patterns"])
+            yield f"- {rule['scope']}: [{rule['path']}](file://{rule['path']}) ({patterns})"
+        yield ""
+
+
+# === Simulation ===
+
+SIMULATION_SCHEMA = "context-introspection-simulation"
+SIMULATION_VERSION = 1
+SKILL_INDEX_FILE = CACHE_DIR / "skill-index.json"
+SIMULATED_SECTIONS = ("skills", "agents", "commands")
+SIMULATE_LIMIT = 10
+# Candidates scoring within this fraction of the best are flagged as competing
+AMBIGUOUS_MARGIN = 0.1
+SIMULATION_LABELS = {"skill": "Skill", "agent": "Agent", "command": "Command"}
+
+
+def simulation_documents(project_dir: Path, index: DiscoveryIndex | None = None) -> list[dict]:
+    """Return the skills, agents and commands as documents for SkillIndex.update().
+
+    Documents are identified by canonical path (see canonical_path()), since
+    the index is shared by every project.
+    """
+    from conflicts import record_name
+
+    index = index or build_index(project_dir)
+    folder = DuplicateFolder()
+    documents = []
+    for section in SIMULATED_SECTIONS:
+        for record in folder.fold(section, SECTION_FINDERS[section](project_dir, index)):
+            if not record.get("exists"):
+                continue
+            fm = record.get("frontmatter") or {}
+            documents.append({
+                "id": canonical_path(record["path"], project_dir),
+                "text": describe_for_tokens(record),
+                "mtime_ns": record["mtime_ns"],
+                "size": record["size"],
+                "section": section,
+                "name": record_name(section, record),
+                "scope": record["scope"],
+                "description": format_value(fm.get("description", "")),
+            })
+    return documents
+
+
+def simulate_prompt(project_dir: Path, prompt: str | None, overlaps: bool = False) -> dict:
+    """Rank the skills, agents and commands for a prompt, and/or find overlapping descriptions.
+
+    The index is kept in SKILL_INDEX_FILE (unless the cache is disabled)
+    and only re-tokenizes files that changed since it was saved.
+    """
+    from skill_index import SkillIndex
+
+    skill_index = SkillIndex.load(SKILL_INDEX_FILE if PARSE_CACHE.enabled else None)
+    documents = simulation_documents(project_dir)
+    # Files gone from these directories are dropped; other projects' entries are kept
+    roots = (USER_CLAUDE_DIR, project_dir.resolve() / context_paths.PROJECT_CLAUDE_DIR)
+    scopes = tuple(str(root / section) + os.sep for root in roots for section in SIMULATED_SECTIONS)
+    started = time.perf_counter()
+    reindexed = skill_index.update(documents, prune_prefixes=scopes)
+    index_ms = (time.perf_counter() - started) * 1000
+    doc_ids = {document["id"] for document in documents}
+
+    def describe(doc_id: str) -> dict:
+        doc = skill_index.docs[doc_id]
+        return {
+            "type": RECORD_TYPES[doc["section"]],
+            "name": doc["name"],
+            "scope": doc["scope"],
+            "path": doc_id,
+            "description": doc["description"],
+        }
+
+    result = {
+        "schema": SIMULATION_SCHEMA,
+        "version": SIMULATION_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "project": str(project_dir),
+        "index": {"documents": len(doc_ids), "reindexed": reindexed, "update_ms": round(index_ms, 2)},
+    }
+    if prompt is not None:
+        started = time.perf_counter()
+        ranked = skill_index.search(prompt, doc_ids, limit=SIMULATE_LIMIT)
+        result["prompt"] = prompt
+        result["search_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["candidates"] = [
+            {**describe(hit["id"]), "score": round(hit["score"], 3), "terms": hit["terms"]} for hit in ranked
+        ]
+    if overlaps:
+        started = time.perf_counter()
+        pairs = skill_index.overlaps(doc_ids)
+        result["overlaps_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["overlaps"] = [
+            {"similarity": round(pair["similarity"], 3), "terms": pair["terms"],
+             "entries": [describe(doc_id) for doc_id in pair["ids"]]}
+            for pair in pairs
+        ]
+    skill_index.save()
+    return result
+
+
+def format_candidate(entry: dict) -> str:
+    return f"{SIMULATION_LABELS[entry['type']]} [{entry['name']}](file://{entry['path']}) ({entry['scope']})"
+
+
+def render_simulation(simulation: dict) -> Iterator[str]:
+    """Render a simulation as markdown."""
+    from skill_index import OVERLAP_THRESHOLD
+
+    index = simulation["index"]
+    yield "# Skill Simulation"
+    yield ""
+    yield f"**Project:** `{simulation['project']}`"
+    yield (f"**Index:** {index['documents']:,} descriptions, {index['reindexed']:,} re-indexed "
+           f"({index['update_ms']:.1f} ms)")
+    if "prompt" in simulation:
+        yield f"**Prompt:** {simulation['prompt']}"
+        yield f"**Search:** {simulation['search_ms']:.2f} ms"
+        yield ""
+        candidates = simulation["candidates"]
+        if not candidates:
+            yield "*No skill, agent or command description shares a term with the prompt.*"
+        else:
+            yield "| Rank | Type | Name | Scope | Score | Matched terms |"
+            yield "|------|------|------|-------|-------|---------------|"
+            for rank, entry in enumerate(candidates, 1):
+                terms = ", ".join(f"`{term}`" for term in entry["terms"])
+                yield (f"| {rank} | {SIMULATION_LABELS[entry['type']]} | [{entry['name']}](file://{entry['path']}) "
+                       f"| {entry['scope']} | {entry['score']:.2f} | {terms} |")
+            competing = [entry for entry in candidates[1:]
+                         if entry["score"] >= candidates[0]["score"] * (1 - AMBIGUOUS_MARGIN)]
+            if competing:
+                yield ""
+                names = ", ".join(f"`{entry['name']}`" for entry in competing)
+                yield (f"**Ambiguous:** {names} scored within {AMBIGUOUS_MARGIN:.0%} of "
+                       f"`{candidates[0]['name']}`; their descriptions compete for this prompt.")
+        yield ""
+        yield "*Scores are BM25 relevance of the prompt to each name and description, an approximation of how Claude picks one.*"
+        yield ""
+    else:
+        yield ""
+
+    if "overlaps" in simulation:
+        yield "## Overlapping Descriptions"
+        yield ""
+        if not simulation["overlaps"]:
+            yield f"*No pair of descriptions is at least {OVERLAP_THRESHOLD:.0%} similar.*"
+            yield ""
+            return
+        yield "| Similarity | First | Second | Shared terms |"
+        yield "|------------|-------|--------|--------------|"
+        for pair in simulation["overlaps"]:
+            first, second = pair["entries"]
+            terms = ", ".join(f"`{term}`" for term in pair["terms"])
+            yield f"| {pair['similarity']:.0%} | {format_candidate(first)} | {format_candidate(second)} | {terms} |"
+        yield ""
+
+
+# === Watch Mode ===
+
+class IncrementalReport:
+    """A report whose sections can be re-collected and re-rendered individually.
+
+    Each refresh uses a fresh, lazily filled DiscoveryIndex, so only the
+    directories of the refreshed sections are listed, and PARSE_CACHE stays
+    warm in memory, so only files whose mtime or size changed are re-read.
+    """
+
+    def __init__(self, project_dir: Path, estimator=None,
+                 context_window: int = DEFAULT_CONTEXT_WINDOW, output_format: str = "markdown"):
+        self.project_dir = project_dir
+        self.estimator = estimator or load_estimator()
+        self.context_window = context_window
+        self.output_format = output_format
+        self.context: dict[str, list[dict]] = {}
+        self.rendered: dict[str, list[str]] = {}
+
+    def refresh(self, sections: tuple[str, ...] = SECTIONS) -> None:
+        """Re-collect and re-render the given sections."""
+        self.update(*self.collect(sections))
+
+    def collect(self, sections: tuple[str, ...] = SECTIONS) -> tuple[dict, dict]:
+        """Collect and render the given sections without changing the report.
+
+        Returns the (context, rendered) pair for update(), so a caller that
+        shares the report between threads can scan without holding its lock.
+        """
+        context = collect_context(self.project_dir, self.estimator, DiscoveryIndex(), sections)
+        rendered = {}
+        if self.output_format == "markdown":
+            rendered = {name: list(SECTION_RENDERERS[name](records, self.estimator))
+                        for name, records in context.items()}
+        return context, rendered
+
+    def update(self, context: dict, rendered: dict) -> None:
+        """Swap in sections returned by collect()."""
+        self.context.update(context)
+        self.rendered.update(rendered)
+
+    def render(self, output_format: str | None = None, context_window: int | None = None) -> str:
+        """Assemble the report from the cached sections.
+
+        Markdown sections are only cached when the report was created with
+        the markdown format; the other formats are cheap to build from the
+        collected records.
+        """
+        output_format = output_format or self.output_format
+        context_window = context_window or self.context_window
+        if output_format == "json":
+            return render_json(self.project_dir, self.context, self.estimator, context_window)
+        if output_format == "html":
+            return render_html(self.project_dir, self.context, self.estimator, context_window)
+        if output_format == "ndjson":
+            records = iter_folded_records(self.context)
+            return "\n".join(iter_ndjson(self.project_dir, records, self.estimator, context_window))
+
+        lines = list(render_header(self.project_dir))
+        lines.extend(render_summary(self.context, self.estimator, context_window))
+        for name in SECTIONS:
+            lines.extend(self.rendered[name])
+        lines.extend(render_conflicts(find_context_conflicts(self.context)))
+        lines.extend(render_footer())
+        return "\n".join(lines)
+
+
+def imported_paths(context: dict) -> set[Path]:
+    """Return the files @imported by collected memory files, found or not."""
+    return {Path(item["path"]) for mem in context.get("memory_files", []) for item in mem.get("imports") or []}
+
+
+# The section fed by each entry of a .claude directory
+WATCHED_CLAUDE_DIR_ENTRIES = {
+    context_paths.RULES_DIR: "memory_files",
+    context_paths.MEMORY_FILE: "memory_files",
+    context_paths.SKILLS_DIR: "skills",
+    context_paths.AGENTS_DIR: "agents",
+    context_paths.COMMANDS_DIR: "commands",
+    **{os.path.basename(name): "hooks" for name in context_paths.PROJECT_SETTINGS_FILES},
+}
+# The section fed by files elsewhere, by name
+WATCHED_FILE_NAMES = {
+    context_paths.MEMORY_FILE: "memory_files",
+    context_paths.LOCAL_MEMORY_FILE: "memory_files",
+    os.path.basename(context_paths.USER_CLAUDE_JSON): "mcp_servers",
+    context_paths.PROJECT_MCP_FILE: "mcp_servers",
+    context_paths.ENTERPRISE_MCP: "mcp_servers",
+    context_paths.ENTERPRISE_SETTINGS: "hooks",
+}
+
+
+def watch_targets(project_dir: Path, context: dict | None = None) -> list[tuple[Path, bool]]:
+    """Return the (directory, recursive) pairs the find_* functions read from.
+
+    With collected context, the directories of @imported files are included.
+    """
+    targets = [(path.parent, False) for path in imported_paths(context or {})]
+    project_dir = project_dir.resolve()
+    targets.append((HOME, False))
+    for claude_dir in (USER_CLAUDE_DIR, project_dir / context_paths.PROJECT_CLAUDE_DIR):
+        skills_dir = claude_dir / context_paths.SKILLS_DIR
+        targets.extend([
+            (claude_dir, False),
+            (claude_dir / context_paths.RULES_DIR, True),
+            (claude_dir / context_paths.COMMANDS_DIR, True),
+            (claude_dir / context_paths.AGENTS_DIR, False),
+            (skills_dir, False),
+        ])
+        if skills_dir.is_dir():
+            targets.extend((skill_dir, False) for skill_dir in skills_dir.iterdir() if skill_dir.is_dir())
+
+    # Parent directories walked for CLAUDE.md
+    for directory in [project_dir, *project_dir.parents]:
+        targets.append((directory, False))
+        targets.append((directory / context_paths.PROJECT_CLAUDE_DIR, False))
+
+    enterprise_dir = get_enterprise_settings_dir()
+    if enterprise_dir:
+        targets.append((enterprise_dir, False))
+    return targets
+
+
+def sections_for_path(path: Path, project_dir: Path, imported: set[Path] = frozenset()) -> set[str]:
+    """Return the report sections a change to path can affect."""
+    if path in imported:
+        return {"memory_files"}
+    for claude_dir in (USER_CLAUDE_DIR, project_dir.resolve() / context_paths.PROJECT_CLAUDE_DIR):
+        try:
+            rel = path.relative_to(claude_dir)
+        except ValueError:
+            continue
+        if not rel.parts:
+            return set(SECTIONS)
+        section = WATCHED_CLAUDE_DIR_ENTRIES.get(rel.parts[0])
+        return {section} if section else set()
+
+    if path.name == context_paths.PROJECT_CLAUDE_DIR:
+        return set(SECTIONS)
+    section = WATCHED_FILE_NAMES.get(path.name)
+    return {section} if section else set()
+
+
+def affected_sections(changed: set[Path], project_dir: Path, context: dict | None = None) -> tuple[str, ...]:
+    """Return the report sections, in report order, affected by changed paths.
+
+    With collected context, changes to @imported files affect memory files.
+    """
+    imported = imported_paths(context or {})
+    affected = set()
+    for path in changed:
+        affected |= sections_for_path(path, project_dir, imported)
+    return tuple(name for name in SECTIONS if name in affected)
+
+
+def write_output(report: str, output_file: Path | None) -> None:
+    """Write the report to output_file, or print it to stdout."""
+    if output_file:
+        output_file.write_text(report, encoding="utf-8")
+        print(f"Report written to: {output_file}")
+    else:
+        print(report)
+
+
+def emit(write, output_file: Path | None) -> None:
+    """Call write(stream) with output_file opened for writing, or with stdout."""
+    if output_file:
+        with open(output_file, "w", encoding="utf-8", buffering=WRITE_CHUNK_SIZE) as f:
+            write(f)
+        print(f"Report written to: {output_file}")
+        return
+
+    try:
+        write(sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The consumer stopped reading (e.g. piped into head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+
+def watch_report(project_dir: Path, output_file: Path | None, estimator=None,
+                 context_window: int = DEFAULT_CONTEXT_WINDOW, poll: bool = False,
+                 output_format: str = "markdown") -> None:
+    """Regenerate the report whenever context files change, until interrupted."""
+    from watcher import create_watcher, wait_debounced
+
+    report = IncrementalReport(project_dir, estimator, context_window, output_format)
+    report.refresh()
+    write_output(report.render(), output_file)
+    PARSE_CACHE.save()
+
+    watcher = create_watcher(watch_targets(project_dir, report.context), poll=poll)
+    print(f"Watching {len(watcher.dirs)} directories for changes ({watcher.method}). "
+          "Press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        while True:
+            sections = affected_sections(wait_debounced(watcher), project_dir, report.context)
+            if not sections:
+                continue
+
+            started = time.perf_counter()
+            report.refresh(sections)
+            write_output(report.render(), output_file)
+            PARSE_CACHE.save()
+            watcher.set_targets(watch_targets(project_dir, report.context))
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Updated {', '.join(sections)} "
+                  f"in {elapsed:.0f} ms", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+# === Batch Mode ===
+
+BATCH_EXTENSIONS = {"markdown": ".md", "json": ".json", "ndjson": ".ndjson", "html": ".html"}
+BATCH_CHUNK_SIZE = 8
+
+# Set in each batch worker process by init_batch_worker()
+BATCH_WORKER: dict = {}
+
+
+def expand_projects(specs: list[str]) -> list[Path]:
+    """Expand directories, glob patterns and @FILE lists into project directories.
+
+    An @FILE argument names a file with one project path (or pattern) per
+    line; @- reads them from stdin. Duplicates and non-directories are
+    dropped, keeping the first occurrence.
+    """
+    import glob
+
+    projects = []
+    seen = set()
+
+    def add(spec: str) -> None:
+        if glob.has_magic(spec):
+            paths = sorted(glob.glob(os.path.expanduser(spec)))
+        else:
+            paths = [os.path.expanduser(spec)]
+        for path in paths:
+            resolved = Path(path).resolve()
+            if resolved not in seen and resolved.is_dir():
+                seen.add(resolved)
+                projects.append(resolved)
+
+    for spec in specs:
+        if spec.startswith("@"):
+            lines = sys.stdin if spec == "@-" else Path(spec[1:]).read_text(encoding="utf-8").splitlines()
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    add(line)
+        else:
+            add(spec)
+    return projects
+
+
+def batch_report_name(project_dir: Path, output_format: str) -> str:
+    """Return a unique, readable report file name for a project."""
+    return project_key(project_dir) + BATCH_EXTENSIONS[output_format]
+
+
+def init_batch_worker(shared_index: DiscoveryIndex, estimator, context_window: int,
+                      output_format: str, output_dir: Path, cache_enabled: bool, jobs: int) -> None:
+    """Store the state shared by every project a batch worker process handles.
+
+    The --no-cache and --jobs settings are passed in rather than inherited,
+    since spawned workers (the default on macOS) start from a fresh import.
+    """
+    global JOBS
+    PARSE_CACHE.enabled = cache_enabled
+    JOBS = jobs
+    BATCH_WORKER.update(
+        shared_index=shared_index,
+        estimator=estimator,
+        context_window=context_window,
+        output_format=output_format,
+        output_dir=output_dir,
+    )
+
+
+def run_batch_project(project_dir: Path) -> tuple[dict, dict]:
+    """Write one project's report in a batch worker.
+
+    Returns its summary row and the parse cache entries it added, for the
+    parent to save. A project that fails gets an "error" in its row instead
+    of aborting the batch.
+    """
+    estimator = BATCH_WORKER["estimator"]
+    context_window = BATCH_WORKER["context_window"]
+    output_format = BATCH_WORKER["output_format"]
+    output_file = BATCH_WORKER["output_dir"] / batch_report_name(project_dir, output_format)
+    row = {"project": str(project_dir), "report": output_file.name}
+    try:
+        index = build_index(project_dir, BATCH_WORKER["shared_index"])
+        context = collect_context(project_dir, estimator, index)
+        with open(output_file, "w", encoding="utf-8", buffering=WRITE_CHUNK_SIZE) as f:
+            if output_format == "markdown":
+                write_report(project_dir, f, estimator, context_window, context)
+            elif output_format == "json":
+                f.write(render_json(project_dir, context, estimator, context_window) + "\n")
+            elif output_format == "html":
+                f.write(render_html(project_dir, context, estimator, context_window) + "\n")
+            else:
+                records = iter_folded_records(context)
+                for line in iter_ndjson(project_dir, records, estimator, context_window):
+                    f.write(line + "\n")
+        row.update(summarize_context(context, context_window))
+    except OSError as e:
+        row["error"] = str(e)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row, PARSE_CACHE.take_updates()
+
+
+def render_batch_summary(rows: list[dict], estimator, context_window: int) -> Iterator[str]:
+    """Yield the markdown aggregate summary of a batch run."""
+    failed = [row for row in rows if "error" in row]
+    yield "# Context Introspection Batch Summary"
+    yield ""
+    yield f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"**Projects:** {len(rows) - len(failed)} reported, {len(failed)} failed"
+    yield f"**Token estimator:** {estimator.name} (context window {format_tokens(context_window)})"
+    yield ""
+    yield "| Project | Memory | Skills | Hooks | MCP | Agents | Commands | Tokens | % of window |"
+    yield "|---------|--------|--------|-------|-----|--------|----------|--------|-------------|"
+    for row in rows:
+        if "error" in row:
+            continue
+        counts = row["counts"]
+        status = budget_status(row["total_percent"])
+        percent = f"{row['total_percent']:.1f}%" + (f" ({status})" if status else "")
+        yield (f"| [{row['project']}]({row['report']}) | {counts['memory_files']} | {counts['skills']} "
+               f"| {counts['hooks']} | {counts['mcp_servers']} | {counts['agents']} "
+               f"| {counts['commands']} | {format_tokens(row['total_tokens'])} | {percent} |")
+    if failed:
+        yield ""
+        yield "## Failed"
+        yield ""
+        for row in failed:
+            yield f"- `{row['project']}`: {row['error']}"
+    yield ""
+
+
+def batch_report(projects: list[Path], output_dir: Path, estimator=None,
+                 context_window: int = DEFAULT_CONTEXT_WINDOW, output_format: str = "markdown",
+                 processes: int | None = None) -> Path:
+    """Write a report per project plus an aggregate summary, and return the summary path.
+
+    The user and enterprise scopes are scanned once in this process and
+    handed to a pool of worker processes, which only scan each project's
+    own directories.
+    """
+    estimator = estimator or load_estimator()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shared_index = scan_shared_scopes(projects)
+    PARSE_CACHE.save()
+
+    # Workers read context files on one thread each: the processes are the parallelism
+    init_args = (shared_index, estimator, context_window, output_format, output_dir, PARSE_CACHE.enabled, 1)
+    processes = min(processes or os.cpu_count() or 1, max(1, len(projects)))
+    if processes <= 1:
+        init_batch_worker(*init_args)
+        results = [run_batch_project(project_dir) for project_dir in projects]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_batch_worker,
+                                 initargs=init_args) as executor:
+            results = list(executor.map(run_batch_project, projects, chunksize=BATCH_CHUNK_SIZE))
+    rows = []
+    for row, cache_updates in results:
+        PARSE_CACHE.merge(cache_updates)
+        rows.append(row)
+    PARSE_CACHE.save()
+
+    if output_format == "markdown":
+        summary_file = output_dir / "summary.md"
+        with open(summary_file, "w", encoding="utf-8") as f:
+            writer = ChunkedWriter(f)
+            writer.write_lines(render_batch_summary(rows, estimator, context_window))
+            writer.flush()
+    else:
+        summary_file = output_dir / "summary.json"
+        summary = report_metadata(output_dir, estimator, context_window)
+        del summary["project"]
+        summary["projects"] = rows
+        summary_file.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return summary_file
+
+
+# === Serve Mode ===
+
+SOCKET_PATH = CACHE_DIR / "daemon.sock"
+SERVE_FORMATS = (*OUTPUT_FORMATS, "summary")
+SERVE_MAX_PROJECTS = 32
+SERVE_STOP_CHECK_SECONDS = 1.0
+
+
+class ServedProject:
+    """A warm IncrementalReport kept current by its own watcher thread."""
+
+    def __init__(self, report: IncrementalReport, watcher):
+        self.report = report
+        self.watcher = watcher
+        self.stopped = threading.Event()
+
+
+class IntrospectionServer:
+    """Answer report queries over a Unix socket from warm, watched reports.
+
+    A project is collected on its first query and then watched; changes
+    re-collect only the affected sections, so queries render from memory.
+    Projects beyond SERVE_MAX_PROJECTS are dropped least recently used first.
+    Scans run outside the lock and are swapped in under it, so a cold or
+    changed project never holds up queries for the others.
+    """
+
+    def __init__(self, estimator=None, context_window: int = DEFAULT_CONTEXT_WINDOW,
+                 poll: bool = False, max_projects: int = SERVE_MAX_PROJECTS):
+        self.estimator = estimator or load_estimator()
+        self.context_window = context_window
+        self.poll = poll
+        self.max_projects = max_projects
+        self.projects: dict[Path, ServedProject] = {}
+        self._lock = threading.Lock()
+
+    def warm_project(self, project_dir: Path) -> ServedProject | None:
+        """Return project_dir's served report, marked most recently used, if it is warm.
+
+        Must be called with self._lock held.
+        """
+        served = self.projects.pop(project_dir, None)
+        if served is not None:
+            self.projects[project_dir] = served
+        return served
+
+    def project(self, project_dir: Path) -> IncrementalReport:
+        """Return the warm report for project_dir, collecting it on first use.
+
+        Must be called without self._lock held: a first use scans the project
+        outside it. The watcher is started before the scan, so changes made
+        during it are picked up afterwards.
+        """
+        from watcher import create_watcher
+
+        with self._lock:
+            served = self.warm_project(project_dir)
+        if served is not None:
+            return served.report
+
+        watcher = create_watcher(watch_targets(project_dir), poll=self.poll)
+        report = IncrementalReport(project_dir, self.estimator, self.context_window)
+        report.refresh()
+        PARSE_CACHE.save()
+        watcher.set_targets(watch_targets(project_dir, report.context))
+        with self._lock:
+            # Another query may have collected the project in the meantime
+            served = self.warm_project(project_dir)
+            if served is None:
+                served = ServedProject(report, watcher)
+                threading.Thread(target=self._watch, args=(served,), daemon=True).start()
+                while len(self.projects) >= self.max_projects:
+                    self.projects.pop(next(iter(self.projects))).stopped.set()
+                self.projects[project_dir] = served
+                watcher = None
+        if watcher is not None:
+            watcher.close()
+        return served.report
+
+    def _watch(self, served: ServedProject) -> None:
+        """Refresh a served project's changed sections until it is dropped."""
+        from watcher import wait_debounced
+
+        report = served.report
+        try:
+            while not served.stopped.is_set():
+                changed = wait_debounced(served.watcher, timeout=SERVE_STOP_CHECK_SECONDS)
+                sections = affected_sections(changed, report.project_dir, report.context)
+                if not sections:
+                    continue
+                collected = report.collect(sections)
+                with self._lock:
+                    report.update(*collected)
+                PARSE_CACHE.save()
+                served.watcher.set_targets(watch_targets(report.project_dir, report.context))
+        finally:
+            served.watcher.close()
+
+    def answer(self, request: dict) -> tuple[dict, str]:
+        """Return the (status, body) response to a decoded request."""
+        command = request.get("command", "report")
+        if command == "ping":
+            with self._lock:
+                projects = [str(path) for path in self.projects]
+            return {"ok": True, "pid": os.getpid(), "projects": projects}, ""
+        if command == "shutdown":
+            return {"ok": True}, ""
+        if command != "report":
+            return {"ok": False, "error": f"unknown command: {command}"}, ""
+
+        output_format = request.get("format", "markdown")
+        if output_format not in SERVE_FORMATS:
+            return {"ok": False, "error": f"unknown format: {output_format}"}, ""
+        context_window = request.get("context_window") or self.context_window
+        if not isinstance(context_window, int) or context_window <= 0:
+            return {"ok": False, "error": "context_window must be a positive integer"}, ""
+        project_dir = Path(request.get("project") or "")
+        if not project_dir.is_absolute() or not project_dir.is_dir():
+            return {"ok": False, "error": f"not a project directory: {project_dir}"}, ""
+
+        report = self.project(project_dir.resolve())
+        with self._lock:
+            if output_format == "summary":
+                body = "\n".join(render_summary(report.context, report.estimator, context_window))
+            else:
+                body = report.render(output_format, context_window)
+        return {"ok": True}, body
+
+    def close(self) -> None:
+        """Stop every watcher thread."""
+        with self._lock:
+            for served in self.projects.values():
+                served.stopped.set()
+            self.projects.clear()
+
+
+def handle_request(handler) -> None:
+    """Read one JSON request line; reply with a JSON status line and the body.
+
+    The handle() method of serve()'s socketserver request handler.
+    """
+    try:
+        request = json.loads(handler.rfile.readline())
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        status, body = {"ok": False, "error": f"bad request: {e}"}, ""
+    else:
+        status, body = handler.server.introspection.answer(request)
+        if request.get("command") == "shutdown":
+            threading.Thread(target=handler.server.shutdown, daemon=True).start()
+    try:
+        handler.wfile.write(json.dumps(status).encode("utf-8") + b"\n")
+        handler.wfile.write(body.encode("utf-8"))
+    except BrokenPipeError:
+        pass
+
+
+def socket_in_use(socket_path: Path) -> bool:
+    """Return True if a server is accepting connections on socket_path."""
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: Path, estimator=None, context_window: int = DEFAULT_CONTEXT_WINDOW,
+          poll: bool = False, warm: Path | None = None) -> None:
+    """Serve report queries on socket_path until interrupted or told to shut down."""
+    import signal
+    import socketserver
+
+    class IntrospectionRequestHandler(socketserver.StreamRequestHandler):
+        handle = handle_request
+
+    if socket_in_use(socket_path):
+        raise SystemExit(f"An introspection server is already listening on {socket_path}")
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    introspection = IntrospectionServer(estimator, context_window, poll)
+    if warm:
+        introspection.answer({"project": str(warm.resolve()), "format": "summary"})
+
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(socket_path), IntrospectionRequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    server.introspection = introspection
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving context introspection on {socket_path}. Press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        introspection.close()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+        PARSE_CACHE.save()
+
+
+def snapshot_report(project_dir: Path, output_file: Path | None, estimator, context_window: int,
+                    output_format: str, save: bool, diff_spec: str | None, parser) -> None:
+    """Write the report, or a diff against a snapshot, and optionally save a snapshot."""
+    previous = snapshot_path = None
+    if diff_spec:
+        try:
+            previous, snapshot_path = load_snapshot(diff_spec, project_dir)
+        except ValueError as e:
+            parser.error(str(e))
+
+    context = collect_context(project_dir, estimator)
+    snapshot = build_snapshot(project_dir, context, estimator, previous)
+
+    if previous is not None:
+        diff = diff_snapshots(previous, snapshot)
+        if output_format == "markdown":
+            lines = render_diff(diff, previous, snapshot_path, project_dir)
+        else:
+            lines = iter_diff_json(diff, previous, snapshot_path, project_dir, output_format)
+    elif output_format == "markdown":
+        lines = None
+    elif output_format == "json":
+        lines = [render_json(project_dir, context, estimator, context_window)]
+    elif output_format == "html":
+        lines = [render_html(project_dir, context, estimator, context_window)]
+    else:
+        records = iter_folded_records(context)
+        lines = iter_ndjson(project_dir, records, estimator, context_window)
+
+    def write(stream):
+        if lines is None:
+            write_report(project_dir, stream, estimator, context_window, context)
+        else:
+            writer = ChunkedWriter(stream)
+            writer.write_lines(lines)
+            writer.flush()
+        if output_format != "markdown" or not output_file:
+            stream.write("\n")
+
+    emit(write, output_file)
+    if save:
+        print(f"Snapshot saved: {save_snapshot(snapshot)}", file=sys.stderr)
+
+
+def main():
+    """Main entry point."""
+    global JOBS
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate a report of all context sources influencing Claude Code sessions.",
+    )
+    parser.add_argument("project_dir", nargs="?", type=Path, default=Path.cwd(),
+                        help="project directory to inspect (default: current directory)")
+    parser.add_argument("output_file", nargs="?", type=Path,
+                        help="write the report here instead of stdout")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"ignore and don't update the parse cache in {CACHE_DIR}")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="read and parse context files on N threads (default: 1); "
+                             "with --batch, the number of worker processes (default: CPU count)")
+    parser.add_argument("--context-window", type=int, metavar="TOKENS",
+                        help=f"context window size for the budget table (default: {DEFAULT_CONTEXT_WINDOW})")
+    parser.add_argument("--token-vocab", type=Path, metavar="FILE",
+                        help="count tokens exactly with a local tiktoken-format BPE vocabulary")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="markdown", dest="output_format",
+                        help="report format; ndjson streams one record per line as files are read, "
+                             "html writes a self-contained page with search")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and regenerate the report when context files change")
+    parser.add_argument("--poll", action="store_true",
+                        help="with --watch or --serve, poll for changes instead of using inotify")
+    parser.add_argument("--snapshot", action="store_true",
+                        help=f"also save a manifest of every context source under {SNAPSHOT_DIR}")
+    parser.add_argument("--diff", metavar="SNAPSHOT",
+                        help="report what was added, removed or changed since a snapshot file "
+                             "(or 'latest' for this project's most recent one)")
+    parser.add_argument("--serve", action="store_true",
+                        help="run a daemon answering report queries on a Unix socket "
+                             "(see introspect_client.py)")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH, metavar="PATH",
+                        help=f"socket path for --serve (default: {SOCKET_PATH})")
+    parser.add_argument("--batch", nargs="+", metavar="PROJECT",
+                        help="report on many projects: directories, glob patterns, or @FILE "
+                             "with one per line (@- for stdin)")
+    parser.add_argument("--output-dir", type=Path, default=Path("introspect-reports"), metavar="DIR",
+                        help="with --batch, where to write the reports and summary "
+                             "(default: ./introspect-reports)")
+    parser.add_argument("--summary", action="store_true",
+                        help="only count the entries of each section, with a minimal-startup "
+                             "path for status lines (with --context-window, add the context budget)")
+    parser.add_argument("--rule-paths", action="store_true",
+                        help="report which project files each path-scoped rule applies to, "
+                             "and which rules match nothing")
+    parser.add_argument("--simulate", metavar="PROMPT",
+                        help="rank the skills, agents and commands whose descriptions best match "
+                             f"PROMPT (BM25, with an incremental index in {SKILL_INDEX_FILE})")
+    parser.add_argument("--overlaps", action="store_true",
+                        help="list skill, agent and command descriptions similar enough to "
+                             "compete for the same prompts")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each discovery and render phase and count file system "
+                             "calls, in a report footer (or a 'profile' key/line)")
+    parser.add_argument("--profile-dump", type=Path, metavar="FILE",
+                        help="with --profile, also save cProfile statistics to FILE "
+                             "(readable with pstats or snakeviz)")
+    args = parser.parse_args()
+
+    project_dir = args.project_dir
+    output_file = args.output_file
+    PARSE_CACHE.enabled = not args.no_cache
+    JOBS = max(1, args.jobs or 1)
+
+    # --summary only estimates tokens for a context budget when asked for one
+    budget_summary = args.summary and args.context_window is not None
+    if args.context_window is None:
+        args.context_window = DEFAULT_CONTEXT_WINDOW
+    if args.context_window <= 0:
+        parser.error("--context-window must be a positive number of tokens")
+    try:
+        estimator = load_estimator(args.token_vocab)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot load token vocabulary: {e}")
+
+    if (args.snapshot or args.diff) and (args.batch or args.serve or args.watch):
+        parser.error("--snapshot and --diff cannot be combined with --batch, --serve or --watch")
+    if args.summary and args.output_format == "html":
+        parser.error("--summary does not support --format html")
+    if args.diff and args.output_format == "html":
+        parser.error("--diff does not support --format html")
+    if args.summary and (args.batch or args.serve or args.watch or args.snapshot or args.diff):
+        parser.error("--summary cannot be combined with --batch, --serve, --watch, --snapshot or --diff")
+    if args.profile_dump and not args.profile:
+        parser.error("--profile-dump requires --profile")
+    simulate = args.simulate is not None or args.overlaps
+    if args.profile and (args.batch or args.serve or args.watch or args.snapshot or args.diff or args.summary
+                         or args.rule_paths or simulate):
+        parser.error("--profile cannot be combined with --batch, --serve, --watch, --snapshot, --diff, "
+                     "--summary, --rule-paths, --simulate or --overlaps")
+    if args.rule_paths and (args.batch or args.serve or args.watch or args.snapshot or args.diff or args.summary):
+        parser.error("--rule-paths cannot be combined with --batch, --serve, --watch, --snapshot, --diff "
+                     "or --summary")
+    if args.rule_paths and args.output_format not in ("markdown", "json"):
+        parser.error("--rule-paths only supports --format markdown or json")
+    if simulate and (args.batch or args.serve or args.watch or args.snapshot or args.diff or args.summary
+                     or args.rule_paths):
+        parser.error("--simulate and --overlaps cannot be combined with --batch, --serve, --watch, "
+                     "--snapshot, --diff, --summary or --rule-paths")
+    if simulate and args.output_format not in ("markdown", "json"):
+        parser.error("--simulate and --overlaps only support --format markdown or json")
+    if args.simulate is not None and not args.simulate.strip():
+        parser.error("--simulate needs a non-empty prompt")
+    if args.summary:
+        if not project_dir.is_dir():
+            parser.error(f"not a project directory: {project_dir}")
+        if budget_summary:
+            write_budget_summary(project_dir, output_file, args.output_format, estimator, args.context_window)
+        else:
+            write_summary(str(project_dir), output_file, args.output_format)
+        return
+
+    if args.batch:
+        try:
+            projects = expand_projects(args.batch)
+        except OSError as e:
+            parser.error(f"cannot read project list: {e}")
+        if not projects:
+            parser.error("--batch matched no project directories")
+        summary_file = batch_report(projects, args.output_dir, estimator, args.context_window,
+                                    args.output_format, args.jobs)
+        print(f"Reports for {len(projects)} projects written to: {args.output_dir}")
+        print(f"Summary: {summary_file}")
+        return
+
+    if args.serve:
+        serve(args.socket, estimator, args.context_window, poll=args.poll, warm=project_dir)
+        return
+
+    if args.watch:
+        watch_report(project_dir, output_file, estimator, args.context_window,
+                     poll=args.poll, output_format=args.output_format)
+        return
+
+    if args.snapshot or args.diff:
+        snapshot_report(project_dir, output_file, estimator, args.context_window,
+                        args.output_format, args.snapshot, args.diff, parser)
+        PARSE_CACHE.save()
+        return
+
+    if args.rule_paths:
+        def write(stream):
+            analysis = analyze_rule_paths(project_dir)
+            if args.output_format == "json":
+                stream.write(json.dumps(analysis, indent=2) + "\n")
+                return
+            writer = ChunkedWriter(stream)
+            writer.write_lines(render_rule_paths(analysis))
+            writer.flush()
+    elif simulate:
+        def write(stream):
+            simulation = simulate_prompt(project_dir, args.simulate, args.overlaps)
+            if args.output_format == "json":
+                stream.write(json.dumps(simulation, indent=2) + "\n")
+                return
+            writer = ChunkedWriter(stream)
+            writer.write_lines(render_simulation(simulation))
+            writer.flush()
+    elif args.output_format == "markdown":
+        def write(stream):
+            write_report(project_dir, stream, estimator, args.context_window)
+            if not output_file:
+                stream.write("\n")
+    else:
+        def write(stream):
+            for chunk in generate_structured_report(project_dir, args.output_format, estimator,
+                                                    args.context_window):
+                stream.write(chunk)
+                stream.flush()
+
+    if not args.profile:
+        emit(write, output_file)
+        PARSE_CACHE.save()
+        return
+
+    PROFILE.enable()
+    # Loaded up front, so reading the cache is not charged to the first phase that looks something up
+    with PROFILE.phase("load_parse_cache"):
+        PARSE_CACHE.load()
+    profiler = None
+    if args.profile_dump:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        emit(write, output_file)
+        PARSE_CACHE.save()
+    finally:
+        PROFILE.disable()
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile_dump)
+            print(f"cProfile statistics written to: {args.profile_dump}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
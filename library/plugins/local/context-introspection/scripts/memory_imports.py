@@ -0,0 +1,146 @@
+"""
+@import resolution for memory files.
+
+Claude Code expands "@path/to/file" references in CLAUDE.md files and rules
+(outside code spans and fenced code blocks) into the referenced file,
+recursively up to MAX_IMPORT_DEPTH hops. ImportResolver rebuilds that
+include graph for each root memory file: every file is loaded (and its
+imports parsed) once per resolver however many roots import it, cycles
+are reported instead of followed, and each file's size and tokens are
+counted once per root.
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+
+# === Constants ===
+
+MAX_IMPORT_DEPTH = 5
+
+# "@" at the start of a line or after whitespace, then a path in which
+# spaces may be escaped with a backslash
+IMPORT_PATTERN = re.compile(r"(?:^|(?<=\s))@((?:[^\s\\]|\\ )+)", re.MULTILINE)
+CODE_SPAN_PATTERN = re.compile(r"(`+)(?:(?!\1).)+?\1")
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+# An import must look like a path: start with "./", "../", "~/" or "/", or
+# end in a file extension, so prose such as "@scope/pkg" or "@team" is not one
+PATH_LIKE = re.compile(r"(?:\.{1,2}/|~/|/)|.*\.\w+$")
+# Sentence punctuation after an import in prose
+TRAILING_PUNCTUATION = ".,;:!?)"
+# Import statuses, besides "ok"
+IMPORT_STATUSES = {
+    "missing": "not found",
+    "cycle": "cycle, not expanded again",
+    "repeated": "already imported",
+    "too_deep": f"deeper than {MAX_IMPORT_DEPTH} hops, not expanded",
+}
+
+
+# === Parsing ===
+
+def strip_code(text: str) -> str:
+    """Blank out fenced code blocks and inline code spans."""
+    lines = []
+    fence = None
+    for line in text.split("\n"):
+        match = FENCE_PATTERN.match(line)
+        if fence:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            lines.append("")
+        elif match:
+            fence = match.group(1)
+            lines.append("")
+        else:
+            lines.append(CODE_SPAN_PATTERN.sub(" ", line))
+    return "\n".join(lines)
+
+
+def extract_imports(text: str) -> list[str]:
+    """Return the @import paths of a memory file, in order, without repeats.
+
+    An import starts a line or follows whitespace, and must look like a path
+    (see PATH_LIKE) once trailing sentence punctuation is dropped.
+    """
+    specs = []
+    for match in IMPORT_PATTERN.finditer(strip_code(text)):
+        spec = match.group(1).replace("\\ ", " ").rstrip(TRAILING_PUNCTUATION)
+        if PATH_LIKE.match(spec) and spec not in specs:
+            specs.append(spec)
+    return specs
+
+
+def resolve_spec(spec: str, base_dir: Path, home: Path) -> Path:
+    """Resolve an import path relative to the importing file's directory."""
+    if spec == "~" or spec.startswith("~/"):
+        return home / spec[2:]
+    return Path(os.path.normpath(base_dir / spec))
+
+
+# === Resolution ===
+
+class ImportResolver:
+    """Expand the imports of memory files.
+
+    load_node(path) returns {"size", "tokens", "imports"} for a file, or
+    None if it does not exist; results are memoized by path.
+    """
+
+    def __init__(self, load_node, home: Path, max_depth: int = MAX_IMPORT_DEPTH):
+        self.load_node = load_node
+        self.home = home
+        self.max_depth = max_depth
+        self._nodes: dict[str, dict | None] = {}
+
+    def node(self, path: Path) -> dict | None:
+        key = str(path)
+        if key not in self._nodes:
+            self._nodes[key] = self.load_node(path)
+        return self._nodes[key]
+
+    def resolve(self, root: Path) -> dict:
+        """Return the imports of root, depth first, and their totals.
+
+        Each import is {"path", "from", "depth", "status", "size", "tokens"};
+        size and tokens are None unless the status is "ok". The totals
+        cover every distinct file imported, directly or not.
+        """
+        imports = []
+        seen = {os.path.realpath(root)}
+        totals = {"size": 0, "tokens": 0}
+
+        def visit(path: Path, depth: int, chain: tuple[str, ...]) -> None:
+            node = self.node(path)
+            for spec in node["imports"] if node else ():
+                target = resolve_spec(spec, path.parent, self.home)
+                key = os.path.realpath(target)
+                child = self.node(target)
+                if child is None:
+                    status = "missing"
+                elif key in chain:
+                    status = "cycle"
+                elif depth > self.max_depth:
+                    status = "too_deep"
+                elif key in seen:
+                    status = "repeated"
+                else:
+                    status = "ok"
+                imports.append({
+                    "path": str(target),
+                    "from": str(path),
+                    "depth": depth,
+                    "status": status,
+                    "size": child["size"] if status == "ok" else None,
+                    "tokens": child["tokens"] if status == "ok" else None,
+                })
+                if status == "ok":
+                    seen.add(key)
+                    totals["size"] += child["size"]
+                    totals["tokens"] += child["tokens"]
+                    visit(target, depth + 1, (*chain, key))
+
+        visit(root, 1, (os.path.realpath(root),))
+        return {"imports": imports, "size": totals["size"], "tokens": totals["tokens"]}
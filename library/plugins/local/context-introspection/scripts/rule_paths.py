@@ -0,0 +1,295 @@
+"""
+Path-scoped rule coverage: which project files each rule's `paths` globs match.
+
+The project tree is walked once with os.scandir, without following
+symlinks, skipping .git and whatever .gitignore files exclude. Globs are
+split into path segments and each directory only carries the globs that
+can still match below it: a glob is dropped as soon as a directory name
+fails its next segment, so subtrees no glob can reach are never listed,
+and a glob is only matched against whole paths once it has passed a "**".
+Files are first tested against one combined regex of the globs active in
+their directory (cached per set of globs); only the files it accepts are
+matched against each glob to attribute them to rules. Ignore rules work
+the same way, with one combined regex per directory.
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+
+# === Constants ===
+
+# Glob state once a glob has passed a "**": only its full regex decides
+FREE = -1
+WILDCARD_CHARS = frozenset("*?[\\")
+IGNORE_FILE = ".gitignore"
+SKIPPED_DIRS = frozenset({".git"})
+
+
+# === Glob Translation ===
+
+def expand_braces(pattern: str) -> list[str]:
+    """Expand "{a,b}" alternatives: "src/*.{ts,tsx}" -> ["src/*.ts", "src/*.tsx"]."""
+    depth = 0
+    start = None
+    for index, char in enumerate(pattern):
+        if char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                options = split_top_level(pattern[start + 1:index])
+                if len(options) > 1:
+                    head, tail = pattern[:start], pattern[index + 1:]
+                    return [expanded for option in options for expanded in expand_braces(head + option + tail)]
+    return [pattern]
+
+
+def split_top_level(text: str) -> list[str]:
+    """Split text on commas outside braces."""
+    parts = [""]
+    depth = 0
+    for char in text:
+        if char == "," and depth == 0:
+            parts.append("")
+            continue
+        depth += (char == "{") - (char == "}")
+        parts[-1] += char
+    return parts
+
+
+def translate_segment(segment: str) -> str:
+    """Translate one path segment of a glob to a regex (no "/" matched)."""
+    out = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "\\" and index < len(segment):
+            out.append(re.escape(segment[index]))
+            index += 1
+        elif char == "[":
+            end = segment.find("]", index + 1 if segment[index:index + 1] in ("!", "^") else index)
+            if end < 0:
+                out.append(re.escape(char))
+                continue
+            body = segment[index:end].replace("\\", "\\\\")
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            index = end + 1
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
+
+
+def translate(pattern: str) -> str:
+    """Translate a "/"-separated glob to a regex; "**" spans any number of directories."""
+    parts = pattern.split("/")
+    out = []
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            out.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            out.append(translate_segment(part) + ("" if last else "/"))
+    return "".join(out)
+
+
+def rule_globs(paths) -> list[str]:
+    """Return the globs of a rule's `paths` frontmatter (a list, or a comma-separated string)."""
+    items = paths if isinstance(paths, list) else split_top_level(str(paths))
+    globs = []
+    for item in items:
+        item = str(item).strip()
+        if item.startswith("./"):
+            item = item[2:]
+        for pattern in expand_braces(item.lstrip("/")):
+            if pattern and pattern not in globs:
+                globs.append(pattern)
+    return globs
+
+
+# === Globs ===
+
+class Glob:
+    """One glob of a rule, split into segments for pruning the walk."""
+
+    def __init__(self, rule: int, pattern: str):
+        self.rule = rule
+        self.pattern = pattern
+        self.parts = pattern.split("/")
+        # Literal text or a compiled regex per segment ("**" stays as is)
+        self.segments = [
+            part if part == "**" or not WILDCARD_CHARS & set(part) else re.compile(translate_segment(part) + r"\Z")
+            for part in self.parts
+        ]
+        self.source = translate(pattern)
+        self.regex = re.compile(self.source + r"\Z")
+        literal = 0
+        while literal < len(self.parts) - 1 and isinstance(self.segments[literal], str) and self.parts[literal] != "**":
+            literal += 1
+        # Matches are grouped by the directory one level below the literal prefix
+        self.group_depth = literal + 1
+
+    def segment_matches(self, position: int, name: str) -> bool:
+        segment = self.segments[position]
+        return segment == name if isinstance(segment, str) else segment.match(name) is not None
+
+    def enter(self, position: int, name: str) -> int | None:
+        """Return the glob's position inside subdirectory name, or None if it cannot match there."""
+        if position == FREE or self.parts[position] == "**":
+            return FREE
+        if position < len(self.parts) - 1 and self.segment_matches(position, name):
+            return position + 1
+        return None
+
+    def may_match_file(self, position: int, name: str) -> bool:
+        """Check whether a file called name, in a directory at position, can match."""
+        if position == FREE or self.parts[position] == "**":
+            return True
+        return position == len(self.parts) - 1 and self.segment_matches(position, name)
+
+
+# === Ignore Rules ===
+
+def ignore_pattern(line: str, base: str) -> tuple[str, bool] | None:
+    """Translate a .gitignore line to a (regex, negated) pair for paths relative to the root.
+
+    base is the ignore file's directory, relative to the root, with a
+    trailing "/" (or ""). Directories are tested with a trailing "/".
+    """
+    line = line.rstrip("\n\r")
+    if not line.strip() or line.startswith("#"):
+        return None
+    line = line.rstrip(" ") if not line.endswith("\\ ") else line
+    negated = line.startswith("!")
+    if negated or line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    body = translate(line.lstrip("/"))
+    prefix = re.escape(base) + ("" if anchored else "(?:.*/)?")
+    # The body must not end on a directory's own trailing "/" ("d/*" does not match "d/")
+    return prefix + body + ("/" if dir_only else "(?<!/)/?") + r"\Z", negated
+
+
+class IgnoreMatcher:
+    """The ignore rules in effect in one directory; later rules win."""
+
+    def __init__(self, rules: tuple[tuple[str, bool], ...] = ()):
+        self.rules = rules
+        self.compiled = [(re.compile(source), negated) for source, negated in rules]
+        self.any = re.compile("|".join(f"(?:{source})" for source, _ in rules)) if rules else None
+        self.has_negations = any(negated for _, negated in rules)
+
+    def extend(self, path: Path, base: str) -> IgnoreMatcher:
+        """Return the matcher with the rules of the ignore file at path added."""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except OSError:
+            return self
+        rules = [rule for rule in (ignore_pattern(line, base) for line in lines) if rule]
+        return IgnoreMatcher(self.rules + tuple(rules)) if rules else self
+
+    def ignored(self, path: str) -> bool:
+        if self.any is None or self.any.match(path) is None:
+            return False
+        if not self.has_negations:
+            return True
+        for regex, negated in reversed(self.compiled):
+            if regex.match(path):
+                return not negated
+        return False
+
+
+# === Walk ===
+
+def match_rules(project_dir: Path, rules: list[list[str]]) -> dict:
+    """Match every rule's globs against the project's files in one walk.
+
+    rules holds the globs of each rule. Returns the walk's counters, then
+    per rule {"files", "subtrees": {directory: files}} and per glob
+    {"rule", "pattern", "files"}. A file counts once per rule, in the
+    subtree of the first of the rule's globs it matches.
+    """
+    globs = [Glob(rule, pattern) for rule, patterns in enumerate(rules) for pattern in patterns]
+    results = [{"rule": glob.rule, "pattern": glob.pattern, "files": 0} for glob in globs]
+    rule_results = [{"files": 0, "subtrees": {}} for _ in rules]
+    stats = {"dirs_listed": 0, "files_seen": 0, "ignored": 0}
+    combined: dict[tuple[int, ...], re.Pattern] = {}
+
+    ignore = IgnoreMatcher()
+    exclude = project_dir / ".git" / "info" / "exclude"
+    if exclude.is_file():
+        ignore = ignore.extend(exclude, "")
+    pending = [(project_dir, "", tuple((index, 0) for index in range(len(globs))), ignore)]
+    while pending:
+        directory, rel, states, ignore = pending.pop()
+        if not states:
+            continue
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        stats["dirs_listed"] += 1
+        if any(entry.name == IGNORE_FILE for entry in entries):
+            ignore = ignore.extend(directory / IGNORE_FILE, rel)
+
+        active = tuple(index for index, _ in states)
+        precheck = combined.get(active)
+        if precheck is None:
+            precheck = combined[active] = re.compile("|".join(f"(?:{globs[index].source})" for index in active) + r"\Z")
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            path = rel + name
+            if is_dir:
+                if name in SKIPPED_DIRS:
+                    continue
+                if ignore.ignored(path + "/"):
+                    stats["ignored"] += 1
+                    continue
+                child = []
+                for index, position in states:
+                    position = globs[index].enter(position, name)
+                    if position is not None:
+                        child.append((index, position))
+                pending.append((directory / name, path + "/", tuple(child), ignore))
+                continue
+            stats["files_seen"] += 1
+            if precheck.match(path) is None:
+                continue
+            if ignore.ignored(path):
+                stats["ignored"] += 1
+                continue
+            matched = set()
+            for index, position in states:
+                glob = globs[index]
+                if glob.may_match_file(position, name) and glob.regex.match(path):
+                    results[index]["files"] += 1
+                    if glob.rule in matched:
+                        continue
+                    matched.add(glob.rule)
+                    parts = path.split("/")
+                    group = "/".join(parts[:min(glob.group_depth, len(parts) - 1)]) or "."
+                    result = rule_results[glob.rule]
+                    result["files"] += 1
+                    result["subtrees"][group] = result["subtrees"].get(group, 0) + 1
+    return {**stats, "rules": rule_results, "globs": results}
@@ -0,0 +1,221 @@
+"""
+BM25 index over skill, agent and command descriptions, for --simulate.
+
+Claude decides which skill, agent or command to use from its name and
+description alone. SkillIndex ranks those descriptions against a prompt
+with Okapi BM25 as an approximation of that choice, and finds descriptions
+similar enough to compete for the same prompts.
+
+The index is saved between runs as an inverted index (term -> {document:
+term frequency}) plus each document's terms, length and the mtime and size
+it was indexed at. Only documents whose file changed are re-tokenized, and
+their postings are updated in place; document frequencies and the average
+length are taken over the documents in use at query time, so one index can
+serve every project.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+
+# === Constants ===
+
+# Bump when tokenize() or document ids change, so saved entries are rebuilt
+# (2: ids are canonical paths)
+INDEX_VERSION = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Pairs of descriptions at least this similar are reported as overlapping
+OVERLAP_THRESHOLD = 0.4
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+# Words that say nothing about when to use a skill
+STOPWORDS = frozenset("""
+    a an and any are as at be by can for from how i if in into is it its me my of on or our so that the
+    their them then there these this to use used uses using via what when which while who will with you your
+""".split())
+SUFFIXES = ("ing", "ed", "s")
+MIN_STEM = 3
+
+
+# === Tokenizing ===
+
+def stem(word: str) -> str:
+    """Strip plural and verb endings: "debugging", "debugged" and "debugs" all
+    become "debug", "creates" and "creating" become "creat"."""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and not word.endswith("ss") and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > MIN_STEM:
+        word = word[:-1]
+    if len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in "aeiouls":
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase, stemmed terms, without stopwords or single characters."""
+    return [stem(word) for word in WORD_PATTERN.findall(text.lower()) if len(word) > 1 and word not in STOPWORDS]
+
+
+# === Index ===
+
+class SkillIndex:
+    """Inverted index of descriptions, keyed by file path."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.docs: dict[str, dict] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path | None) -> SkillIndex:
+        """Load the index saved at path, or start an empty one."""
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (TypeError, OSError, ValueError):
+            return index
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            index.docs = data.get("docs") or {}
+            index.postings = data.get("postings") or {}
+        return index
+
+    def save(self) -> None:
+        """Write the index back to its path if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        payload = {"version": INDEX_VERSION, "docs": self.docs, "postings": self.postings}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return
+        self._dirty = False
+
+    def add(self, doc_id: str, text: str, mtime_ns: int, size: int, **fields) -> None:
+        """Index (or re-index) a document; fields are stored with it for display."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.docs[doc_id] = {
+            **fields,
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "length": sum(terms.values()),
+            "terms": dict(terms),
+        }
+        self._dirty = True
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document and its postings."""
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc["terms"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self._dirty = True
+
+    def update(self, documents: list[dict], prune_prefixes: tuple[str, ...] = ()) -> int:
+        """Bring the index up to date with documents; return how many were (re-)indexed.
+
+        Each document is {"id", "text", "mtime_ns", "size", ...}; one is only
+        re-tokenized if its mtime or size changed. Indexed documents under
+        prune_prefixes that are not in documents are dropped.
+        """
+        indexed = 0
+        current = set()
+        for document in documents:
+            doc_id = document["id"]
+            current.add(doc_id)
+            doc = self.docs.get(doc_id)
+            if doc and doc["mtime_ns"] == document["mtime_ns"] and doc["size"] == document["size"]:
+                continue
+            fields = {key: value for key, value in document.items() if key not in ("id", "text")}
+            self.add(doc_id, document["text"], **fields)
+            indexed += 1
+        for doc_id in [doc_id for doc_id in self.docs if doc_id not in current and doc_id.startswith(prune_prefixes)]:
+            self.remove(doc_id)
+        return indexed
+
+    def _scorer(self, doc_ids: set[str]):
+        """Return score(terms) -> {doc_id: (score, matched terms)} over doc_ids."""
+        count = len(doc_ids)
+        average = sum(self.docs[doc_id]["length"] for doc_id in doc_ids) / count if count else 0
+        idf_cache: dict[str, float] = {}
+
+        def score(terms) -> dict[str, tuple[float, list[str]]]:
+            scores: dict[str, list] = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                matching = [(doc_id, tf) for doc_id, tf in posting.items() if doc_id in doc_ids]
+                if term not in idf_cache:
+                    df = len(matching)
+                    idf_cache[term] = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                idf = idf_cache[term]
+                for doc_id, tf in matching:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.docs[doc_id]["length"] / average)
+                    entry = scores.setdefault(doc_id, [0.0, []])
+                    entry[0] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    entry[1].append(term)
+            return {doc_id: (value, matched) for doc_id, (value, matched) in scores.items()}
+
+        return score
+
+    def search(self, query: str, doc_ids: set[str] | None = None, limit: int | None = None) -> list[dict]:
+        """Rank documents by BM25 relevance to query, best first.
+
+        Only doc_ids (default: all) are ranked, and they alone determine
+        document frequencies. Returns [{"id", "score", "terms"}].
+        """
+        doc_ids = set(self.docs) if doc_ids is None else doc_ids & self.docs.keys()
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores = self._scorer(doc_ids)(terms)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], item[0]))
+        return [{"id": doc_id, "score": value, "terms": matched} for doc_id, (value, matched) in ranked[:limit]]
+
+    def overlaps(self, doc_ids: set[str] | None = None, threshold: float = OVERLAP_THRESHOLD) -> list[dict]:
+        """Find pairs of documents that rank highly for each other's text.
+
+        Each document's terms are used as a query; a score is normalized by
+        the query document's score against itself, and a pair's similarity
+        is the mean of both directions. Returns [{"ids", "similarity",
+        "terms"}], most similar first.
+        """
+        doc_ids = set(self.docs) if doc_ids is None else doc_ids & self.docs.keys()
+        score = self._scorer(doc_ids)
+        relative: dict[tuple[str, str], float] = {}
+        shared: dict[tuple[str, str], list[str]] = {}
+        for doc_id in doc_ids:
+            scores = score(self.docs[doc_id]["terms"])
+            own = scores.get(doc_id, (0.0, []))[0]
+            if own <= 0:
+                continue
+            for other, (value, matched) in scores.items():
+                if other != doc_id:
+                    relative[(doc_id, other)] = value / own
+                    shared[tuple(sorted((doc_id, other)))] = matched
+        pairs = []
+        for (first, second), matched in shared.items():
+            similarity = (relative.get((first, second), 0.0) + relative.get((second, first), 0.0)) / 2
+            if similarity >= threshold:
+                pairs.append({"ids": [first, second], "similarity": similarity, "terms": sorted(matched)})
+        pairs.sort(key=lambda pair: (-pair["similarity"], pair["ids"]))
+        return pairs
@@ -0,0 +1,331 @@
+"""
+Minimal-startup entry counts for introspect.py --summary.
+
+Status lines and hooks run the summary on every prompt, so this module only
+imports os, sys, time and context_paths (which imports nothing else) up
+front: entries are counted from directory listings, settings files are only
+JSON-decoded when their raw bytes mention the key being looked for, and
+~/.claude.json, which can grow to megabytes, is only scanned for its MCP
+settings (see claude_json.py) when it changed since the last scan:
+MCP_SUMMARY_FILE keeps the result, keyed by the file's mtime and size.
+As in the full report, every location counts, identical copies included, so
+context files are never opened: nothing is parsed or hashed, no previews are
+read and no token estimates are made.
+
+Paths come from context_paths, shared with introspection.py; the discovery
+rules mirror its find_* functions, and tests/test_summary.py checks that
+both give the same counts.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from context_paths import (
+    AGENTS_DIR,
+    CACHE_DIR,
+    ANCESTOR_MEMORY_FILES,
+    COMMANDS_DIR,
+    CONTEXT_SUFFIX,
+    ENTERPRISE_CLAUDE_MD,
+    ENTERPRISE_DIR,
+    ENTERPRISE_MCP,
+    ENTERPRISE_SETTINGS,
+    LOCAL_MEMORY_FILE,
+    PROJECT_CLAUDE_DIR,
+    PROJECT_MCP_FILE,
+    PROJECT_SETTINGS_FILES,
+    RACY_MTIME_NS,
+    RULES_DIR,
+    SKILL_FILE,
+    SKILLS_DIR,
+    USER_CLAUDE_DIR,
+    USER_CLAUDE_JSON,
+    USER_CLAUDE_MD,
+    USER_RULES_DIR,
+    USER_SETTINGS,
+)
+
+
+# === Constants ===
+
+# Summary rows, in report order
+COUNT_LABELS = {
+    "memory_files": "Memory files",
+    "skills": "Skills",
+    "hooks": "Hook sources",
+    "mcp_servers": "MCP server sources",
+    "agents": "Custom agents",
+    "commands": "Custom commands",
+}
+SUMMARY_SCHEMA = "context-introspection-summary"
+SUMMARY_VERSION = 1
+SUMMARY_FORMATS = ("markdown", "json", "ndjson")
+
+# Whether ~/.claude.json has user MCP servers and which projects have their
+# own, as plain text: a "version mtime_ns size" line, "1" or "0", then one
+# project path per line
+MCP_SUMMARY_FILE = os.path.join(CACHE_DIR, "mcp-summary.txt")
+MCP_SUMMARY_VERSION = 1
+
+
+# === Counting ===
+
+def list_files(directory: str, suffix: str, recursive: bool = False) -> list[str]:
+    """List files ending in suffix, not descending into symlinked directories."""
+    found = []
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    found.append(entry.path)
+            except OSError:
+                continue
+    return found
+
+
+def list_skills(skills_dir: str) -> list[str]:
+    """List the SKILL.md files of a skills directory's subdirectories."""
+    try:
+        with os.scandir(skills_dir) as it:
+            subdirs = [entry.path for entry in it if entry.is_dir()]
+    except OSError:
+        return []
+    return [path for path in (os.path.join(subdir, SKILL_FILE) for subdir in subdirs) if os.path.exists(path)]
+
+
+def memory_file_paths(project_dir: str) -> list[str]:
+    """List the existing memory files and rules, like find_memory_files()."""
+    paths = []
+    if ENTERPRISE_DIR:
+        paths.append(os.path.join(ENTERPRISE_DIR, ENTERPRISE_CLAUDE_MD))
+    paths.append(USER_CLAUDE_MD)
+    paths.extend(list_files(USER_RULES_DIR, CONTEXT_SUFFIX, recursive=True))
+
+    seen = set()
+    try:
+        user_stat = os.stat(USER_CLAUDE_MD)
+        seen.add((user_stat.st_dev, user_stat.st_ino))
+    except OSError:
+        pass
+    current = os.path.realpath(project_dir)
+    while current != os.path.dirname(current):
+        for name in ANCESTOR_MEMORY_FILES:
+            path = os.path.join(current, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                paths.append(path)
+        current = os.path.dirname(current)
+
+    paths.extend(list_files(os.path.join(project_dir, PROJECT_CLAUDE_DIR, RULES_DIR), CONTEXT_SUFFIX, recursive=True))
+    paths.append(os.path.join(project_dir, LOCAL_MEMORY_FILE))
+    return [path for path in paths if os.path.isfile(path)]
+
+
+def load_json_mentioning(path: str, key: str):
+    """Decode a JSON file, or return None if it is missing, invalid, or the
+    raw text does not contain the quoted key."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    if key and f'"{key}"'.encode() not in raw:
+        return None
+    import json
+
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def count_hook_sources(project_dir: str) -> int:
+    """Count the settings files that configure hooks, like find_hooks()."""
+    settings_files = [USER_SETTINGS, *(os.path.join(project_dir, name) for name in PROJECT_SETTINGS_FILES)]
+    if ENTERPRISE_DIR:
+        settings_files.append(os.path.join(ENTERPRISE_DIR, ENTERPRISE_SETTINGS))
+    count = 0
+    for path in settings_files:
+        data = load_json_mentioning(path, "hooks")
+        if data and "hooks" in data:
+            count += 1
+    return count
+
+
+def mcp_summary_header(stat: os.stat_result) -> str:
+    return f"{MCP_SUMMARY_VERSION} {stat.st_mtime_ns} {stat.st_size}"
+
+
+def read_mcp_summary(stat: os.stat_result) -> tuple[bool, set[str]] | None:
+    """Return (has user servers, projects with servers) from MCP_SUMMARY_FILE,
+    or None unless it was written for a ~/.claude.json with this stat."""
+    try:
+        with open(MCP_SUMMARY_FILE, encoding="utf-8", newline="") as f:
+            lines = f.read().split("\n")
+    except (OSError, ValueError):
+        return None
+    if len(lines) < 2 or lines[0] != mcp_summary_header(stat):
+        return None
+    return lines[1] == "1", set(lines[2:])
+
+
+def write_mcp_summary(stat: os.stat_result, settings: dict) -> None:
+    """Write what count_mcp_sources() needs from ~/.claude.json's extracted
+    MCP settings to MCP_SUMMARY_FILE, keyed by the file's stat.
+
+    Nothing is written while the file is within RACY_MTIME_NS of its last
+    change, or if a project path does not fit on one line.
+    """
+    if time.time_ns() - stat.st_mtime_ns < RACY_MTIME_NS:
+        return
+    projects = [path for path, servers in settings.get("projects", {}).items() if servers]
+    if any("\n" in path for path in projects):
+        return
+    lines = [mcp_summary_header(stat), "1" if "mcpServers" in settings else "0", *projects]
+    tmp_path = f"{MCP_SUMMARY_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write("\n".join(lines))
+        os.replace(tmp_path, MCP_SUMMARY_FILE)
+    except (OSError, UnicodeError):
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def user_mcp_summary() -> tuple[bool, set[str]]:
+    """Return whether ~/.claude.json configures user MCP servers, and the
+    projects it configures servers for, scanning it only if it changed."""
+    try:
+        stat = os.stat(USER_CLAUDE_JSON)
+    except OSError:
+        return False, set()
+    cached = read_mcp_summary(stat)
+    if cached is not None:
+        return cached
+    from claude_json import read_mcp_servers
+
+    settings = read_mcp_servers(USER_CLAUDE_JSON) or {"projects": {}}
+    write_mcp_summary(stat, settings)
+    return "mcpServers" in settings, {path for path, servers in settings["projects"].items() if servers}
+
+
+def count_mcp_sources(project_dir: str) -> int:
+    """Count the MCP configuration sources, like find_mcp_servers()."""
+    user_servers, projects = user_mcp_summary()
+    count = 1 if user_servers else 0
+    if project_dir in projects or os.path.realpath(project_dir) in projects:
+        count += 1
+    if load_json_mentioning(os.path.join(project_dir, PROJECT_MCP_FILE), ""):
+        count += 1
+    if ENTERPRISE_DIR and load_json_mentioning(os.path.join(ENTERPRISE_DIR, ENTERPRISE_MCP), ""):
+        count += 1
+    return count
+
+
+def count_context(project_dir: str) -> dict:
+    """Return the number of entries per report section, keyed like COUNT_LABELS."""
+    scopes = (USER_CLAUDE_DIR, os.path.join(project_dir, PROJECT_CLAUDE_DIR))
+    skills = [path for scope in scopes for path in list_skills(os.path.join(scope, SKILLS_DIR))]
+    agents = [path for scope in scopes for path in list_files(os.path.join(scope, AGENTS_DIR), CONTEXT_SUFFIX)]
+    commands = [
+        path for scope in scopes
+        for path in list_files(os.path.join(scope, COMMANDS_DIR), CONTEXT_SUFFIX, recursive=True)
+    ]
+    return {
+        "memory_files": len(memory_file_paths(project_dir)),
+        "skills": len(skills),
+        "hooks": count_hook_sources(project_dir),
+        "mcp_servers": count_mcp_sources(project_dir),
+        "agents": len(agents),
+        "commands": len(commands),
+    }
+
+
+# === Output ===
+
+def render_counts(counts: dict) -> list[str]:
+    """Render the counts as the report's summary table."""
+    lines = ["| Category | Found |", "|----------|-------|"]
+    lines.extend(f"| {label} | {counts[name]} |" for name, label in COUNT_LABELS.items())
+    return lines
+
+
+def format_summary(project_dir: str, counts: dict, output_format: str) -> str:
+    """Format the counts as a markdown table or a single JSON object."""
+    if output_format == "markdown":
+        return "\n".join(["## Summary", "", *render_counts(counts)])
+    import json
+
+    document = {"schema": SUMMARY_SCHEMA, "version": SUMMARY_VERSION, "project": project_dir, "counts": counts}
+    return json.dumps(document, indent=2 if output_format == "json" else None)
+
+
+def parse_fast_args(argv: list) -> tuple | None:
+    """Parse "[project_dir] [output_file] --summary [--format FORMAT]".
+
+    Returns (project_dir, output_file, format), or None if argv has anything
+    else, which is left to introspect.py's full argument parser.
+    """
+    positional = []
+    output_format = "markdown"
+    args = iter(argv)
+    for arg in args:
+        if arg == "--summary":
+            continue
+        if arg == "--format":
+            output_format = next(args, None)
+        elif arg.startswith("--format="):
+            output_format = arg.split("=", 1)[1]
+        elif arg.startswith("-") or len(positional) == 2:
+            return None
+        else:
+            positional.append(arg)
+    if output_format not in SUMMARY_FORMATS or (positional and not os.path.isdir(positional[0])):
+        return None
+    positional += [None] * (2 - len(positional))
+    return positional[0] or os.getcwd(), positional[1], output_format
+
+
+def write_summary(project_dir: str, output_file: str | None, output_format: str) -> None:
+    """Count the project's context entries and write the summary."""
+    project_dir = os.path.abspath(project_dir)
+    text = format_summary(project_dir, count_context(project_dir), output_format)
+    if output_file:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Summary written to: {output_file}")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+def main(argv: list) -> bool:
+    """Write the summary if argv needs nothing else; return whether it did."""
+    args = parse_fast_args(argv)
+    if args is None:
+        return False
+    write_summary(*args)
+    return True
+
+
+if __name__ == "__main__":
+    if not main(sys.argv[1:]):
+        print("usage: summary.py [project_dir] [output_file] [--format markdown|json|ndjson]", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,161 @@
+"""
+Token estimation for Claude Code context sources.
+
+The default estimator is a size heuristic that needs no file reads, so
+thousands of files are estimated from their stat() sizes alone. An exact
+count can be had by loading a byte-level BPE vocabulary in tiktoken format
+(one "<base64 token> <rank>" pair per line) from a local file.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import math
+import re
+from pathlib import Path
+
+
+# === Constants ===
+
+CHARS_PER_TOKEN = 4.0
+DEFAULT_CONTEXT_WINDOW = 200_000
+
+# Budget thresholds, as a percentage of the context window
+WARN_PERCENT = 10.0
+CRITICAL_PERCENT = 25.0
+
+# Pre-tokenization split used before BPE merges (approximates the
+# cl100k-style pattern with the character classes `re` supports)
+PRETOKENIZE_PATTERN = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+
+
+# === Estimators ===
+
+class HeuristicEstimator:
+    """Estimate tokens as characters (or bytes) divided by CHARS_PER_TOKEN."""
+
+    name = "heuristic"
+    # Identifies the counts in caches
+    cache_key = "heuristic"
+    exact = False
+
+    def count(self, text: str) -> int:
+        """Estimate the tokens in a string."""
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """Estimate the tokens in each string."""
+        return [math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts]
+
+    def count_files(self, files: list[tuple[Path, int]]) -> list[int]:
+        """Estimate the tokens in each (path, size) file from its size alone."""
+        return [math.ceil(size / CHARS_PER_TOKEN) for _, size in files]
+
+    def count_file_text(self, text: str, size: int) -> int:
+        """Estimate the tokens in a file already read, from its size alone."""
+        return math.ceil(size / CHARS_PER_TOKEN)
+
+
+class BPEEstimator:
+    """Count tokens exactly with a locally loaded byte-level BPE vocabulary."""
+
+    exact = True
+
+    def __init__(self, ranks: dict[bytes, int], name: str = "bpe", cache_key: str | None = None):
+        self.ranks = ranks
+        self.name = name
+        # Counts from another vocabulary file of the same name must not be reused
+        self.cache_key = cache_key or name
+        self._piece_cache: dict[str, int] = {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> BPEEstimator:
+        """Load a tiktoken-format vocabulary file."""
+        ranks = {}
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for line in f:
+                digest.update(line)
+                token, _, rank = line.strip().partition(b" ")
+                if token and rank:
+                    ranks[base64.b64decode(token)] = int(rank)
+        if not ranks:
+            raise ValueError(f"No BPE ranks found in {path}")
+        name = f"bpe:{Path(path).name}"
+        return cls(ranks, name=name, cache_key=f"{name}:{digest.hexdigest()[:16]}")
+
+    def _count_piece(self, piece: bytes) -> int:
+        """Apply BPE merges to one pre-tokenized piece and count the result."""
+        if piece in self.ranks:
+            return 1
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_index = -1
+            for i in range(len(parts) - 1):
+                rank = self.ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    best_index = i
+            if best_rank is None:
+                break
+            parts[best_index:best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a string."""
+        total = 0
+        cache = self._piece_cache
+        for piece in PRETOKENIZE_PATTERN.findall(text):
+            tokens = cache.get(piece)
+            if tokens is None:
+                tokens = cache[piece] = self._count_piece(piece.encode("utf-8"))
+            total += tokens
+        return total
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """Count the tokens in each string, one at a time."""
+        return [self.count(text) for text in texts]
+
+    def count_files(self, files: list[tuple[Path, int]]) -> list[int]:
+        """Count the tokens in each (path, size) file by reading it in full.
+
+        Callers keep the counts (see file_token_counts() in introspection.py),
+        since every call reads and tokenizes the files again.
+        """
+        counts = []
+        for path, _ in files:
+            try:
+                counts.append(self.count(path.read_text(encoding="utf-8")))
+            except (OSError, UnicodeDecodeError):
+                counts.append(0)
+        return counts
+
+    def count_file_text(self, text: str, size: int) -> int:
+        """Count the tokens in a file already read, without reading it again."""
+        return self.count(text)
+
+
+def load_estimator(vocab_path: Path | None = None) -> HeuristicEstimator | BPEEstimator:
+    """Return a BPE estimator for vocab_path, or the heuristic default."""
+    if vocab_path is None:
+        return HeuristicEstimator()
+    return BPEEstimator.from_file(vocab_path)
+
+
+# === Budget ===
+
+def budget_status(percent: float) -> str | None:
+    """Classify a share of the context window against the thresholds."""
+    if percent >= CRITICAL_PERCENT:
+        return "critical"
+    if percent >= WARN_PERCENT:
+        return "warning"
+    return None
+
+
+def format_tokens(tokens: int) -> str:
+    """Format a token count with thousands separators."""
+    return f"{tokens:,}"
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Skill validator: checks every SKILL.md under the given directories in one process.
+
+Applies the checks of library/tools/validate-skill.sh (frontmatter
+delimiters, required name and description, description and line count
+limits, .source tracking file) to whole trees, parsing frontmatter with the
+same parser as introspection.py, so a description that parses there is valid
+here. Skills are validated on a process pool once there are enough of them
+to pay for it.
+
+Results are cached in ~/.claude/cache/introspect/validate-cache.json,
+keyed by SKILL.md path: a file whose mtime and size are unchanged is not
+read, and one that changed is hashed and only re-validated if its content
+did. Output is text, JSON or JUnit XML for CI.
+
+Usage:
+    python validate_skills.py [DIR ...] [--format text|json|junit] [--output FILE]
+                              [--jobs N] [--no-cache] [--verbose]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import context_paths
+from frontmatter import format_value, parse_frontmatter
+
+
+# === Constants ===
+
+USER_SKILLS_DIR = Path(context_paths.USER_SKILLS_DIR)
+CACHE_DIR = Path(context_paths.CACHE_DIR)
+VALIDATE_CACHE_FILE = CACHE_DIR / "validate-cache.json"
+# Bump when the checks change, so cached results are re-validated
+VALIDATE_CACHE_VERSION = 1
+VALIDATE_CACHE_MAX_ENTRIES = 4096
+RACY_MTIME_NS = context_paths.RACY_MTIME_NS
+
+VALIDATION_SCHEMA = "context-introspection-validation"
+VALIDATION_VERSION = 1
+VALIDATE_FORMATS = ("text", "json", "junit")
+
+MAX_DESCRIPTION_CHARS = 1024
+MAX_SKILL_LINES = 500
+SOURCE_FILE = ".source"
+# Below this many skills to (re-)validate, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+SKIPPED_DIRS = frozenset({".git", "node_modules", "__pycache__"})
+LEVEL_LABELS = {"error": "FAIL", "warning": "WARNING", "info": "INFO", "ok": "OK"}
+
+
+# === Discovery ===
+
+def find_skill_dirs(root: Path) -> list[Path]:
+    """Return root if it is a skill, else every skill directory below it.
+
+    The walk does not descend into skills, hidden directories or symlinked
+    directories (a symlink to a skill is still found).
+    """
+    if (root / "SKILL.md").is_file():
+        return [root]
+    found = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if not is_dir or entry.name.startswith(".") or entry.name in SKIPPED_DIRS:
+                continue
+            path = Path(entry.path)
+            if (path / "SKILL.md").is_file():
+                found.append(path)
+            elif not entry.is_symlink():
+                pending.append(path)
+    return sorted(found)
+
+
+# === Checks ===
+
+def check_skill_text(text: str) -> list[dict]:
+    """Run the content checks on a SKILL.md; return its findings in check order.
+
+    Each finding is {"level": "error"|"warning"|"ok", "check", "message"}.
+    """
+    findings = []
+
+    def add(level: str, check: str, message: str) -> None:
+        findings.append({"level": level, "check": check, "message": message})
+
+    if not text.strip():
+        add("error", "empty", "SKILL.md is empty")
+        return findings
+
+    lines = text.split("\n")
+    frontmatter = {}
+    if not lines[0].startswith("---"):
+        add("error", "frontmatter", "Missing YAML frontmatter (no opening ---)")
+    else:
+        close = next((index for index, line in enumerate(lines[1:], 1) if line.rstrip() == "---"), None)
+        if close is None:
+            add("error", "frontmatter", "Missing YAML frontmatter (no closing ---)")
+        else:
+            frontmatter, error = parse_frontmatter(lines[1:close])
+            if error:
+                add("error", "frontmatter", f"Invalid YAML frontmatter ({error})")
+
+    name = frontmatter.get("name")
+    if name in (None, ""):
+        add("error", "name", "Missing 'name' field in frontmatter")
+    else:
+        add("ok", "name", f"name = {format_value(name)}")
+
+    description = frontmatter.get("description")
+    if description in (None, ""):
+        add("error", "description", "Missing 'description' field in frontmatter")
+    else:
+        length = len(format_value(description))
+        if length > MAX_DESCRIPTION_CHARS:
+            add("warning", "description",
+                f"description exceeds {MAX_DESCRIPTION_CHARS} characters ({length} chars)")
+        else:
+            add("ok", "description", f"description ({length} chars)")
+
+    line_count = text.count("\n")
+    if line_count > MAX_SKILL_LINES:
+        add("warning", "length", f"SKILL.md exceeds {MAX_SKILL_LINES} lines ({line_count} lines)")
+    else:
+        add("ok", "length", f"{line_count} lines")
+    return findings
+
+
+def validate_file(path: str, known_digest: str | None = None) -> tuple[str | None, list[dict] | None]:
+    """Hash and validate a SKILL.md; return (sha256, findings).
+
+    findings is None when the content hashes to known_digest, meaning the
+    cached findings still apply. Runs in pool workers.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return None, [{"level": "error", "check": "read", "message": f"Cannot read SKILL.md ({e.strerror})"}]
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_digest:
+        return digest, None
+    return digest, check_skill_text(data.decode("utf-8", errors="replace"))
+
+
+# === Cache ===
+
+class ValidationCache:
+    """On-disk findings per SKILL.md path, with the mtime, size and hash they are for."""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+        self._now = int(time.time())
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == VALIDATE_CACHE_VERSION:
+            self.entries = data.get("entries") or {}
+
+    def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry and entry["used"] != self._now:
+            entry["used"] = self._now
+            self._dirty = True
+        return entry
+
+    def put(self, key: str, stat: os.stat_result, digest: str, findings: list[dict]) -> None:
+        """Store findings for a file's content.
+
+        A file modified within RACY_MTIME_NS may change again without its
+        mtime moving, so its mtime is not stored: until it is older, it is
+        hashed on every run and only the hash can reuse the findings.
+        """
+        racy = time.time_ns() - stat.st_mtime_ns < RACY_MTIME_NS
+        self.entries[key] = {
+            "mtime_ns": None if racy else stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "used": self._now,
+            "findings": findings,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk, evicting least recently used entries."""
+        if self.path is None or not self._dirty:
+            return
+        entries = self.entries
+        if len(entries) > VALIDATE_CACHE_MAX_ENTRIES:
+            keep = sorted(entries.items(), key=lambda item: item[1]["used"], reverse=True)
+            entries = dict(keep[:VALIDATE_CACHE_MAX_ENTRIES])
+        payload = {"version": VALIDATE_CACHE_VERSION, "entries": entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return
+        self._dirty = False
+
+
+# === Validation ===
+
+def validate_skills(skill_dirs: list[Path], cache: ValidationCache, jobs: int = 1) -> list[dict]:
+    """Validate skill directories, reusing cached findings for unchanged files.
+
+    Returns one result per directory, in order: {"skill", "path", "status",
+    "cached", "findings"}. A skill fails if any finding is an error.
+    """
+    results = []
+    pending = []  # (result, key, stat, known digest)
+    for skill_dir in skill_dirs:
+        skill_md = skill_dir / "SKILL.md"
+        key = str(skill_md.absolute())
+        result = {"skill": str(skill_dir), "path": str(skill_md), "cached": False, "findings": None}
+        results.append(result)
+        try:
+            stat = skill_md.stat()
+        except OSError:
+            result["findings"] = [{"level": "error", "check": "exists", "message": "SKILL.md not found"}]
+            continue
+        entry = cache.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            result["findings"] = entry["findings"]
+            result["cached"] = True
+            continue
+        pending.append((result, key, stat, entry))
+
+    paths = [result["path"] for result, *_ in pending]
+    known = [entry["sha256"] if entry else None for *_, entry in pending]
+    if jobs > 1 and len(pending) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(validate_file, paths, known, chunksize=max(1, len(paths) // (jobs * 4))))
+    else:
+        outcomes = list(map(validate_file, paths, known))
+
+    for (result, key, stat, entry), (digest, findings) in zip(pending, outcomes):
+        if findings is None:
+            findings = entry["findings"]
+            result["cached"] = True
+        result["findings"] = findings
+        if digest is not None:
+            cache.put(key, stat, digest, findings)
+
+    for result in results:
+        findings = list(result["findings"])
+        if os.path.exists(result["path"]):
+            if os.path.exists(os.path.join(result["skill"], SOURCE_FILE)):
+                findings.append({"level": "ok", "check": "source", "message": ".source tracking file present"})
+            else:
+                findings.append({"level": "info", "check": "source", "message": "No .source tracking file"})
+        result["findings"] = findings
+        result["status"] = "fail" if any(item["level"] == "error" for item in findings) else "pass"
+    return results
+
+
+def count_levels(results: list[dict]) -> dict:
+    """Return the number of skills, failures, warnings and cached results."""
+    return {
+        "skills": len(results),
+        "passed": sum(result["status"] == "pass" for result in results),
+        "failed": sum(result["status"] == "fail" for result in results),
+        "warnings": sum(item["level"] == "warning" for result in results for item in result["findings"]),
+        "cached": sum(result["cached"] for result in results),
+    }
+
+
+# === Output ===
+
+def render_text(results: list[dict], counts: dict, verbose: bool = False) -> list[str]:
+    """Render results like validate-skill.sh; without verbose, only skills with problems."""
+    lines = []
+    for result in results:
+        problems = [item for item in result["findings"] if item["level"] in ("error", "warning")]
+        if not verbose and not problems:
+            continue
+        lines.append(f"Validating: {result['skill']}")
+        for item in result["findings"] if verbose else problems:
+            lines.append(f"  {LEVEL_LABELS[item['level']]}: {item['message']}")
+        lines.append("")
+    summary = f"{counts['skills']} {'skill' if counts['skills'] == 1 else 'skills'}: {counts['passed']} passed, {counts['failed']} failed"
+    if counts["warnings"]:
+        summary += f", {counts['warnings']} warnings"
+    lines.append(f"{'PASS' if not counts['failed'] else 'FAIL'}: {summary} ({counts['cached']} unchanged)")
+    return lines
+
+
+def render_json(results: list[dict], counts: dict, seconds: float) -> str:
+    document = {
+        "schema": VALIDATION_SCHEMA,
+        "version": VALIDATION_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(seconds, 3),
+        "counts": counts,
+        "skills": results,
+    }
+    return json.dumps(document, indent=2)
+
+
+def render_junit(results: list[dict], counts: dict, seconds: float) -> str:
+    """Render results as a JUnit XML test suite, one test case per skill."""
+    import xml.etree.ElementTree as ET
+
+    suite = ET.Element("testsuite", {
+        "name": "skills",
+        "tests": str(counts["skills"]),
+        "failures": str(counts["failed"]),
+        "errors": "0",
+        "skipped": "0",
+        "time": f"{seconds:.3f}",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    })
+    for result in results:
+        skill = Path(result["skill"])
+        case = ET.SubElement(suite, "testcase", {"classname": skill.parent.name or "skills", "name": skill.name})
+        errors = [item for item in result["findings"] if item["level"] == "error"]
+        if errors:
+            failure = ET.SubElement(case, "failure", {"message": errors[0]["message"], "type": errors[0]["check"]})
+            failure.text = "\n".join(item["message"] for item in errors)
+        notes = [f"{LEVEL_LABELS[item['level']]}: {item['message']}" for item in result["findings"]
+                 if item["level"] in ("warning", "info")]
+        if notes:
+            ET.SubElement(case, "system-out").text = "\n".join(notes)
+    ET.indent(suite)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(suite, encoding="unicode")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Validate the SKILL.md files of skill directories and trees.")
+    parser.add_argument("dirs", nargs="*", type=Path, metavar="DIR",
+                        help=f"a skill directory, or a tree to search for skills (default: {USER_SKILLS_DIR})")
+    parser.add_argument("--format", choices=VALIDATE_FORMATS, default="text", dest="output_format",
+                        help="text (default), json, or junit XML")
+    parser.add_argument("--output", type=Path, metavar="FILE", help="write the results here instead of stdout")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help=f"worker processes when {PARALLEL_THRESHOLD} or more skills changed "
+                             "(default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"ignore and don't update the results cached in {VALIDATE_CACHE_FILE}")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="with --format text, list every check of every skill")
+    args = parser.parse_args()
+
+    roots = args.dirs or [USER_SKILLS_DIR]
+    skill_dirs = []
+    for root in roots:
+        found = find_skill_dirs(root) if root.is_dir() else []
+        # A directory given explicitly, even a missing one, is reported as a
+        # skill without a SKILL.md
+        skill_dirs.extend(found or ([root] if args.dirs else []))
+
+    started = time.perf_counter()
+    cache = ValidationCache(None if args.no_cache else VALIDATE_CACHE_FILE)
+    results = validate_skills(skill_dirs, cache, max(1, args.jobs or os.cpu_count() or 1))
+    cache.save()
+    seconds = time.perf_counter() - started
+    counts = count_levels(results)
+
+    if args.output_format == "json":
+        text = render_json(results, counts, seconds)
+    elif args.output_format == "junit":
+        text = render_junit(results, counts, seconds)
+    else:
+        text = "\n".join(render_text(results, counts, args.verbose))
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text + "\n")
+    sys.exit(1 if counts["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
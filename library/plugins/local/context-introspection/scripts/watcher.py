@@ -0,0 +1,224 @@
+"""
+File change watching for the context introspection script.
+
+Uses inotify on Linux (through ctypes, no third-party packages) and falls
+back to polling directory listings elsewhere. Watch targets are
+(directory, recursive) pairs; directories that do not exist yet are
+watched through their nearest existing parent, so creating e.g. a
+project's .claude/ directory is noticed too.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+
+# === Constants ===
+
+DEBOUNCE_SECONDS = 0.2
+POLL_INTERVAL_SECONDS = 1.0
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+STRUCTURE_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def nearest_existing(directory: Path) -> Path:
+    """Return directory, or its closest ancestor that exists."""
+    while not directory.is_dir() and directory != directory.parent:
+        directory = directory.parent
+    return directory
+
+
+def expand_targets(targets: list[tuple[Path, bool]]) -> set[Path]:
+    """Expand (directory, recursive) targets into the set of directories to watch."""
+    dirs = set()
+    for directory, recursive in targets:
+        existing = nearest_existing(directory)
+        dirs.add(existing)
+        if recursive and existing == directory:
+            for root, subdirs, _ in os.walk(directory):
+                dirs.update(Path(root) / name for name in subdirs)
+    return dirs
+
+
+# === Watchers ===
+
+class PollingWatcher:
+    """Detect changes by comparing directory listings between polls."""
+
+    method = "polling"
+
+    def __init__(self, targets: list[tuple[Path, bool]], interval: float = POLL_INTERVAL_SECONDS):
+        self.interval = interval
+        self.set_targets(targets)
+
+    def set_targets(self, targets: list[tuple[Path, bool]]) -> None:
+        """Replace the watched targets."""
+        self.targets = targets
+        self.dirs = expand_targets(targets)
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in self.dirs:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until something changes (or timeout) and return the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            previous = self._snapshot
+            self.dirs = expand_targets(self.targets)
+            self._snapshot = self._take_snapshot()
+            changed = {
+                path for path in previous.keys() | self._snapshot.keys()
+                if previous.get(path) != self._snapshot.get(path)
+            }
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do when polling)."""
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify watches on every target directory."""
+
+    method = "inotify"
+
+    def __init__(self, targets: list[tuple[Path, bool]]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, Path] = {}
+        self.set_targets(targets)
+
+    def set_targets(self, targets: list[tuple[Path, bool]]) -> None:
+        """Replace the watched targets, adding and removing watches as needed."""
+        self.targets = targets
+        self.dirs = expand_targets(targets)
+        watched = {path: wd for wd, path in self._watches.items()}
+        for path, wd in watched.items():
+            if path not in self.dirs:
+                self._rm_watch(self._fd, wd)
+                del self._watches[wd]
+        for path in self.dirs - watched.keys():
+            wd = self._add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = path
+
+    def _read_events(self) -> tuple[set[Path], bool]:
+        changed = set()
+        restructured = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; report every watched directory
+                    changed.update(self.dirs)
+                    restructured = True
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or mask & IN_IGNORED:
+                    continue
+                changed.add(directory / os.fsdecode(name) if name else directory)
+                if mask & STRUCTURE_MASK and (mask & IN_ISDIR or not name):
+                    restructured = True
+        return changed, restructured
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until something changes (or timeout) and return the changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed, restructured = self._read_events()
+        if restructured:
+            # Directories appeared or vanished: re-resolve the watch set
+            self.set_targets(self.targets)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(targets: list[tuple[Path, bool]], poll: bool = False,
+                   interval: float = POLL_INTERVAL_SECONDS) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher on Linux, or a polling watcher otherwise."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(targets)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(targets, interval)
+
+
+def wait_debounced(watcher, debounce: float = DEBOUNCE_SECONDS, timeout: float | None = None) -> set[Path]:
+    """Wait for a change, then keep collecting until changes settle for debounce seconds.
+
+    With a timeout, an empty set is returned if nothing changes in time.
+    """
+    changed = watcher.wait(timeout)
+    if not changed and timeout is not None:
+        return changed
+    while not changed:
+        changed = watcher.wait()
+    while True:
+        more = watcher.wait(debounce)
+        if not more:
+            return changed
+        changed |= more
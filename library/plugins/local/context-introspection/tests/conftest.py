@@ -0,0 +1,67 @@
+"""Shared fixtures for the context-introspection tests.
+
+introspect.py reads HOME when it is imported, so end-to-end tests run the
+scripts in a subprocess with HOME pointed at a generated tree; unit tests
+import the modules from scripts/ directly.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class ContextTree:
+    """A home directory and a project with one of each kind of context source."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.home = root / "home"
+        self.project = root / "proj"
+        claude = self.home / ".claude"
+        write(claude / "CLAUDE.md", "# User memory\n")
+        write(claude / "rules" / "style.md", "Use four spaces.\n")
+        write(claude / "skills" / "alpha" / "SKILL.md",
+              "---\nname: alpha\ndescription: Alpha skill for testing.\n---\nBody.\n")
+        write(claude / "agents" / "helper.md", "---\nname: helper\ndescription: Helps.\n---\nPrompt.\n")
+        write(claude / "commands" / "commit.md", "---\ndescription: Commit changes\n---\nCommit.\n")
+        write(claude / "settings.json", json.dumps({"hooks": {"Stop": [{"hooks": [{"command": "true"}]}]}}))
+        write(self.home / ".claude.json", json.dumps({"mcpServers": {"docs": {"command": "docs-server"}}}))
+        write(self.project / "CLAUDE.md", "# Project memory\n")
+        write(self.project / "CLAUDE.local.md", "# Local memory\n")
+        # An identical copy of the user rule, folded into it by the report
+        write(self.project / ".claude" / "rules" / "style.md", "Use four spaces.\n")
+        write(self.project / ".claude" / "skills" / "beta" / "SKILL.md",
+              "---\nname: beta\ndescription: Beta skill.\n---\nBody.\n")
+        write(self.project / ".claude" / "commands" / "review.md", "---\ndescription: Review\n---\nReview.\n")
+        write(self.project / ".mcp.json", json.dumps({"mcpServers": {"db": {"command": "db-server"}}}))
+
+    def env(self) -> dict:
+        return {**os.environ, "HOME": str(self.home)}
+
+    def run(self, script: str, *args: str, cwd: Path | None = None, check: bool = True,
+            input: str | None = None) -> subprocess.CompletedProcess:
+        """Run a script from scripts/ with HOME set to the tree's home."""
+        return subprocess.run([sys.executable, str(SCRIPTS_DIR / script), *args], cwd=cwd or self.root,
+                              env=self.env(), capture_output=True, text=True, check=check, input=input)
+
+    def report(self, *args: str, cwd: Path | None = None) -> str:
+        return self.run("introspect.py", *args, cwd=cwd).stdout
+
+
+@pytest.fixture
+def tree(tmp_path) -> ContextTree:
+    return ContextTree(tmp_path)
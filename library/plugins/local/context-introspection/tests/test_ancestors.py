@@ -0,0 +1,96 @@
+"""Tests for the memoized lookup of CLAUDE.md files in ancestor directories."""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+import introspection
+from conftest import write
+
+HOUR_NS = 3600 * 10**9
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = introspection.ParseCache(tmp_path / "parse-cache.json")
+    monkeypatch.setattr(introspection, "PARSE_CACHE", cache)
+    return cache
+
+
+def backdate(path, mtime_ns: int) -> None:
+    os.utime(path, ns=(mtime_ns, mtime_ns), follow_symlinks=False)
+
+
+def ancestor_files(directory) -> list:
+    return introspection.find_ancestor_claude_files(directory, introspection.DiscoveryIndex())
+
+
+def memoized(cache, directory) -> bool:
+    return f"{directory}|ancestor" in cache._load()
+
+
+def test_unchanged_directory_is_memoized(tmp_path, cache):
+    ancestor = tmp_path / "ancestor"
+    claude_md = write(ancestor / "CLAUDE.md", "# Ancestor\n")
+    backdate(ancestor, time.time_ns() - HOUR_NS)
+    assert ancestor_files(ancestor) == [claude_md]
+    assert memoized(cache, ancestor)
+    assert ancestor_files(ancestor) == [claude_md]
+
+
+def test_recently_modified_directory_is_not_memoized(tmp_path, cache):
+    # On a filesystem with coarse timestamps a file created right after the
+    # lookup can leave the directory's mtime unchanged
+    ancestor = tmp_path / "ancestor"
+    ancestor.mkdir()
+    mtime_ns = ancestor.stat().st_mtime_ns
+    assert ancestor_files(ancestor) == []
+    assert not memoized(cache, ancestor)
+
+    claude_md = write(ancestor / "CLAUDE.md", "# Ancestor\n")
+    backdate(ancestor, mtime_ns)
+    assert ancestor_files(ancestor) == [claude_md]
+
+
+def test_symlink_whose_target_is_removed(tmp_path, cache):
+    target = write(tmp_path / "shared" / "CLAUDE.md", "# Shared\n")
+    ancestor = tmp_path / "ancestor"
+    ancestor.mkdir()
+    (ancestor / "CLAUDE.md").symlink_to(target)
+    mtime_ns = time.time_ns() - HOUR_NS
+    backdate(ancestor, mtime_ns)
+    assert ancestor_files(ancestor) == [ancestor / "CLAUDE.md"]
+    assert memoized(cache, ancestor)
+
+    target.unlink()
+    assert ancestor.stat().st_mtime_ns == mtime_ns
+    assert ancestor_files(ancestor) == []
+
+
+def test_dangling_symlink_whose_target_appears(tmp_path, cache):
+    target = tmp_path / "shared" / "CLAUDE.md"
+    ancestor = tmp_path / "ancestor"
+    ancestor.mkdir()
+    (ancestor / "CLAUDE.md").symlink_to(target)
+    backdate(ancestor, time.time_ns() - HOUR_NS)
+    assert ancestor_files(ancestor) == []
+    assert memoized(cache, ancestor)
+
+    write(target, "# Shared\n")
+    assert ancestor_files(ancestor) == [ancestor / "CLAUDE.md"]
+
+
+def test_removed_file_is_checked_by_its_own_stat(tmp_path, cache):
+    ancestor = tmp_path / "ancestor"
+    write(ancestor / ".claude" / "CLAUDE.md", "# Nested\n")
+    old_ns = time.time_ns() - HOUR_NS
+    backdate(ancestor / ".claude", old_ns)
+    backdate(ancestor, old_ns)
+    assert ancestor_files(ancestor) == [ancestor / ".claude" / "CLAUDE.md"]
+
+    # Removed with both directory mtimes restored, as a coarse clock can leave them
+    (ancestor / ".claude" / "CLAUDE.md").unlink()
+    backdate(ancestor / ".claude", old_ns)
+    assert ancestor_files(ancestor) == []
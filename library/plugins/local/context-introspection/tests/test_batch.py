@@ -0,0 +1,46 @@
+"""Tests for --batch."""
+from __future__ import annotations
+
+import json
+
+import introspection
+from conftest import write
+
+
+def batch(tree, *args: str) -> dict:
+    write(tree.root / "broken" / ".mcp.json", "5\n")
+    output_dir = tree.root / "reports"
+    tree.run("introspect.py", "--batch", str(tree.project), str(tree.root / "broken"),
+             "--output-dir", str(output_dir), "--format", "json", "--jobs", "2", *args)
+    return json.loads((output_dir / "summary.json").read_text())
+
+
+def test_failing_project_does_not_abort_batch(tree):
+    rows = {row["project"]: row for row in batch(tree)["projects"]}
+    broken = rows[str((tree.root / "broken").resolve())]
+    assert broken["error"].startswith("TypeError:")
+    assert "counts" not in broken
+    reported = rows[str(tree.project.resolve())]
+    assert "error" not in reported
+    assert reported["counts"]["memory_files"] == 5
+
+
+def test_batch_saves_worker_parse_results(tree):
+    batch(tree)
+    cache = json.loads((tree.home / ".claude" / "cache" / "introspect" / "parse-cache.json").read_text())
+    project_claude_md = str(tree.project.resolve() / "CLAUDE.md")
+    assert any(key.startswith(project_claude_md + "|") for key in cache["entries"])
+
+
+def test_batch_no_cache_writes_no_cache(tree):
+    batch(tree, "--no-cache")
+    assert not (tree.home / ".claude" / "cache" / "introspect" / "parse-cache.json").exists()
+
+
+def test_worker_settings_are_passed_not_inherited(monkeypatch, tmp_path):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", True)
+    monkeypatch.setattr(introspection, "JOBS", 1)
+    monkeypatch.setattr(introspection, "BATCH_WORKER", {})
+    introspection.init_batch_worker(introspection.DiscoveryIndex(), None, 1000, "json", tmp_path, False, 4)
+    assert introspection.PARSE_CACHE.enabled is False
+    assert introspection.JOBS == 4
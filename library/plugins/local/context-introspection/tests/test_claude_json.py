@@ -0,0 +1,139 @@
+"""Tests for the ~/.claude.json MCP extraction, checked against json.loads."""
+from __future__ import annotations
+
+import json
+import random
+import tracemalloc
+
+import pytest
+
+import claude_json
+from claude_json import ClaudeJsonError, blank_escapes, extract_mcp_servers, read_mcp_servers
+
+
+def expected_servers(text: str) -> dict:
+    """What extract_mcp_servers() must return, from the fully decoded file."""
+    document = json.loads(text)
+    result = {"projects": {}}
+    if "mcpServers" in document:
+        result["mcpServers"] = document["mcpServers"]
+    projects = document.get("projects")
+    if isinstance(projects, dict):
+        for path, project in projects.items():
+            servers = project.get("mcpServers") if isinstance(project, dict) else None
+            if isinstance(servers, dict) and servers:
+                result["projects"][path] = servers
+    return result
+
+
+# Strings that look like structure once their quotes are mis-tracked
+TRICKY_STRINGS = ['a"b', "a\\", "{[", "]}", '\\"mcpServers\\": 1', '"mcpServers": {"x": 1}', "é ✓", ""]
+KEYS = ["mcpServers", "projects", "history", "command", "x"]
+
+
+def random_value(rng: random.Random, depth: int):
+    kind = rng.choice(["scalar", "string", "list", "object"] if depth < 4 else ["scalar", "string"])
+    if kind == "scalar":
+        return rng.choice([None, True, False, 0, -1.5, 12345678901234567890])
+    if kind == "string":
+        return rng.choice(TRICKY_STRINGS)
+    if kind == "list":
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {rng.choice(KEYS + TRICKY_STRINGS): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def random_document(rng: random.Random) -> dict:
+    document = {rng.choice(KEYS + TRICKY_STRINGS): random_value(rng, 1) for _ in range(rng.randint(0, 4))}
+    if rng.random() < 0.8:
+        document["projects"] = {
+            rng.choice(["/a", "/b", '/c"d', "/é"]): rng.choice([
+                {"mcpServers": random_value(rng, 3), "history": random_value(rng, 2)},
+                random_value(rng, 2),
+            ])
+            for _ in range(rng.randint(0, 3))
+        }
+    return document
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_json_loads(seed):
+    rng = random.Random(seed)
+    document = random_document(rng)
+    text = json.dumps(document, indent=rng.choice([None, 2]), ensure_ascii=rng.random() < 0.5)
+    assert extract_mcp_servers(text.encode("utf-8")) == expected_servers(text)
+
+
+@pytest.mark.parametrize("text", [
+    # Top-level servers of every type are reported, as the decoded file has them
+    '{"mcpServers": 5}',
+    '{"mcpServers": null, "projects": {}}',
+    '{"mcpServers": "x,y", "a": [1]}',
+    '{"mcpServers": []}',
+    '{"mcpServers": {}}',
+    '{"a": "\\"mcpServers\\": 1"}',
+    # Duplicate keys: the last one wins
+    '{"mcpServers": {"a": {}}, "mcpServers": 7}',
+    '{"mcpServers": 7, "mcpServers": {"a": {}}}',
+    '{"projects": {"/p": {"mcpServers": {"a": {}}}, "/p": {"mcpServers": {}}}}',
+    '{"projects": {"/p": {"mcpServers": {"a": {}}, "mcpServers": 1}}}',
+    '{"projects": {"/p": {"x": {"mcpServers": {"a": {}}}}}}',
+])
+def test_edge_cases_match_json_loads(text):
+    assert extract_mcp_servers(text.encode("utf-8")) == expected_servers(text)
+
+
+@pytest.mark.parametrize("text", ['[{"mcpServers": {}}]', '{"mcpServers": {"a": 1}', '{"mcpServers": "a}', "5"])
+def test_malformed_is_rejected(text):
+    with pytest.raises(ClaudeJsonError):
+        extract_mcp_servers(text.encode("utf-8"))
+
+
+def test_read_mcp_servers(tmp_path):
+    path = tmp_path / ".claude.json"
+    assert read_mcp_servers(path) is None
+    path.write_text('{"numStartups": 3}')
+    assert read_mcp_servers(path) == {"projects": {}}
+    path.write_text('{"mcpServers": {"a": {"command": "x"}}, "projects": {')
+    assert read_mcp_servers(path) is None
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_read_mcp_servers_in_small_chunks_matches_json_loads(seed, tmp_path, monkeypatch):
+    monkeypatch.setattr(claude_json, "ESCAPE_CHUNK_SIZE", 7)
+    rng = random.Random(seed)
+    document = random_document(rng)
+    if isinstance(document.get("projects"), dict):
+        document["projects"]['/e\\"'] = {"mcpServers": {'k\\"': {"command": 'a\\"b'}}}
+    text = json.dumps(document, ensure_ascii=rng.random() < 0.5)
+    path = tmp_path / ".claude.json"
+    path.write_bytes(text.encode("utf-8"))
+    assert read_mcp_servers(path) == expected_servers(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 1 << 20])
+def test_escapes_are_blanked_across_chunks(chunk_size, monkeypatch):
+    monkeypatch.setattr(claude_json, "ESCAPE_CHUNK_SIZE", chunk_size)
+    rng = random.Random(chunk_size)
+    for _ in range(200):
+        data = bytes(rng.choice(b'\\\\"ab') for _ in range(rng.randint(0, 30)))
+        text = bytearray(data)
+        blank_escapes(text)
+        assert text == data.replace(b"\\\\", b"  ").replace(b'\\"', b"  ")
+
+
+def test_read_mcp_servers_keeps_one_copy_of_the_file(tmp_path):
+    history = [{"display": 'Fix \\"quoted\\" C:\\path' * 20}] * 50
+    projects = {f"/src/p{i}": {"history": history, "mcpServers": {}} for i in range(200)}
+    projects["/src/p0"]["mcpServers"] = {"local": {"command": "x"}}
+    path = tmp_path / ".claude.json"
+    path.write_text(json.dumps({"mcpServers": {}, "projects": projects}))
+    size = path.stat().st_size
+    assert size > 5 * 10**6
+    tracemalloc.start()
+    try:
+        result = read_mcp_servers(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert result == {"mcpServers": {}, "projects": {"/src/p0": {"local": {"command": "x"}}}}
+    assert peak < size + 3 * claude_json.ESCAPE_CHUNK_SIZE
@@ -0,0 +1,165 @@
+"""Tests for conflict detection: shadowing, duplicate hooks and near-duplicate rules."""
+from __future__ import annotations
+
+import json
+import random
+import re
+
+from conflicts import (
+    SHINGLE_WORDS, detect_conflicts, find_duplicate_hooks, find_shadowing, find_similar,
+    find_similar_rules, minhash_signature, signature_similarity,
+)
+from conftest import write
+
+WORDS = ("context rule file project user scope skill agent command hook memory token tests build "
+         "lint format style review deploy branch commit").split()
+
+
+def prose(seed: int, length: int = 120) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def shingles(text: str) -> set[str]:
+    words = re.findall(r"\w+", text.lower())
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+
+
+def jaccard(a: str, b: str) -> float:
+    return len(shingles(a) & shingles(b)) / len(shingles(a) | shingles(b))
+
+
+def skill(scope: str, name: str, namespace: str | None = None, declared: str | None = None) -> dict:
+    """A skill, agent or command record; declared is its frontmatter name."""
+    return {"scope": scope, "path": f"/{scope}/{name}/SKILL.md", "name": name,
+            "namespace": namespace, "frontmatter": {"name": declared} if declared else {}}
+
+
+def hook_source(scope: str, event: str, matcher: str, *commands: str) -> dict:
+    return {"scope": scope, "path": f"/{scope}/settings.json", "hooks": {
+        event: [{"matcher": matcher, "hooks": [{"type": "command", "command": c} for c in commands]}],
+    }}
+
+
+# === Shadowing ===
+
+def test_shadowed_across_scopes():
+    conflicts = find_shadowing("agents", [skill("User", "helper"), skill("Project", "helper")])
+    assert [(c["kind"], c["name"], c["scopes"]) for c in conflicts] == [("shadowed", "helper", ["User", "Project"])]
+    assert "Project definition takes precedence" in conflicts[0]["message"]
+
+
+def test_shadowed_by_frontmatter_name():
+    records = [skill("User", "alpha"), skill("Project", "renamed", declared="alpha")]
+    assert [c["name"] for c in find_shadowing("skills", records)] == ["alpha"]
+    # A command is known by its file name only
+    assert find_shadowing("commands", records) == []
+
+
+def test_distinct_names_do_not_conflict():
+    records = [skill("User", "alpha"), skill("Project", "beta"), skill("Project", "gamma")]
+    assert find_shadowing("skills", records) == []
+
+
+def test_duplicate_name_in_one_scope_or_across_namespaces():
+    same_scope = find_shadowing("skills", [skill("Project", "a"), skill("Project", "b", declared="a")])
+    assert [(c["kind"], c["message"]) for c in same_scope] == [("duplicate_name", "Skill `a` is defined 2 times")]
+    namespaces = find_shadowing("commands", [skill("User", "push", "git"), skill("Project", "push", "deploy")])
+    assert [(c["kind"], c["message"]) for c in namespaces] == [
+        ("duplicate_name", "Command `push` is defined 2 times across namespaces"),
+    ]
+
+
+def test_same_name_in_one_namespace_and_scope_once_is_not_duplicate():
+    assert find_shadowing("commands", [skill("User", "push", "git"), skill("User", "pull", "git")]) == []
+
+
+# === Hooks ===
+
+def test_duplicate_hook_matcher_with_identical_command():
+    sources = [
+        hook_source("User", "PreToolUse", "Bash", "lint.sh", "audit.sh"),
+        hook_source("Project", "PreToolUse", "Bash", "lint.sh"),
+    ]
+    [found] = find_duplicate_hooks(sources)
+    assert (found["kind"], found["name"], found["scopes"]) == ("duplicate_hook", "PreToolUse:Bash", ["User", "Project"])
+    assert found["identical_commands"] == ["lint.sh"]
+    assert found["message"].endswith("all of them run (1 identical command)")
+
+
+def test_hooks_on_other_matchers_or_events_do_not_conflict():
+    sources = [
+        hook_source("User", "PreToolUse", "Bash", "lint.sh"),
+        hook_source("Project", "PreToolUse", "Edit", "lint.sh"),
+        hook_source("Local", "PostToolUse", "Bash", "lint.sh"),
+        {"scope": "Project", "path": "/broken.json", "hooks": {"PreToolUse": "not a list"}},
+    ]
+    assert find_duplicate_hooks(sources) == []
+
+
+# === Similar Rules ===
+
+def test_signature_estimates_jaccard_similarity():
+    base = prose(1)
+    words = base.split()
+    for changed in (1, 5, 20, 60):
+        edited = " ".join(["edited"] * changed + words[changed:])
+        estimate = signature_similarity(minhash_signature(base), minhash_signature(edited))
+        assert abs(estimate - jaccard(base, edited)) < 0.2
+    assert minhash_signature("") == [] and minhash_signature("# --") == []
+    assert minhash_signature(base.upper()) == minhash_signature(base)
+
+
+def test_near_duplicate_rules_are_clustered():
+    base = prose(2)
+    memory_files = [
+        {"scope": "User", "path": "/user/rules/style.md"},
+        {"scope": "Project", "path": "/proj/rules/style.md"},
+        {"scope": "Project", "path": "/proj/rules/other.md"},
+    ]
+    texts = [base, base.replace(base.split()[0], "tweaked", 1), prose(3)]
+    signatures = {mem["path"]: minhash_signature(text) for mem, text in zip(memory_files, texts)}
+    [found] = find_similar_rules(memory_files, signatures)
+    assert found["kind"] == "similar_rules"
+    assert found["paths"] == ["/user/rules/style.md", "/proj/rules/style.md"]
+    assert 0.8 <= found["similarity"] < 1
+
+
+def test_identical_rules_are_reported_as_identical():
+    memory_files = [{"scope": "User", "path": "/a.md"}, {"scope": "Project", "path": "/b.md"}]
+    signature = minhash_signature(prose(4))
+    [found] = find_similar_rules(memory_files, {"/a.md": signature, "/b.md": list(signature)})
+    assert found["message"] == "2 files are identical"
+
+
+def test_dissimilar_rules_are_not_clustered():
+    signatures = [minhash_signature(prose(seed)) for seed in range(200)]
+    signatures.append([])
+    assert find_similar(signatures) == []
+
+
+def test_clusters_are_found_among_many_rules():
+    signatures = [minhash_signature(prose(seed)) for seed in range(200)]
+    copy = prose(50).split()
+    copy[-1] = "tweaked"
+    signatures.append(minhash_signature(" ".join(copy)))
+    assert [members for members, _ in find_similar(signatures)] == [[50, 200]]
+
+
+# === Report ===
+
+def test_detect_conflicts_orders_by_kind():
+    context = {
+        "skills": [skill("User", "a"), skill("Project", "a")],
+        "commands": [skill("Project", "c", "x"), skill("Project", "c", "y")],
+        "hooks": [hook_source("User", "Stop", "", "a.sh"), hook_source("Project", "Stop", "", "b.sh")],
+        "memory_files": [],
+    }
+    assert [c["kind"] for c in detect_conflicts(context, {})] == ["shadowed", "duplicate_name", "duplicate_hook"]
+
+
+def test_report_lists_conflicts(tree):
+    write(tree.project / ".claude" / "skills" / "alpha" / "SKILL.md",
+          "---\nname: alpha\ndescription: Project alpha.\n---\nBody.\n")
+    document = json.loads(tree.report(str(tree.project), "--format", "json"))
+    assert [(c["kind"], c["name"]) for c in document["conflicts"]] == [("shadowed", "alpha")]
@@ -0,0 +1,73 @@
+"""Tests for folding identical context files."""
+from __future__ import annotations
+
+import json
+
+import introspection
+from conftest import write
+
+
+def ndjson_lines(text: str) -> list[dict]:
+    """Parse NDJSON output, dropping the header's timestamp."""
+    lines = [json.loads(line) for line in text.splitlines() if line]
+    del lines[0]["generated"]
+    return lines
+
+
+def test_ndjson_is_the_same_for_every_output_path(tree):
+    project = str(tree.project)
+    report = ndjson_lines(tree.report(project, "--format", "ndjson"))
+    snapshot = ndjson_lines(tree.report(project, "--snapshot", "--format", "ndjson"))
+    output_dir = tree.root / "reports"
+    tree.run("introspect.py", "--batch", project, "--output-dir", str(output_dir), "--format", "ndjson")
+    batch = ndjson_lines(next(output_dir.glob("*.ndjson")).read_text())
+
+    assert snapshot == report
+    assert batch == report
+    copies = [line for line in report if line.get("duplicate_of")]
+    assert [line["path"] for line in copies] == [str(tree.project / ".claude" / "rules" / "style.md")]
+
+
+def test_incremental_report_ndjson_keeps_copies(tmp_path, monkeypatch):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", False)
+    commands = tmp_path / ".claude" / "commands"
+    write(commands / "first.md", "Same text.\n")
+    write(commands / "second.md", "Same text.\n")
+    estimator = introspection.load_estimator()
+
+    streamed = introspection.iter_ndjson(tmp_path, introspection.iter_context_records(tmp_path, estimator),
+                                         estimator)
+    report = introspection.IncrementalReport(tmp_path, estimator, output_format="ndjson")
+    report.refresh()
+    expected = ndjson_lines("\n".join(streamed))
+    assert ndjson_lines(report.render()) == expected
+    assert [line["duplicate_of"] for line in expected if line["type"] == "command"] == [
+        None, str(commands / "first.md"),
+    ]
+
+
+def test_markdown_lists_every_copy_under_its_scope(tree):
+    report = tree.report(str(tree.project))
+    project_rule = tree.project / ".claude" / "rules" / "style.md"
+    assert "| Memory files | 5 |" in report
+    section = report[report.index("## Memory Files"):report.index("## Skills")]
+    scopes = [line[4:] for line in section.splitlines() if line.startswith("### ")]
+    assert scopes[scopes.index("User Memory"):] == [
+        "User Memory", "User Rules", "Project Memory", "Project Rules", "Local Memory",
+    ]
+    copy = section[section.index("### Project Rules"):section.index("### Local Memory")]
+    assert f"**Path:** [{project_rule}]" in copy
+    assert f"**Identical to:** [{tree.home / '.claude' / 'rules' / 'style.md'}]" in copy
+
+
+def test_json_counts_every_location(tree):
+    document = json.loads(tree.report(str(tree.project), "--format", "json"))
+    assert document["summary"]["counts"]["memory_files"] == 5
+    rules = [record for record in document["memory_files"] if record["duplicates"]]
+    assert [record["loaded_copies"] for record in rules] == [2]
+
+
+def test_budget_counts_every_loaded_copy(tree):
+    report = tree.report(str(tree.project))
+    assert "| Rules | 2 | ~10 |" in report
+    assert "| **Total** | 10 |" in report
@@ -0,0 +1,110 @@
+"""Tests for the frontmatter parser, checked against PyYAML."""
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from frontmatter import parse_frontmatter, parse_lenient
+
+# PyYAML is optional for the plugin but is the reference here
+yaml = pytest.importorskip("yaml")
+
+
+def load_yaml(text: str):
+    """Parse as PyYAML does with scalars kept as strings (what the parser mirrors)."""
+    return yaml.load(text, Loader=yaml.BaseLoader)
+
+
+# Frontmatter inside the parser's own subset: the result must match PyYAML
+# with or without PyYAML installed
+SUBSET = {
+    "flat": "name: tester\ndescription: Runs the tests\n",
+    "url value": "url: http://example.com/a\n",
+    "dashed key": "allowed-tools: Read\n",
+    "empty values": "name:\ndescription: \n",
+    "comments": "# leading\nname: a # trailing\nother: b#not-a-comment\n",
+    "single quotes": "description: 'it''s: fine # kept'\n",
+    "double quotes": 'description: "tab\\there \\"q\\" \\u00e9 # kept" # dropped\n',
+    "multi-line plain": "description: first line\n  second line\n\n  after blank\n",
+    "multi-line quoted": 'description: "first\n  second"\n',
+    "literal": "description: |\n  line one\n    indented\n\n  line three\nname: x\n",
+    "literal strip": "description: |-\n  a\n  b\n\n",
+    "literal keep": "description: |+\n  a\n\n\nname: x\n",
+    "folded": "description: >\n  one\n  two\n\n  three\n    more\n  four\n",
+    "folded strip": "description: >-\n  one\n  two\n",
+    "explicit indentation": "description: |2\n    indented four\n  two\n",
+    "block header comment": "description: | # note\n  text\n",
+    "flow list": "tools: [Read, 'Grep', \"Bash(git:*)\"]\n",
+    "flow list trailing comma": "tools: [Read, Grep,]\n",
+    "flow list over lines": "tools: [Read,\n  Grep]\n",
+    "flow list comment": "tools: [Read] # comment\n",
+    "empty flow list": "tools: []\n",
+    "block list": "tools:\n  - Read\n  - 'Grep'\n  # comment\n  - Bash(git:*)\n",
+    "block list at key indentation": "tools:\n- Read\n- Grep\nname: x\n",
+    "block list item continued": "tools:\n  - a long\n    item\n",
+    "block list dash continued": "tools:\n  - a\n    - b\n",
+}
+
+# Valid YAML beyond the subset, handed to PyYAML
+BEYOND_SUBSET = {
+    "nested mapping": "hooks:\n  pre: run\n",
+    "anchor and alias": "name: &a x\nother: *a\n",
+    "mapping in a list": "tools:\n  - name: x\n",
+}
+
+# Invalid YAML: reported as an error, with every key: value line still read
+INVALID = {
+    "unterminated single quote": "name: 'oops\ndescription: fine\n",
+    "unterminated flow list": "tools: [Read, Grep\ndescription: fine\n",
+    "tab indentation": "name: x\n\tdescription: y\n",
+    "line without colon": "name: x\njust text\n",
+    "text after quoted string": "name: 'a' b\n",
+    "list item outdented": "tools:\n    - a\n  - b\n",
+}
+
+
+@pytest.mark.parametrize("text", SUBSET.values(), ids=SUBSET.keys())
+def test_subset_matches_yaml(text):
+    assert parse_frontmatter(text.splitlines()) == (load_yaml(text), None)
+
+
+@pytest.mark.parametrize("text", SUBSET.values(), ids=SUBSET.keys())
+def test_subset_does_not_need_yaml(text, monkeypatch):
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    assert parse_frontmatter(text.splitlines()) == (load_yaml(text), None)
+
+
+@pytest.mark.parametrize("text", BEYOND_SUBSET.values(), ids=BEYOND_SUBSET.keys())
+def test_beyond_subset_uses_yaml(text):
+    assert parse_frontmatter(text.splitlines()) == (load_yaml(text), None)
+
+
+@pytest.mark.parametrize("text", INVALID.values(), ids=INVALID.keys())
+def test_invalid_falls_back_to_lenient(text):
+    with pytest.raises(yaml.YAMLError):
+        load_yaml(text)
+    lines = text.splitlines()
+    data, error = parse_frontmatter(lines)
+    assert error
+    assert data == parse_lenient(lines)
+
+
+def test_invalid_without_yaml_reports_the_subset_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    lines = ["name: x", "hooks:", "  pre: run"]
+    data, error = parse_frontmatter(lines, first_line=2)
+    assert error == "line 4: nested mappings are not supported"
+    assert data == parse_lenient(lines)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Unquoted ": " in a description, which Claude Code reads as text
+    ("description: Use when: tests fail\n", {"description": "Use when: tests fail"}),
+    # The conventional unquoted argument hint
+    ("argument-hint: [file] [mode]\n", {"argument-hint": "[file] [mode]"}),
+])
+def test_invalid_yaml_read_as_claude_code_does(text, expected):
+    with pytest.raises(yaml.YAMLError):
+        load_yaml(text)
+    assert parse_frontmatter(text.splitlines()) == (expected, None)
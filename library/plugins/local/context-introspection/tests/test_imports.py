@@ -0,0 +1,94 @@
+"""Tests for @import parsing, loading and watching."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+import introspection
+from conftest import write
+from memory_imports import extract_imports
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("@docs/guide.md", ["docs/guide.md"]),
+    ("See @./notes and @../shared/rules", ["./notes", "../shared/rules"]),
+    ("@~/.claude/personal.md", ["~/.claude/personal.md"]),
+    ("@/etc/claude/policy", ["/etc/claude/policy"]),
+    ("@package.json", ["package.json"]),
+    ("Read @docs/guide.md.", ["docs/guide.md"]),
+    ("@docs/my\\ notes.md", ["docs/my notes.md"]),
+    ("@docs/a.md @docs/a.md", ["docs/a.md"]),
+    # Prose, not imports
+    ("Install @scope/pkg first", []),
+    ("Ask @team, then @alice", []),
+    ("mail user@example.com", []),
+    ("`@docs/guide.md`", []),
+    ("```\n@docs/guide.md\n```", []),
+])
+def test_extract_imports(text, expected):
+    assert extract_imports(text) == expected
+
+
+class ExactEstimator:
+    """An exact estimator that must not read files itself."""
+
+    name = "exact-test"
+    cache_key = "exact-test"
+    exact = True
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        return [self.count(text) for text in texts]
+
+    def count_files(self, files):
+        raise AssertionError("imported files must not be read twice")
+
+    def count_file_text(self, text: str, size: int) -> int:
+        return self.count(text)
+
+
+def test_import_node_counts_the_text_already_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", False)
+    imported = write(tmp_path / "guide.md", "one two three @./more.md\n")
+    node = introspection.load_import_node(imported, ExactEstimator())
+    assert node == {"size": imported.stat().st_size, "tokens": 4, "imports": ["./more.md"]}
+
+
+def test_imported_files_are_watched(tmp_path, monkeypatch):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", False)
+    project = tmp_path / "proj"
+    shared = tmp_path / "shared"
+    write(project / "CLAUDE.md", "@../shared/guide.md\n")
+    write(shared / "guide.md", "Shared guide.\n")
+    context = introspection.collect_context(project, sections=("memory_files",))
+    guide = shared / "guide.md"
+
+    assert (shared, False) in introspection.watch_targets(project, context)
+    assert (shared, False) not in introspection.watch_targets(project)
+    assert introspection.affected_sections({guide}, project, context) == ("memory_files",)
+    assert introspection.affected_sections({shared / "other.md"}, project, context) == ()
+
+
+def test_serve_refreshes_when_an_imported_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", False)
+    project = tmp_path / "proj"
+    guide = write(tmp_path / "shared" / "guide.md", "Short.\n")
+    write(project / "CLAUDE.md", "@../shared/guide.md\n")
+    server = introspection.IntrospectionServer(poll=True)
+
+    def expanded_size() -> int:
+        memory_files = server.project(project.resolve()).context["memory_files"]
+        return next(mem["expanded_size"] for mem in memory_files if mem["path"] == str(project / "CLAUDE.md"))
+
+    try:
+        before = expanded_size()
+        guide.write_text("Much longer than it was before.\n")
+        deadline = time.monotonic() + 10
+        while expanded_size() == before and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert expanded_size() > before
+    finally:
+        server.close()
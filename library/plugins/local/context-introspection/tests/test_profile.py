@@ -0,0 +1,39 @@
+"""Tests for --profile."""
+from __future__ import annotations
+
+import json
+
+import introspection
+
+
+def profile(tree) -> dict:
+    return json.loads(tree.report(str(tree.project), "--format", "json", "--profile"))["profile"]
+
+
+def test_parse_cache_is_loaded_before_the_first_phase(tree):
+    profile(tree)
+    phases = {phase["name"]: phase for phase in profile(tree)["phases"]}
+    assert next(iter(phases)) == "load_parse_cache"
+    assert phases["load_parse_cache"]["files_opened"] == 1
+    assert phases["find_memory_files/ancestors"]["files_opened"] == 0
+
+
+def test_counters_are_named_after_what_they_count(tree):
+    totals = profile(tree)["totals"]
+    assert totals["index_stats"] > 0
+    assert "stat_calls" not in totals
+    report = tree.report(str(tree.project), "--profile")
+    assert "| Index stats |" in report
+
+
+def test_audit_hook_is_idle_once_disabled(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("x")
+    profiler = introspection.Profile()
+    profiler.enable()
+    path.read_text()
+    profiler.disable()
+    path.read_text()
+    profiler.enable()
+    profiler.disable()
+    assert profiler.counters["files_opened"] == 1
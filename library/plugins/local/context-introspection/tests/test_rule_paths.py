@@ -0,0 +1,120 @@
+"""Tests for --rule-paths matching: globs, and .gitignore rules checked against git."""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import write
+from rule_paths import match_rules, rule_globs
+
+ROOT_IGNORE = "\n".join([
+    "# comment",
+    "*.log",
+    "!keep.log",
+    "/build",
+    "docs/*.tmp",
+    "cache/",
+    "!cache/keep.txt",
+    "vendor/*",
+    "!vendor/keep/",
+    "logs/",
+    "**/generated",
+    "out/**",
+    "a/**/z.txt",
+    "\\#hash",
+    "trailing   ",
+    "*.bak",
+    "!/src/important.bak",
+])
+NESTED_IGNORE = """\
+local.txt
+!debug.log
+/only-here.txt
+nested/
+"""
+FILES = [
+    "app.log", "keep.log", "src/keep.log", "src/debug.log", "src/deep/debug.log",
+    "build/x.c", "src/build/x.c",
+    "docs/a.tmp", "docs/sub/a.tmp", "src/docs/a.tmp",
+    "cache/x.txt", "cache/keep.txt", "vendor/x", "vendor/keep/y", "other/cache", "logs", "src/logs/l.txt",
+    "generated/g.py", "src/deep/generated/g.py", "generated.py",
+    "out/o.txt", "out/sub/o.txt", "src/out/o.txt",
+    "a/z.txt", "a/b/c/z.txt", "b/a/z.txt",
+    "#hash", "src/#hash", "trailing", "trailing.txt",
+    "x.bak", "src/important.bak", "src/deep/important.bak",
+    "secret.txt", "src/secret.txt",
+    "local.txt", "src/local.txt", "src/deep/local.txt",
+    "only-here.txt", "src/only-here.txt", "src/sub/only-here.txt",
+    "nested/n.txt", "src/nested/n.txt", "src/deep/nested", "README.md",
+]
+
+
+def matched_files(project, candidates: list[str]) -> set[str]:
+    """Return the candidates the walk reaches, with one literal-path rule each."""
+    result = match_rules(project, [[path] for path in candidates])
+    return {path for path, rule in zip(candidates, result["rules"]) if rule["files"]}
+
+
+@pytest.fixture
+def ignore_tree(tmp_path):
+    project = tmp_path / "repo"
+    for path in FILES:
+        write(project / path, "x\n")
+    write(project / ".gitignore", ROOT_IGNORE)
+    write(project / "src" / ".gitignore", NESTED_IGNORE)
+    write(project / ".git" / "info" / "exclude", "secret.txt\n")
+    return project
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_ignored_files_match_git(ignore_tree, tmp_path):
+    env = {**os.environ, "HOME": str(tmp_path), "XDG_CONFIG_HOME": str(tmp_path), "GIT_CONFIG_NOSYSTEM": "1"}
+    subprocess.run(["git", "init", "-q", str(ignore_tree)], env=env, check=True)
+    git_ignored = set(subprocess.run(
+        ["git", "ls-files", "--others", "--ignored", "--exclude-standard"],
+        cwd=ignore_tree, env=env, check=True, capture_output=True, text=True,
+    ).stdout.splitlines())
+
+    assert set(FILES) - matched_files(ignore_tree, FILES) == git_ignored
+
+
+@pytest.mark.parametrize("path, ignored", [
+    # Negation, and a negated file inside an ignored directory staying ignored
+    ("app.log", True), ("keep.log", False), ("cache/keep.txt", True),
+    ("vendor/x", True), ("vendor/keep/y", False),
+    # Anchored and unanchored patterns
+    ("build/x.c", True), ("src/build/x.c", False), ("docs/a.tmp", True), ("docs/sub/a.tmp", False),
+    # Directory-only patterns
+    ("cache/x.txt", True), ("other/cache", False), ("logs", False), ("src/logs/l.txt", True),
+    # .git/info/exclude
+    ("secret.txt", True), ("src/secret.txt", True),
+    # A nested .gitignore: relative to its directory, overriding the root's rules
+    ("src/local.txt", True), ("local.txt", False), ("src/debug.log", False),
+    ("src/only-here.txt", True), ("src/sub/only-here.txt", False),
+    ("src/nested/n.txt", True), ("nested/n.txt", False), ("src/important.bak", False),
+])
+def test_ignore_rules(ignore_tree, path, ignored):
+    assert (path not in matched_files(ignore_tree, [path])) == ignored
+
+
+@pytest.mark.parametrize("paths, expected", [
+    (["src/**/*.{ts,tsx}"], ["src/**/*.ts", "src/**/*.tsx"]),
+    ("./docs/*.md, /lib/**", ["docs/*.md", "lib/**"]),
+    (["a", "a", ""], ["a"]),
+])
+def test_rule_globs(paths, expected):
+    assert rule_globs(paths) == expected
+
+
+def test_globs_and_subtrees(tmp_path):
+    for path in ["src/a.py", "src/pkg/b.py", "src/pkg/c.txt", "tests/t.py", "setup.py"]:
+        write(tmp_path / path, "x\n")
+    result = match_rules(tmp_path, [["src/**/*.py", "*.py"], ["src/*.txt"], ["**/*.txt"]])
+    assert [rule["files"] for rule in result["rules"]] == [3, 0, 1]
+    assert result["rules"][0]["subtrees"] == {"src": 1, "src/pkg": 1, ".": 1}
+    assert [glob["files"] for glob in result["globs"]] == [2, 1, 0, 1]
+    # Only directories a glob can still match below are listed
+    assert result["dirs_listed"] == 4
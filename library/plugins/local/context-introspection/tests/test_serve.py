@@ -0,0 +1,68 @@
+"""Tests for --serve and its client's fallback."""
+from __future__ import annotations
+
+import json
+import threading
+
+import introspection
+from conftest import write
+
+
+def test_cold_project_does_not_block_other_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(introspection.PARSE_CACHE, "enabled", False)
+    cold, warm = tmp_path / "cold", tmp_path / "warm"
+    write(cold / "CLAUDE.md", "# Cold\n")
+    write(warm / "CLAUDE.md", "# Warm\n")
+
+    scanning, release = threading.Event(), threading.Event()
+    collect = introspection.IncrementalReport.collect
+
+    def slow_collect(report, sections=introspection.SECTIONS):
+        if report.project_dir == cold.resolve():
+            scanning.set()
+            assert release.wait(10)
+        return collect(report, sections)
+
+    monkeypatch.setattr(introspection.IncrementalReport, "collect", slow_collect)
+    server = introspection.IntrospectionServer(poll=True)
+    try:
+        responses = {}
+        thread = threading.Thread(target=lambda: responses.update(
+            cold=server.answer({"project": str(cold), "format": "json"})))
+        thread.start()
+        assert scanning.wait(10)
+
+        # Answered while the cold project is still being scanned
+        status, body = server.answer({"project": str(warm), "format": "json"})
+        assert status == {"ok": True}
+        assert json.loads(body)["project"] == str(warm.resolve())
+        assert thread.is_alive()
+
+        release.set()
+        thread.join(10)
+        status, body = responses["cold"]
+        assert status == {"ok": True}
+        assert json.loads(body)["summary"]["counts"]["memory_files"] >= 1
+        assert sorted(server.projects) == [cold.resolve(), warm.resolve()]
+    finally:
+        release.set()
+        server.close()
+
+
+def test_client_fallback_forwards_context_window(tree):
+    socket = str(tree.root / "no-daemon.sock")
+    output = tree.run("introspect_client.py", str(tree.project), "--format", "json",
+                      "--context-window", "1000", "--socket", socket).stdout
+    assert json.loads(output)["context_window"] == 1000
+
+    output = tree.run("introspect_client.py", str(tree.project), "--format", "summary",
+                      "--context-window", "1000", "--socket", socket).stdout
+    assert "### Context Budget" in output
+    assert "| ~50 | 5.0% |" in output
+
+
+def test_summary_without_context_window_only_counts(tree):
+    output = tree.run("introspect_client.py", str(tree.project), "--format", "summary",
+                      "--socket", str(tree.root / "no-daemon.sock")).stdout
+    assert "| Memory files | 5 |" in output
+    assert "Context Budget" not in output
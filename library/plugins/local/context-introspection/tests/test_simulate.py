@@ -0,0 +1,29 @@
+"""Tests for --simulate and the skill index it shares across projects."""
+from __future__ import annotations
+
+import json
+
+from conftest import write
+
+
+def simulate(tree, cwd, prompt: str) -> dict:
+    return json.loads(tree.run("introspect.py", ".", "--simulate", prompt, "--format", "json", cwd=cwd).stdout)
+
+
+def test_projects_given_as_relative_paths_keep_separate_entries(tree):
+    other = tree.root / "other"
+    write(other / ".claude" / "skills" / "beta" / "SKILL.md",
+          "---\nname: beta\ndescription: Other beta launches rockets.\n---\nBody.\n")
+    first = simulate(tree, tree.project, "beta")
+    assert [c["path"] for c in first["candidates"]] == [str(tree.project / ".claude" / "skills" / "beta" / "SKILL.md")]
+
+    assert [c["description"] for c in simulate(tree, other, "beta")["candidates"]] == ["Other beta launches rockets."]
+    again = simulate(tree, tree.project, "beta")
+    assert again["index"]["reindexed"] == 0
+    assert [c["description"] for c in again["candidates"]] == ["Beta skill."]
+
+    index = json.loads((tree.home / ".claude" / "cache" / "introspect" / "skill-index.json").read_text())
+    assert {path for path in index["docs"] if path.endswith("beta/SKILL.md")} == {
+        str(tree.project / ".claude" / "skills" / "beta" / "SKILL.md"),
+        str(other / ".claude" / "skills" / "beta" / "SKILL.md"),
+    }
@@ -0,0 +1,36 @@
+"""Tests for --snapshot and --diff."""
+from __future__ import annotations
+
+import json
+
+
+def test_diff_matches_relative_and_absolute_project_paths(tree):
+    tree.run("introspect.py", "proj", "--snapshot", cwd=tree.root)
+    diff = json.loads(tree.report(str(tree.project), "--diff", "latest", "--format", "json"))
+    assert (diff["added"], diff["removed"], diff["changed"]) == ([], [], [])
+
+    tree.run("introspect.py", str(tree.project), "--snapshot")
+    diff = json.loads(tree.report("proj", "--diff", "latest", "--format", "json", cwd=tree.root))
+    assert (diff["added"], diff["removed"], diff["changed"]) == ([], [], [])
+
+
+def test_snapshot_paths_are_absolute(tree):
+    tree.run("introspect.py", "proj", "--snapshot", cwd=tree.root)
+    store = tree.home / ".claude" / "cache" / "introspect" / "snapshots"
+    snapshot = json.loads(next(store.glob("*/*.json")).read_text())
+    project = str(tree.project.resolve())
+    paths = [entry["path"] for entry in snapshot["entries"]]
+    assert all(path.startswith("/") for path in paths)
+    assert str(tree.project.resolve() / "CLAUDE.md") in paths
+    assert any(path.startswith(project) for path in paths)
+
+
+def test_diff_reports_changes(tree):
+    tree.run("introspect.py", "proj", "--snapshot", cwd=tree.root)
+    (tree.project / "CLAUDE.md").write_text("# Project memory, edited\n")
+    (tree.project / ".claude" / "commands" / "review.md").unlink()
+    diff = json.loads(tree.report(str(tree.project), "--diff", "latest", "--format", "json"))
+    assert [entry["path"] for entry in diff["changed"]] == [str(tree.project.resolve() / "CLAUDE.md")]
+    assert diff["changed"][0]["fields"][0] == "hash"
+    assert [entry["section"] for entry in diff["removed"]] == ["commands"]
+    assert diff["added"] == []
@@ -0,0 +1,124 @@
+"""Tests for --summary: its counts and its startup time, and the report's own imports."""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmark import DEFAULT_STARTUP_BUDGET_MS, wall_time
+from conftest import SCRIPTS_DIR, write
+
+
+def startup_overhead(argv: list[str], env: dict, rounds: int = 10) -> float:
+    """Return the fastest wall time of a command beyond a bare interpreter, in milliseconds.
+
+    The two are run in turn, so both minimums are taken under the same load.
+    """
+    bare = run = float("inf")
+    for _ in range(rounds):
+        bare = min(bare, wall_time([sys.executable, "-c", "pass"], env, 1))
+        run = min(run, wall_time(argv, env, 1))
+    return run - bare
+
+
+def summary_counts(tree, *args: str) -> dict:
+    return json.loads(tree.report(str(tree.project), "--summary", "--format", "json", *args))["counts"]
+
+
+def report_counts(tree) -> dict:
+    return json.loads(tree.report(str(tree.project), "--format", "json"))["summary"]["counts"]
+
+
+def test_summary_counts_match_full_report(tree):
+    assert summary_counts(tree) == report_counts(tree)
+
+
+def test_summary_counts_match_full_report_on_every_source(tree):
+    claude = tree.project / ".claude"
+    write(tree.root / "CLAUDE.md", "# Ancestor memory\n")
+    write(claude / "CLAUDE.md", "# Project .claude memory\n")
+    write(claude / "rules" / "nested" / "api.md", "---\npaths: src/**\n---\nAPI rule.\n")
+    write(claude / "agents" / "helper.md", "---\nname: helper\ndescription: Helps.\n---\nPrompt.\n")
+    write(claude / "commands" / "git" / "push.md", "Push.\n")
+    write(claude / "settings.local.json", json.dumps({"hooks": {"Stop": []}}))
+    write(claude / "settings.json", json.dumps({"permissions": {}}))
+    (claude / "skills" / "no-skill-file").mkdir()
+    settings = json.loads((tree.home / ".claude.json").read_text())
+    settings["projects"] = {str(tree.project): {"mcpServers": {"local": {"command": "x"}}}}
+    write(tree.home / ".claude.json", json.dumps(settings))
+
+    counts = summary_counts(tree)
+    assert counts == report_counts(tree)
+    assert counts["hooks"] == 2 and counts["mcp_servers"] == 3
+
+
+def test_summary_startup_within_budget(tree):
+    argv = [sys.executable, str(SCRIPTS_DIR / "introspect.py"), str(tree.project), "--summary"]
+    env = tree.env()
+    # The first run writes the bytecode caches, as any earlier run would have
+    subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+    assert startup_overhead(argv, env) <= DEFAULT_STARTUP_BUDGET_MS
+
+
+def test_report_imports_mode_modules_only_when_used(tree):
+    # --serve, --batch, --simulate, --rule-paths and conflicts import these themselves
+    deferred = ("argparse", "signal", "socket", "socketserver", "glob", "concurrent.futures", "multiprocessing",
+                "claude_json", "conflicts", "rule_paths", "skill_index")
+    code = f"import sys, introspection; print([name for name in {deferred!r} if name in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, env=tree.env(),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def write_large_claude_json(tree, megabytes: int = 10) -> None:
+    """Give ~/.claude.json many projects with long prompt histories, last changed an hour ago."""
+    entry = {"display": "Refactor the parser and run the tests again " * 8, "pastedContents": {}}
+    history = [entry] * 50
+    count = megabytes * 10**6 // len(json.dumps(history)) + 1
+    projects = {f"/src/project-{i}": {"history": history, "mcpServers": {}} for i in range(count)}
+    projects[str(tree.project)] = {"history": history, "mcpServers": {"local": {"command": "x"}}}
+    path = tree.home / ".claude.json"
+    write(path, json.dumps({"mcpServers": {"docs": {"command": "docs-server"}}, "projects": projects}))
+    assert path.stat().st_size > megabytes * 10**6
+    hour_ago = time.time_ns() - 3600 * 10**9
+    os.utime(path, ns=(hour_ago, hour_ago))
+
+
+def test_summary_startup_within_budget_with_large_claude_json(tree):
+    write_large_claude_json(tree)
+    argv = [sys.executable, str(SCRIPTS_DIR / "introspect.py"), str(tree.project), "--summary"]
+    env = tree.env()
+    # The first run scans ~/.claude.json and records its MCP counts
+    subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+    assert startup_overhead(argv, env) <= DEFAULT_STARTUP_BUDGET_MS
+    assert summary_counts(tree)["mcp_servers"] == 3
+
+
+def test_summary_rescans_claude_json_after_it_changes(tree):
+    path = tree.home / ".claude.json"
+    hour_ago = time.time_ns() - 3600 * 10**9
+    os.utime(path, ns=(hour_ago, hour_ago))
+    assert summary_counts(tree)["mcp_servers"] == 2
+    assert (tree.home / ".claude" / "cache" / "introspect" / "mcp-summary.txt").exists()
+
+    settings = json.loads(path.read_text())
+    settings["projects"] = {str(tree.project): {"mcpServers": {"local": {"command": "x"}}}}
+    write(path, json.dumps(settings))
+    os.utime(path, ns=(hour_ago + 1, hour_ago + 1))
+    assert summary_counts(tree)["mcp_servers"] == 3
+    del settings["mcpServers"]
+    write(path, json.dumps(settings))
+    assert summary_counts(tree)["mcp_servers"] == 2
+    assert summary_counts(tree) == report_counts(tree)
+
+
+def test_full_report_records_the_mcp_counts_for_summary(tree):
+    path = tree.home / ".claude.json"
+    hour_ago = time.time_ns() - 3600 * 10**9
+    os.utime(path, ns=(hour_ago, hour_ago))
+    report_counts(tree)
+    recorded = (tree.home / ".claude" / "cache" / "introspect" / "mcp-summary.txt").read_text()
+    stat = path.stat()
+    assert recorded == f"1 {stat.st_mtime_ns} {stat.st_size}\n1"
@@ -0,0 +1,61 @@
+"""Tests for exact token counts of memory files and their caching."""
+from __future__ import annotations
+
+import base64
+
+import pytest
+
+import introspection
+from conftest import write
+from token_estimator import BPEEstimator
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = introspection.ParseCache(tmp_path / "parse-cache.json")
+    monkeypatch.setattr(introspection, "PARSE_CACHE", cache)
+    return cache
+
+
+def write_vocab(path, merges: list[bytes]):
+    """Write a tiktoken-format vocabulary: every single byte, then the merged tokens."""
+    tokens = [bytes([i]) for i in range(256)] + merges
+    write(path, "".join(f"{base64.b64encode(token).decode()} {rank}\n" for rank, token in enumerate(tokens)))
+    return BPEEstimator.from_file(path)
+
+
+def memory_file(path) -> dict:
+    return {"path": str(path), "size": path.stat().st_size, "exists": True}
+
+
+def refuse_reads(files):
+    raise AssertionError("an unchanged file must not be read again")
+
+
+def test_exact_counts_are_read_once_per_file_version(tmp_path, cache, monkeypatch):
+    estimator = write_vocab(tmp_path / "vocab.tiktoken", [b"ab", b"abab"])
+    rule = write(tmp_path / "rule.md", "abab")
+    assert introspection.file_token_counts(estimator, [memory_file(rule)]) == [1]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(estimator, "count_files", refuse_reads)
+        assert introspection.file_token_counts(estimator, [memory_file(rule)]) == [1]
+
+    write(rule, "ab ab")
+    assert introspection.file_token_counts(estimator, [memory_file(rule)]) == [3]
+
+
+def test_counts_are_kept_per_vocabulary(tmp_path, cache):
+    merged = write_vocab(tmp_path / "a" / "vocab.tiktoken", [b"ab"])
+    plain = write_vocab(tmp_path / "b" / "vocab.tiktoken", [])
+    assert merged.name == plain.name and merged.cache_key != plain.cache_key
+    rule = write(tmp_path / "rule.md", "abab")
+    assert introspection.file_token_counts(merged, [memory_file(rule)]) == [2]
+    assert introspection.file_token_counts(plain, [memory_file(rule)]) == [4]
+
+
+def test_heuristic_counts_from_sizes(tmp_path, cache):
+    rule = write(tmp_path / "rule.md", "x" * 10)
+    estimator = introspection.load_estimator()
+    assert introspection.file_token_counts(estimator, [memory_file(rule)]) == [3]
+    assert cache._load() == {}
@@ -0,0 +1,158 @@
+"""Tests for validate_skills.py: the SKILL.md checks and whole-tree runs."""
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+import validate_skills
+from conftest import write
+from validate_skills import MAX_DESCRIPTION_CHARS, MAX_SKILL_LINES, check_skill_text
+
+VALID = "---\nname: alpha\ndescription: Does alpha things.\n---\nBody.\n"
+
+
+def levels(text: str) -> list[tuple[str, str]]:
+    return [(item["level"], item["check"]) for item in check_skill_text(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    (VALID, [("ok", "name"), ("ok", "description"), ("ok", "length")]),
+    ("", [("error", "empty")]),
+    (" \n\n", [("error", "empty")]),
+    ("# Alpha\nBody.\n", [("error", "frontmatter"), ("error", "name"), ("error", "description"), ("ok", "length")]),
+    ("---\nname: alpha\ndescription: x\n", [("error", "frontmatter"), ("error", "name"), ("error", "description"),
+                                            ("ok", "length")]),
+    ("---\nname: alpha\n---\n", [("ok", "name"), ("error", "description"), ("ok", "length")]),
+    ("---\ndescription: x\n---\n", [("error", "name"), ("ok", "description"), ("ok", "length")]),
+    ("---\nname: ''\ndescription: x\n---\n", [("error", "name"), ("ok", "description"), ("ok", "length")]),
+    # Invalid YAML is an error, but the keys that could be read are still checked
+    ("---\nname: alpha\ndescription: [a\n---\n", [("error", "frontmatter"), ("ok", "name"), ("ok", "description"),
+                                                   ("ok", "length")]),
+    # A block scalar description is valid
+    ("---\nname: alpha\ndescription: |\n  Two\n  lines.\n---\n", [("ok", "name"), ("ok", "description"),
+                                                               ("ok", "length")]),
+    # A closing delimiter with trailing spaces still closes the frontmatter
+    ("---\nname: alpha\ndescription: x\n---  \n", [("ok", "name"), ("ok", "description"), ("ok", "length")]),
+])
+def test_check_skill_text(text, expected):
+    assert levels(text) == expected
+
+
+def test_limits_are_warnings():
+    long_description = "x" * (MAX_DESCRIPTION_CHARS + 1)
+    text = f"---\nname: alpha\ndescription: {long_description}\n---\n" + "line\n" * MAX_SKILL_LINES
+    findings = {item["check"]: item for item in check_skill_text(text)}
+    assert findings["description"]["level"] == "warning"
+    assert findings["description"]["message"].endswith(f"({MAX_DESCRIPTION_CHARS + 1} chars)")
+    assert findings["length"]["level"] == "warning"
+
+    at_limit = f"---\nname: alpha\ndescription: {'x' * MAX_DESCRIPTION_CHARS}\n---\n"
+    at_limit += "line\n" * (MAX_SKILL_LINES - at_limit.count("\n"))
+    assert [item["level"] for item in check_skill_text(at_limit)] == ["ok", "ok", "ok"]
+
+
+def test_name_and_description_messages():
+    findings = check_skill_text("---\nname: \"alpha\"\ndescription: [a, b]\n---\n")
+    assert [item["message"] for item in findings[:2]] == ["name = alpha", "description (4 chars)"]
+
+
+def test_tree_run_reports_missing_directories(tree):
+    skills = tree.root / "skills"
+    write(skills / "group" / "alpha" / "SKILL.md", VALID)
+    write(skills / "group" / "broken" / "SKILL.md", "# No frontmatter\n")
+    missing = tree.root / "missing"
+    result = tree.run("validate_skills.py", str(skills), str(missing), "--format", "json", check=False)
+    assert result.returncode == 1
+    document = json.loads(result.stdout)
+    statuses = {item["skill"]: item["status"] for item in document["skills"]}
+    assert statuses == {
+        str(skills / "group" / "alpha"): "pass",
+        str(skills / "group" / "broken"): "fail",
+        str(missing): "fail",
+    }
+    assert document["skills"][-1]["findings"] == [{"level": "error", "check": "exists", "message": "SKILL.md not found"}]
+
+
+# === Cache ===
+
+HOUR_NS = 3600 * 10**9
+
+
+def backdate(path, hours: int = 1) -> None:
+    mtime_ns = time.time_ns() - hours * HOUR_NS
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def cached_run(tmp_path, skill_dir) -> dict:
+    """Validate one skill with the cache in tmp_path, as separate runs do."""
+    cache = validate_skills.ValidationCache(tmp_path / "validate-cache.json")
+    [result] = validate_skills.validate_skills([skill_dir], cache)
+    cache.save()
+    return result
+
+
+def fail(*args):
+    raise AssertionError("must not be called")
+
+
+@pytest.fixture
+def skill_dir(tmp_path):
+    skill_md = write(tmp_path / "skills" / "alpha" / "SKILL.md", VALID)
+    backdate(skill_md)
+    return skill_md.parent
+
+
+def test_unchanged_file_is_not_read(tmp_path, skill_dir, monkeypatch):
+    first = cached_run(tmp_path, skill_dir)
+    assert not first["cached"]
+    monkeypatch.setattr(validate_skills, "validate_file", fail)
+    second = cached_run(tmp_path, skill_dir)
+    assert second["cached"] and second["findings"] == first["findings"]
+
+
+def test_touched_file_is_hashed_but_not_checked(tmp_path, skill_dir, monkeypatch):
+    first = cached_run(tmp_path, skill_dir)
+    backdate(skill_dir / "SKILL.md", hours=2)
+    monkeypatch.setattr(validate_skills, "check_skill_text", fail)
+    second = cached_run(tmp_path, skill_dir)
+    assert second["cached"] and second["findings"] == first["findings"]
+
+
+def test_edited_file_is_validated_again(tmp_path, skill_dir):
+    assert cached_run(tmp_path, skill_dir)["status"] == "pass"
+    write(skill_dir / "SKILL.md", "# No frontmatter\n")
+    backdate(skill_dir / "SKILL.md")
+    result = cached_run(tmp_path, skill_dir)
+    assert not result["cached"] and result["status"] == "fail"
+
+
+def test_recently_modified_file_is_always_hashed(tmp_path, monkeypatch):
+    # On a filesystem with coarse timestamps an edit right after this run
+    # could leave the mtime and size unchanged
+    skill_md = write(tmp_path / "skills" / "alpha" / "SKILL.md", VALID)
+    cached_run(tmp_path, skill_md.parent)
+    hashed = []
+    validate_file = validate_skills.validate_file
+    monkeypatch.setattr(validate_skills, "validate_file", lambda *args: hashed.append(args) or validate_file(*args))
+    assert cached_run(tmp_path, skill_md.parent)["cached"]
+    assert len(hashed) == 1
+
+    backdate(skill_md)
+    cached_run(tmp_path, skill_md.parent)
+    assert cached_run(tmp_path, skill_md.parent)["cached"]
+    assert len(hashed) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(validate_skills, "VALIDATE_CACHE_MAX_ENTRIES", 2)
+    cache_file = tmp_path / "validate-cache.json"
+    cache = validate_skills.ValidationCache(cache_file)
+    stat = write(tmp_path / "SKILL.md", VALID).stat()
+    for key, used in [("old", 100), ("newest", 300), ("newer", 200)]:
+        cache._now = used
+        cache.put(key, stat, "digest", [])
+    cache.save()
+    assert set(validate_skills.ValidationCache(cache_file).entries) == {"newest", "newer"}
@@ -0,0 +1,44 @@
+"""Tests for mapping watched file changes to the report sections they affect."""
+from __future__ import annotations
+
+import pytest
+
+import introspection
+
+SECTIONS = set(introspection.SECTIONS)
+
+
+@pytest.mark.parametrize("relative, expected", [
+    (".claude", SECTIONS),
+    (".claude/rules/style.md", {"memory_files"}),
+    (".claude/rules/nested/api.md", {"memory_files"}),
+    (".claude/CLAUDE.md", {"memory_files"}),
+    (".claude/skills/alpha/SKILL.md", {"skills"}),
+    (".claude/agents/helper.md", {"agents"}),
+    (".claude/commands/git/push.md", {"commands"}),
+    (".claude/settings.json", {"hooks"}),
+    (".claude/settings.local.json", {"hooks"}),
+    (".claude/notes.txt", set()),
+    ("CLAUDE.md", {"memory_files"}),
+    ("CLAUDE.local.md", {"memory_files"}),
+    (".mcp.json", {"mcp_servers"}),
+    ("src/main.py", set()),
+])
+def test_project_paths(tmp_path, relative, expected):
+    assert introspection.sections_for_path(tmp_path / relative, tmp_path) == expected
+
+
+@pytest.mark.parametrize("path, expected", [
+    (introspection.USER_CLAUDE_DIR / "skills" / "alpha" / "SKILL.md", {"skills"}),
+    (introspection.USER_CLAUDE_DIR / "settings.json", {"hooks"}),
+    (introspection.USER_CLAUDE_JSON, {"mcp_servers"}),
+    (introspection.Path("/etc/claude-code/managed-mcp.json"), {"mcp_servers"}),
+    (introspection.Path("/etc/claude-code/managed-settings.json"), {"hooks"}),
+])
+def test_user_and_enterprise_paths(tmp_path, path, expected):
+    assert introspection.sections_for_path(path, tmp_path / "proj") == expected
+
+
+def test_imported_file_affects_memory_files(tmp_path):
+    shared = tmp_path / "shared" / "guide.md"
+    assert introspection.sections_for_path(shared, tmp_path / "proj", {shared}) == {"memory_files"}
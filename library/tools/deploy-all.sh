@@ -1,43 +1,23 @@
 #!/bin/bash
 # Deploy all skills from core-skills/ to Claude Code skills directory
-# Usage: ./deploy-all.sh [target-dir]
+# Usage: ./deploy-all.sh [target-dir] [--dry-run] [--no-prune] [--verbose] [--jobs N]
 #
 # Default target: ~/.claude/skills/
+#
+# Runs deploy-skills.py, which keeps a manifest of content hashes in the
+# target (.deploy-manifest.json), copies only changed files (atomically,
+# via rename), deploys skills in parallel, and removes skills it deployed
+# that are no longer in core-skills/. Re-deploying an unchanged library
+# only stats each file.
 
 set -e
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 RESOURCES_DIR="$(dirname "$SCRIPT_DIR")"
-TARGET="${1:-$HOME/.claude/skills}"
-
-echo "Deploying all skills to: $TARGET"
-echo ""
-
-DEPLOYED=0
-FAILED=0
-
-# Find all directories containing SKILL.md in core-skills/
-for skill_dir in $(find "$RESOURCES_DIR/skills/core-skills" -name "SKILL.md" -exec dirname {} \;); do
-    skill_name=$(basename "$skill_dir")
-
-    # Skip if SKILL.md is a placeholder
-    if grep -q "^name: placeholder" "$skill_dir/SKILL.md" 2>/dev/null; then
-        echo "SKIP: $skill_name (placeholder)"
-        continue
-    fi
-
-    if "$SCRIPT_DIR/deploy-skill.sh" "$skill_dir" "$TARGET" > /dev/null 2>&1; then
-        echo "OK:   $skill_name"
-        DEPLOYED=$((DEPLOYED + 1))
-    else
-        echo "FAIL: $skill_name"
-        FAILED=$((FAILED + 1))
-    fi
-done
-
-echo ""
-echo "Summary: $DEPLOYED deployed, $FAILED failed"
-
-if [ $FAILED -gt 0 ]; then
-    exit 1
+TARGET="$HOME/.claude/skills"
+if [ -n "$1" ] && [ "${1#-}" = "$1" ]; then
+    TARGET="$1"
+    shift
 fi
+
+exec python3 "$SCRIPT_DIR/deploy-skills.py" "$RESOURCES_DIR/skills/core-skills" "$TARGET" "$@"
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Incremental skill deployment: copy only what changed into a skills directory.
+
+Every skill (a directory with a SKILL.md) below the source tree is deployed
+to <target>/<skill name>, as deploy-skill.sh does. A manifest in the
+target, .deploy-manifest.json, records each deployed file's SHA-256 and the
+source and target mtimes and sizes it was deployed with, so:
+
+- unchanged source files are only stat()ed, not read;
+- a source file whose mtime changed is hashed, and only copied if its
+  content changed (a fresh checkout copies nothing);
+- each copy is written to a temporary file next to its destination and
+  renamed over it, so Claude never reads a half-written file;
+- files removed from a skill, and skills removed from the source, are
+  deleted from the target; skills deployed from other sources (other
+  trees, or single skill directories) and files the manifest does not
+  list (added by hand, or by other tools) are never touched.
+
+Skills are deployed on a thread pool. Re-deploying an unchanged library
+costs two stat() calls per file.
+
+Usage:
+    python deploy-skills.py SOURCE [TARGET] [--jobs N] [--dry-run] [--no-prune]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+# === Constants ===
+
+DEFAULT_TARGET = Path.home() / ".claude" / "skills"
+MANIFEST_NAME = ".deploy-manifest.json"
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 16
+# Skills whose SKILL.md declares this name are skipped, as in deploy-all.sh
+PLACEHOLDER_NAME = "name: placeholder"
+PLACEHOLDER_LINES = 20
+SKIPPED_DIRS = frozenset({".git", "__pycache__"})
+STATUS_LABELS = {"added": "ADD", "updated": "UPDATE", "removed": "REMOVE", "failed": "FAIL", "skipped": "SKIP"}
+
+
+# === Discovery ===
+
+def find_skills(source: Path) -> list[Path]:
+    """Return the skill directories below source (or source itself), sorted."""
+    if (source / "SKILL.md").is_file():
+        return [source]
+    found = []
+    for directory, subdirs, files in os.walk(source):
+        if "SKILL.md" in files:
+            found.append(Path(directory))
+            subdirs.clear()
+        else:
+            subdirs[:] = [name for name in subdirs if name not in SKIPPED_DIRS]
+    return sorted(found)
+
+
+def list_skill_files(skill_dir: Path) -> dict[str, os.stat_result]:
+    """Return {relative path: stat} for every file of a skill, hidden files included."""
+    files = {}
+    for directory, subdirs, names in os.walk(skill_dir):
+        subdirs[:] = [name for name in subdirs if name not in SKIPPED_DIRS]
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[os.path.relpath(path, skill_dir)] = stat
+    return files
+
+
+def is_placeholder(skill_dir: Path) -> bool:
+    """Check whether a skill's frontmatter names it a placeholder."""
+    try:
+        with open(skill_dir / "SKILL.md", encoding="utf-8", errors="replace") as f:
+            return any(line.startswith(PLACEHOLDER_NAME) for _, line in zip(range(PLACEHOLDER_LINES), f))
+    except OSError:
+        return False
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# === Deployment ===
+
+def copy_atomic(source: str, destination: str) -> os.stat_result:
+    """Copy source over destination through a temporary file and a rename."""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp_path = f"{destination}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+    try:
+        shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        remove_quietly(tmp_path)
+        raise
+    return os.stat(destination)
+
+
+def remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def remove_file(target_dir: str, rel: str) -> None:
+    """Remove a deployed file and the directories it leaves empty, up to target_dir."""
+    remove_quietly(os.path.join(target_dir, rel))
+    parent = os.path.dirname(rel)
+    while parent:
+        try:
+            os.rmdir(os.path.join(target_dir, parent))
+        except OSError:
+            return
+        parent = os.path.dirname(parent)
+
+
+def target_matches(path: str, recorded: dict | None, digest: str, size: int) -> bool:
+    """Check whether the file deployed at path has the given content."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != size:
+        return False
+    if recorded and stat.st_mtime_ns == recorded["target_mtime_ns"]:
+        return recorded["sha256"] == digest
+    # Not deployed by us, or touched since: compare the content
+    try:
+        return file_digest(path) == digest
+    except OSError:
+        return False
+
+
+def deploy_skill(skill_dir: Path, target_dir: Path, previous: dict | None, dry_run: bool = False) -> dict:
+    """Bring one deployed skill up to date with its source.
+
+    previous is the skill's manifest entry from the last deployment.
+    Returns {"name", "status", "copied", "removed", "entry"}, where entry
+    is the skill's new manifest entry and status is "added", "updated",
+    "unchanged" or "failed" (with "error").
+    """
+    name = skill_dir.name
+    result = {"name": name, "status": "unchanged", "copied": [], "removed": [], "entry": previous}
+    recorded_files = (previous or {}).get("files", {})
+    files = {}
+    try:
+        for rel, stat in sorted(list_skill_files(skill_dir).items()):
+            recorded = recorded_files.get(rel)
+            source = str(skill_dir / rel)
+            destination = str(target_dir / rel)
+            if (recorded and recorded["source_mtime_ns"] == stat.st_mtime_ns and recorded["size"] == stat.st_size
+                    and target_matches(destination, recorded, recorded["sha256"], stat.st_size)):
+                files[rel] = recorded
+                continue
+            digest = file_digest(source)
+            if target_matches(destination, recorded, digest, stat.st_size):
+                target_stat = os.stat(destination)
+            else:
+                result["copied"].append(rel)
+                target_stat = None if dry_run else copy_atomic(source, destination)
+            files[rel] = {
+                "sha256": digest,
+                "size": stat.st_size,
+                "source_mtime_ns": stat.st_mtime_ns,
+                "target_mtime_ns": target_stat.st_mtime_ns if target_stat else 0,
+            }
+        for rel in sorted(set(recorded_files) - set(files)):
+            result["removed"].append(rel)
+            if not dry_run:
+                remove_file(str(target_dir), rel)
+    except OSError as e:
+        result.update(status="failed", error=f"{e.strerror}: {e.filename}")
+        return result
+
+    # A skill already deployed identically, before the manifest existed, stays "unchanged"
+    if result["copied"] or result["removed"]:
+        result["status"] = "updated" if previous else "added"
+    result["entry"] = {"source": str(skill_dir), "files": files}
+    return result
+
+
+def remove_skill(target_dir: Path, entry: dict, dry_run: bool = False) -> dict:
+    """Delete the files of a skill no longer in the source, then its directory if empty."""
+    removed = sorted(entry.get("files", {}))
+    if not dry_run:
+        for rel in removed:
+            remove_file(str(target_dir), rel)
+        try:
+            os.rmdir(target_dir)
+        except OSError:
+            pass
+    return {"name": target_dir.name, "status": "removed", "copied": [], "removed": removed, "entry": None}
+
+
+# === Manifest ===
+
+def load_manifest(target: Path) -> dict:
+    """Return the target's {skill name: entry} manifest, or {} if there is none."""
+    try:
+        data = json.loads((target / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("skills") or {}
+
+
+def save_manifest(target: Path, skills: dict) -> None:
+    """Write the manifest through a temporary file and a rename."""
+    payload = {"version": MANIFEST_VERSION, "skills": dict(sorted(skills.items()))}
+    path = target / MANIFEST_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def deployed_from(entry: dict, source: Path) -> bool:
+    """Check whether a manifest entry was deployed from a skill under source."""
+    deployed = os.path.abspath(entry.get("source") or "")
+    root = os.path.abspath(source.resolve())
+    return deployed == root or deployed.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def deploy(source: Path, target: Path, jobs: int | None = None, dry_run: bool = False,
+           prune: bool = True) -> list[dict]:
+    """Deploy every skill below source to target; return one result per skill touched or skipped.
+
+    Unchanged skills are included with status "unchanged". With prune,
+    skills previously deployed from under source that it no longer has are
+    removed; skills deployed from other sources are left alone. The
+    manifest is rewritten unless dry_run is set or nothing changed.
+    """
+    source = source.resolve()
+    manifest = load_manifest(target)
+    results = []
+    skills = {}
+    for skill_dir in find_skills(source):
+        name = skill_dir.name
+        if name in skills:
+            results.append({"name": name, "status": "failed", "copied": [], "removed": [], "entry": None,
+                            "error": f"name already deployed from {skills[name]}"})
+        elif is_placeholder(skill_dir):
+            results.append({"name": name, "status": "skipped", "copied": [], "removed": [], "entry": None,
+                            "error": "placeholder"})
+        else:
+            skills[name] = skill_dir
+
+    if not dry_run:
+        target.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results.extend(pool.map(
+            lambda item: deploy_skill(item[1], target / item[0], manifest.get(item[0]), dry_run),
+            sorted(skills.items()),
+        ))
+    if prune:
+        # Only skills deployed from this source are pruned; a single skill prunes nothing else
+        for name in sorted(set(manifest) - set(skills)):
+            if deployed_from(manifest[name], source):
+                results.append(remove_skill(target / name, manifest[name], dry_run))
+
+    updated = dict(manifest)
+    for result in results:
+        if result["status"] == "removed":
+            updated.pop(result["name"], None)
+        elif result["entry"] is not None:
+            updated[result["name"]] = result["entry"]
+    if not dry_run and updated != manifest:
+        save_manifest(target, updated)
+    return results
+
+
+# === Output ===
+
+def format_changes(result: dict) -> str:
+    parts = []
+    if result["copied"]:
+        parts.append(f"{len(result['copied'])} copied")
+    if result["removed"]:
+        parts.append(f"{len(result['removed'])} removed")
+    if result.get("error"):
+        parts.append(result["error"])
+    return ", ".join(parts) or "manifest only"
+
+
+def render_summary(results: list[dict], verbose: bool = False) -> list[str]:
+    """List each skill that changed (and, with verbose, each file), then the totals."""
+    lines = []
+    for result in results:
+        if result["status"] == "unchanged":
+            continue
+        lines.append(f"{STATUS_LABELS[result['status']] + ':':<8}{result['name']} ({format_changes(result)})")
+        if verbose:
+            lines.extend(f"    + {rel}" for rel in result["copied"])
+            lines.extend(f"    - {rel}" for rel in result["removed"])
+    counts = {status: sum(result["status"] == status for result in results)
+              for status in ("added", "updated", "removed", "unchanged", "skipped", "failed")}
+    files = sum(len(result["copied"]) for result in results)
+    if lines:
+        lines.append("")
+    lines.append(", ".join(f"{count} {status}" for status, count in counts.items())
+                 + f"; {files} {'file' if files == 1 else 'files'} copied")
+    return lines
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Deploy changed skills to a Claude Code skills directory.")
+    parser.add_argument("source", type=Path, help="a skill directory, or a tree to deploy every skill from")
+    parser.add_argument("target", nargs="?", type=Path, default=DEFAULT_TARGET,
+                        help=f"skills directory to deploy to (default: {DEFAULT_TARGET})")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="deploy N skills at a time (default: a thread pool sized for the CPU count)")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--no-prune", action="store_true",
+                        help="keep previously deployed skills that are no longer in the source")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every file copied or removed")
+    args = parser.parse_args()
+    if not args.source.is_dir():
+        parser.error(f"not a directory: {args.source}")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    source = args.source.resolve()
+    target = args.target.expanduser().absolute()
+    print(f"{'Checking' if args.dry_run else 'Deploying'} skills from {source} to: {target}")
+    print("")
+    results = deploy(source, target, args.jobs, args.dry_run, prune=not args.no_prune)
+    print("\n".join(render_summary(results, args.verbose)))
+    if any(result["status"] == "failed" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Tests for deploy-skills.py: incremental deployment and pruning."""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+DEPLOY = Path(__file__).resolve().parent.parent / "deploy-skills.py"
+
+
+def make_skill(root: Path, name: str, body: str = "Body.\n") -> Path:
+    skill = root / name
+    skill.mkdir(parents=True)
+    (skill / "SKILL.md").write_text(f"---\nname: {name}\ndescription: The {name} skill.\n---\n{body}")
+    return skill
+
+
+def deploy(source: Path, target: Path, *args: str) -> str:
+    result = subprocess.run([sys.executable, str(DEPLOY), str(source), str(target), *args],
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def manifest(target: Path) -> dict:
+    return json.loads((target / ".deploy-manifest.json").read_text())["skills"]
+
+
+def test_two_sources_do_not_prune_each_other(tmp_path):
+    first, second, target = tmp_path / "first", tmp_path / "second", tmp_path / "target"
+    make_skill(first / "group", "alpha")
+    make_skill(first / "group", "beta")
+    make_skill(second, "gamma")
+
+    deploy(first, target)
+    output = deploy(second, target)
+    assert "0 removed" in output
+    assert sorted(manifest(target)) == ["alpha", "beta", "gamma"]
+
+    output = deploy(first, target)
+    assert "0 removed" in output
+    assert sorted(manifest(target)) == ["alpha", "beta", "gamma"]
+    assert all((target / name / "SKILL.md").is_file() for name in ("alpha", "beta", "gamma"))
+
+
+def test_single_skill_source_prunes_nothing_else(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    make_skill(source / "group", "alpha")
+    make_skill(source / "group", "beta")
+    deploy(source, target)
+
+    output = deploy(source / "group" / "alpha", target)
+    assert "0 removed" in output
+    assert sorted(manifest(target)) == ["alpha", "beta"]
+
+
+def test_skill_removed_from_source_is_pruned(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    make_skill(source, "alpha")
+    beta = make_skill(source, "beta")
+    deploy(source, target)
+    (target / "beta" / "notes.md").write_text("added by hand\n")
+
+    (beta / "SKILL.md").unlink()
+    beta.rmdir()
+    output = deploy(source, target)
+    assert "1 removed" in output
+    assert sorted(manifest(target)) == ["alpha"]
+    # Files the deployment did not create survive
+    assert (target / "beta" / "notes.md").is_file()
+    assert not (target / "beta" / "SKILL.md").exists()
+
+
+def test_unchanged_redeploy_copies_nothing(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    alpha = make_skill(source, "alpha")
+    assert "1 file copied" in deploy(source, target)
+    assert "0 files copied" in deploy(source, target)
+
+    # A new mtime with the same content is hashed, not copied
+    (alpha / "SKILL.md").write_text((alpha / "SKILL.md").read_text())
+    assert "0 files copied" in deploy(source, target)
+
+    (alpha / "SKILL.md").write_text("---\nname: alpha\ndescription: Changed.\n---\n")
+    output = deploy(source, target)
+    assert "1 updated" in output and "1 file copied" in output
+    assert "Changed." in (target / "alpha" / "SKILL.md").read_text()
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    make_skill(source, "alpha")
+    output = deploy(source, target, "--dry-run")
+    assert "1 added" in output
+    assert not target.exists()
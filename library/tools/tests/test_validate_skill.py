@@ -0,0 +1,49 @@
+"""Tests for validate-skill.sh, the wrapper around the plugin's validate_skills.py."""
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+VALIDATE = Path(__file__).resolve().parent.parent / "validate-skill.sh"
+
+
+def validate(home: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["bash", str(VALIDATE), *args], env={**os.environ, "HOME": str(home)},
+                          capture_output=True, text=True)
+
+
+def test_single_skill_lists_every_check(tmp_path):
+    skill = tmp_path / "alpha"
+    skill.mkdir()
+    (skill / "SKILL.md").write_text("---\nname: alpha\ndescription: The alpha skill.\n---\nBody.\n")
+    result = validate(tmp_path, str(skill))
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[:5] == [
+        f"Validating: {skill}",
+        "  OK: name = alpha",
+        "  OK: description (16 chars)",
+        "  OK: 5 lines",
+        "  INFO: No .source tracking file",
+    ]
+
+
+def test_missing_directory_fails_as_a_skill(tmp_path):
+    missing = tmp_path / "missing"
+    result = validate(tmp_path, str(missing))
+    assert result.returncode == 1
+    assert result.stdout.splitlines()[:2] == [f"Validating: {missing}", "  FAIL: SKILL.md not found"]
+
+
+def test_directory_without_skill_md_fails(tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    result = validate(tmp_path, str(empty))
+    assert result.returncode == 1
+    assert "  FAIL: SKILL.md not found" in result.stdout
+
+
+def test_no_arguments_prints_usage(tmp_path):
+    result = validate(tmp_path)
+    assert result.returncode == 1
+    assert result.stdout.startswith("Usage:")